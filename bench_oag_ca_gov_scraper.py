@@ -0,0 +1,453 @@
+"""
+Benchmarks for oag_ca_gov_scraper.
+
+Everything runs offline against the saved notice pages in fixtures/notices.
+Benchmarks that need HTTP use StandInServer, a local stand-in for oag.ca.gov
+that serves those pages with configurable latency and injected errors.
+
+Suites:
+    startup     time to import the scraper module, and which heavy dependencies it loads
+    comparison  load_comparison_data, streaming vs the previous full-workbook loader
+    extract     per-page parse and process_url_data cost for each fixture and backend
+    scrape      end-to-end URLs/min of main() against the stand-in server
+    discovery   requests discover_year_end_id makes to find a year's last notice
+    xlsx        report write time and peak memory
+
+Benchmarks that measure memory or call main() run in their own process, so
+each peak RSS is measured in isolation and the scraper's globals start fresh.
+
+Usage:
+    python bench_oag_ca_gov_scraper.py [SUITE ...] [--rows 50000] [--urls 500]
+        [--latency 0.05] [--error-rate 0.02] [--report-rows 20000]
+"""
+import argparse
+import BaseHTTPServer
+import collections
+import json
+import os
+import random
+import resource
+import shutil
+import SocketServer
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import openpyxl
+
+import oag_ca_gov_scraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "notices")
+
+
+# The loader as it was before it streamed the workbook, kept as a baseline
+def legacy_load_comparison_data(excel_file):
+    comparison_data = {}
+    workbook = openpyxl.load_workbook(excel_file)
+    sheet = workbook.active
+    headers = [cell.value for cell in sheet[1] if cell.value]
+    link_index = headers.index('link')
+    for row_idx in range(2, (sheet.max_row or 0) + 1):
+        row_data = {}
+        url = None
+        for col_idx, header in enumerate(headers, 1):
+            cell_value = sheet.cell(row=row_idx, column=col_idx).value
+            if col_idx - 1 == link_index and cell_value:
+                md_match = oag_ca_gov_scraper.re.search(r'\[.*?\]\((.*?)\)', str(cell_value))
+                url = md_match.group(1) if md_match else str(cell_value)
+            row_data[header] = cell_value
+        if url and url.startswith('http'):
+            comparison_data[url] = row_data
+    return comparison_data
+
+LOADERS = {
+    "legacy": legacy_load_comparison_data,
+    "streaming": oag_ca_gov_scraper.load_comparison_data,
+}
+
+# Write a report shaped like the ones the scraper used to produce: every
+# column present, unused cells written as empty strings
+def make_comparison_workbook(path, rows):
+    headers = oag_ca_gov_scraper.build_ordered_headers()
+    filled = {
+        'AG Number': '2021-{:05d}',
+        'Alleged Violators': 'Example Co. {}',
+        'Chemicals': 'Lead',
+        'Date Filed': '01/01/2021',
+        'Noticing Party': 'Consumer Advocacy Group',
+        'Source': 'Notice {}',
+        'Settlement_1_Settlement Date': '02/01/2021',
+        'Settlement_1_Case Name': 'People v. Example Co. {}',
+        'Settlement_1_Total Payments': 12500.0,
+    }
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Main Data")
+    sheet.append(headers)
+    for i in range(1, rows + 1):
+        row = []
+        for header in headers:
+            if header == 'link':
+                row.append("https://oag.ca.gov/prop65/60-Day-Notice-2021-{:05d}".format(i))
+            elif header in filled:
+                value = filled[header]
+                row.append(value.format(i) if hasattr(value, "format") else value)
+            else:
+                row.append("")
+        sheet.append(row)
+    workbook.save(path)
+
+# Saved notice pages as (AG Number, html), in file name order
+def load_fixture_pages(fixtures_dir=FIXTURES_DIR):
+    pages = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(fixtures_dir, name), "rb") as f:
+                pages.append((name[len("60-Day-Notice-"):-len(".html")], f.read()))
+    return pages
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+# Local stand-in for oag.ca.gov
+class StandInServer(object):
+    """
+    Serves the fixture pages at /prop65/60-Day-Notice-YYYY-NNNNN.
+
+    Each notice ID gets one of the fixture pages, rewritten to carry that
+    ID's AG Number. IDs above a year's entry in end_ids are 404s (years not
+    in end_ids have every ID). Each response is delayed by latency seconds,
+    and error_rate of them are replaced by error_status. Requests are
+    counted by method.
+    """
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, error_rate=0.0, error_status=503,
+                 end_ids=None, seed=0):
+        self.pages = load_fixture_pages(fixtures_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.end_ids = end_ids or {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = collections.Counter()
+        self.httpd = None
+        self.base_url = None
+
+    def notice_url(self, year, number):
+        return "{}/prop65/60-Day-Notice-{}-{:05d}".format(self.base_url, year, number)
+
+    def respond(self, handler):
+        with self.lock:
+            self.requests[handler.command] += 1
+            failed = self.random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        match = oag_ca_gov_scraper.NOTICE_URL_RE.search(handler.path)
+        if failed:
+            status, body = self.error_status, "Service Unavailable"
+        elif match is None or int(match.group(2)) > self.end_ids.get(int(match.group(1)), float("inf")):
+            status, body = 404, "Page not found"
+        else:
+            ag_number = "{}-{:05d}".format(match.group(1), int(match.group(2)))
+            fixture_ag_number, html = self.pages[int(match.group(2)) % len(self.pages)]
+            status, body = 200, html.replace(fixture_ag_number, ag_number)
+        handler.send_response(status)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(body)
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stand_in.respond(self)
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+            request_queue_size = 128
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        self.base_url = "http://127.0.0.1:{}".format(self.httpd.server_port)
+        thread = threading.Thread(target=self.httpd.serve_forever, name="StandInServer")
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def request_count(self, method=None):
+        with self.lock:
+            return self.requests[method] if method else sum(self.requests.values())
+
+# Run this script again in a child process and return the JSON line it prints last
+def run_child(*args):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__)] + list(args))
+    return json.loads(output.strip().splitlines()[-1])
+
+# Dependencies that only the code paths needing them should load
+HEAVY_MODULES = ("bs4", "lxml", "openpyxl", "pandas", "pyarrow", "xlwt", "nile")
+
+# Import the scraper in a fresh interpreter and report import time and heavy modules as JSON
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.time()
+import oag_ca_gov_scraper
+elapsed = time.time() - start
+loaded = sorted(set(name.split(".")[0] for name in sys.modules if sys.modules[name] is not None))
+print(json.dumps({"seconds": elapsed, "heavy_modules": [name for name in %r if name in loaded]}))
+""" % (HEAVY_MODULES,)
+
+def bench_startup(args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.abspath(__file__))] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    times = []
+    for _ in range(args.repeat):
+        output = subprocess.check_output([sys.executable, "-c", STARTUP_SCRIPT], env=env)
+        lines = output.strip().splitlines()
+        result = json.loads(lines[-1])
+        times.append(result["seconds"])
+    times.sort()
+    print("import oag_ca_gov_scraper: median {:.1f}ms, min {:.1f}ms over {} runs".format(
+        times[len(times) // 2] * 1000, times[0] * 1000, len(times)))
+    print("Heavy modules loaded at import: {}".format(", ".join(result["heavy_modules"]) or "none"))
+    if len(lines) > 1:
+        print("Import printed {} lines of output".format(len(lines) - 1))
+
+# Run one loader in this process and report its time and peak RSS as JSON
+def run_loader(name, path):
+    start = time.time()
+    records = len(LOADERS[name](path))
+    elapsed = time.time() - start
+    print(json.dumps({"loader": name, "seconds": elapsed, "records": records,
+                      "peak_rss_mb": peak_rss_mb()}))
+
+def bench_comparison(args):
+    temp_dir = None
+    path = args.file
+    if path is None:
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, "comparison.xlsx")
+        print("Generating {} row comparison workbook...".format(args.rows))
+        start = time.time()
+        make_comparison_workbook(path, args.rows)
+        print("Generated {} ({:.1f} MB) in {:.1f}s".format(
+            path, os.path.getsize(path) / 1048576.0, time.time() - start))
+
+    try:
+        print("{:<10} {:>10} {:>10} {:>14}".format("loader", "records", "seconds", "peak RSS (MB)"))
+        for name in ("legacy", "streaming"):
+            result = run_child("--loader", name, "--file", path)
+            print("{:<10} {:>10} {:>10.1f} {:>14.1f}".format(
+                name, result["records"], result["seconds"], result["peak_rss_mb"]))
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+
+def bench_extract(args):
+    backends = []
+    for name in sorted(oag_ca_gov_scraper.PARSER_BACKENDS):
+        try:
+            backends.append(oag_ca_gov_scraper.get_parser_backend(name))
+        except ImportError:
+            print("Skipping the {} backend: not installed".format(name))
+
+    print("{:<12} {:>8} {:<6} {:>10} {:>12}".format("notice", "sections", "parser", "parse ms", "extract ms"))
+    for ag_number, html in load_fixture_pages():
+        url = "https://oag.ca.gov/prop65/60-Day-Notice-{}".format(ag_number)
+        for backend in backends:
+            start = time.time()
+            for _ in range(args.repeat):
+                document = backend.parse(html)
+            parse_ms = (time.time() - start) * 1000 / args.repeat
+            section_timings = []
+            start = time.time()
+            for _ in range(args.repeat):
+                del section_timings[:]
+                oag_ca_gov_scraper.process_url_data(url, document, backend, section_timings)
+            extract_ms = (time.time() - start) * 1000 / args.repeat
+            print("{:<12} {:>8} {:<6} {:>10.2f} {:>12.2f}".format(
+                ag_number, len(section_timings), backend.name, parse_ms, extract_ms))
+
+# Run main() on a URL list in this process and report throughput as JSON
+def run_scrape(urls_file, engine, threads, reports_dir):
+    # Never email benchmark reports
+    oag_ca_gov_scraper.email_report = lambda *args, **kwargs: None
+    writers = []
+    open_result_writer = oag_ca_gov_scraper.open_result_writer
+
+    def counting_result_writer(output_format, output_filename):
+        writer = open_result_writer(output_format, output_filename)
+        writers.append(writer)
+        return writer
+
+    oag_ca_gov_scraper.open_result_writer = counting_result_writer
+    with open(urls_file) as f:
+        url_count = len(f.read().splitlines()) - 1
+    start = time.time()
+    oag_ca_gov_scraper.main(input_file=urls_file, threads=threads, engine=engine, output_format="csv",
+                            reports_dir=reports_dir)
+    elapsed = time.time() - start
+    print(json.dumps({"engine": engine, "urls": url_count, "seconds": elapsed,
+                      "rows": sum(writer.rows_written for writer in writers),
+                      "urls_per_min": url_count * 60 / elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+def bench_scrape(args):
+    server = StandInServer(latency=args.latency, error_rate=args.error_rate).start()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        urls_file = os.path.join(temp_dir, "urls.tsv")
+        with open(urls_file, "w") as f:
+            f.write("url\n")
+            for i in range(1, args.urls + 1):
+                f.write(server.notice_url(2021, i) + "\n")
+        print("Scraping {} URLs at {:.0f}ms latency with {:.0%} errors".format(
+            args.urls, args.latency * 1000, args.error_rate))
+        print("{:<8} {:>8} {:>8} {:>10} {:>10} {:>14}".format(
+            "engine", "rows", "requests", "seconds", "URLs/min", "peak RSS (MB)"))
+        for engine in args.engines:
+            before = server.request_count()
+            result = run_child("--run", "scrape", "--file", urls_file, "--engine", engine,
+                               "--threads", str(args.threads), "--reports-dir", temp_dir)
+            print("{:<8} {:>8} {:>8} {:>10.1f} {:>10.0f} {:>14.1f}".format(
+                engine, result["rows"], server.request_count() - before, result["seconds"],
+                result["urls_per_min"], result["peak_rss_mb"]))
+    finally:
+        server.stop()
+        shutil.rmtree(temp_dir)
+
+def bench_discovery(args):
+    end_ids = {2023: 1500, 2024: 7000}
+    server = StandInServer(latency=args.latency, end_ids=end_ids).start()
+
+    def probe(url):
+        return oag_ca_gov_scraper.probe_notice_exists(url.replace("https://oag.ca.gov", server.base_url))
+
+    try:
+        rows = []
+        for year, end_id in sorted(end_ids.items()):
+            # From scratch, and from a previous run's end ID as a scheduled run would
+            for start_id in (1, end_id - 50):
+                before = server.request_count()
+                start = time.time()
+                found = oag_ca_gov_scraper.discover_year_end_id(year, start_id, gap_tolerance=args.gap_tolerance,
+                                                                probe=probe)
+                rows.append((year, start_id, end_id, found, server.request_count() - before,
+                             time.time() - start))
+        print("{:<6} {:>8} {:>8} {:>8} {:>9} {:>8}".format("year", "start", "end", "found", "requests", "seconds"))
+        for row in rows:
+            print("{:<6} {:>8} {:>8} {:>8} {:>9} {:>8.2f}".format(*row))
+    finally:
+        # Drop the probes' keep-alive connections before the server goes away
+        oag_ca_gov_scraper.get_http_fetcher().close()
+        server.stop()
+
+# Write a report of synthetic notices in this process and report time and memory as JSON
+def run_xlsx(rows):
+    records = []
+    for ag_number, html in load_fixture_pages():
+        url = "https://oag.ca.gov/prop65/60-Day-Notice-{}".format(ag_number)
+        records.append(oag_ca_gov_scraper.parse_notice_page(url, html)[1])
+    entries = []
+    for i in range(rows):
+        entry = records[i % len(records)].to_dict()
+        entry['data']['link'] = "https://oag.ca.gov/prop65/60-Day-Notice-2021-{:05d}".format(i)
+        entry['data']['AG Number'] = "2021-{:05d}".format(i)
+        entries.append(entry)
+    rss_before = peak_rss_mb()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        start = time.time()
+        writer = oag_ca_gov_scraper.StreamingXlsxWriter(os.path.join(temp_dir, "report.xlsx"))
+        writer.write_all(entries)
+        writer.close()
+        elapsed = time.time() - start
+        size_mb = os.path.getsize(os.path.join(temp_dir, "report.xlsx")) / 1048576.0
+    finally:
+        shutil.rmtree(temp_dir)
+    print(json.dumps({"rows": rows, "seconds": elapsed, "size_mb": size_mb,
+                      "rss_before_mb": rss_before, "peak_rss_mb": peak_rss_mb()}))
+
+def bench_xlsx(args):
+    print("{:>8} {:>10} {:>10} {:>16} {:>14}".format("rows", "seconds", "size (MB)", "RSS before (MB)", "peak RSS (MB)"))
+    for rows in (args.report_rows // 10, args.report_rows):
+        result = run_child("--run", "xlsx", "--report-rows", str(rows))
+        print("{:>8} {:>10.1f} {:>10.1f} {:>16.1f} {:>14.1f}".format(
+            rows, result["seconds"], result["size_mb"], result["rss_before_mb"], result["peak_rss_mb"]))
+
+SUITES = collections.OrderedDict([
+    ("startup", bench_startup),
+    ("comparison", bench_comparison),
+    ("extract", bench_extract),
+    ("scrape", bench_scrape),
+    ("discovery", bench_discovery),
+    ("xlsx", bench_xlsx),
+])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark oag_ca_gov_scraper offline')
+    parser.add_argument('suites', nargs='*', metavar='SUITE',
+                        help='Benchmarks to run: {} (default: all)'.format(", ".join(SUITES)))
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='Rows in the synthetic comparison workbook (default: 50000)')
+    parser.add_argument('--file', type=str, default=None,
+                        help='Use an existing comparison workbook instead of generating one')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Times each fixture is parsed by the extract benchmark, and the '
+                             'module imported by the startup benchmark (default: 20)')
+    parser.add_argument('--urls', type=int, default=500,
+                        help='URLs scraped by the scrape benchmark (default: 500)')
+    parser.add_argument('--threads', type=int, default=5,
+                        help='--threads for the scrape benchmark (default: 5)')
+    parser.add_argument('--engines', nargs='+', choices=['threads', 'asyncio'], default=['threads', 'asyncio'],
+                        help='Engines for the scrape benchmark (default: both)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Seconds the stand-in server waits before each response (default: 0.05)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of stand-in responses replaced by a 503 (default: 0)')
+    parser.add_argument('--gap-tolerance', type=int, default=3,
+                        help='--gap-tolerance for the discovery benchmark (default: 3)')
+    parser.add_argument('--report-rows', type=int, default=20000,
+                        help='Rows in the largest report written by the xlsx benchmark (default: 20000)')
+    parser.add_argument('--loader', choices=sorted(LOADERS.keys()), default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--run', choices=['scrape', 'xlsx'], default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--engine', default='threads', help=argparse.SUPPRESS)
+    parser.add_argument('--reports-dir', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.loader:
+        run_loader(args.loader, args.file)
+        return
+    if args.run == "scrape":
+        run_scrape(args.file, args.engine, args.threads, args.reports_dir)
+        return
+    if args.run == "xlsx":
+        run_xlsx(args.report_rows)
+        return
+
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error("Unknown suite: {}".format(", ".join(unknown)))
+    for name in args.suites or SUITES:
+        print("\n== {} ==".format(name))
+        SUITES[name](args)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,42 @@
 # Import necessary libraries
+# BeautifulSoup, pandas, openpyxl and the email helper are imported where they
+# are used, so importing this module stays fast for tests and small jobs
 import urllib2
-from bs4 import BeautifulSoup
-import xlwt
-import pandas as pd  # Replace xlrd with pandas
 import re
 import sys
 import os
 # Add logging functionality
 import logging
 import datetime
-import openpyxl
-from openpyxl.utils import get_column_letter
 import time  # Add this import at the top
 import ssl
+import httplib  # For keep-alive HTTP connections
+import urlparse
+import zlib  # For gzip/deflate response decoding
+import socket
+import select  # For the non-blocking event loop engine
+import errno
+import heapq
+import bisect
+import collections
+import multiprocessing  # For the HTML parsing process pool
+from multiprocessing.pool import ThreadPool  # For concurrent discovery probes
 import math  # For isinf() function
 import threading  # For multi-threading
 import Queue  # For thread-safe queue in Python 2
 import argparse  # For command-line argument parsing
 import shutil  # For directory operations
-from nile.utils.send_email import email_custom
+import StringIO
+import json  # For the run journal
+import hashlib  # For the content-addressed page cache
+import itertools
+import random  # For sampling stale notices and backoff jitter
+import zipfile  # For reparsing archived pages
+import tarfile
+import sqlite3  # For the notice state store
+import csv
+import cProfile  # For --profile
+import pstats
 
 # Thread-safe counter for tracking progress
 class AtomicCounter:
@@ -34,24 +52,1073 @@ class AtomicCounter:
     def get(self):
         with self.lock:
             return self.value
+
+# Thread-safe per-stage counters for the fetch and parse pipeline
+class PipelineStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {
+            "fetched": 0,
+            "fetch_failed": 0,
+            "fetch_seconds": 0.0,
+            "parsed": 0,
+            "parse_failed": 0,
+            "parse_seconds": 0.0,
+            "not_modified": 0,
+        }
+        
+    def add(self, name, amount=1):
+        with self.lock:
+            self.counts[name] += amount
+            
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+            
+    def report_lines(self, page_queue=None):
+        """Describe each stage's throughput and which one is holding the run back."""
+        counts = self.snapshot()
+        avg_fetch = counts["fetch_seconds"] / counts["fetched"] if counts["fetched"] else 0
+        avg_parse = counts["parse_seconds"] / counts["parsed"] if counts["parsed"] else 0
+        lines = [
+            "Fetch stage: {} fetched, {} failed, {:.2f}s avg per page".format(
+                counts["fetched"], counts["fetch_failed"], avg_fetch),
+            "Parse stage: {} parsed, {} failed, {:.2f}s avg per page".format(
+                counts["parsed"], counts["parse_failed"], avg_parse),
+        ]
+        if counts["not_modified"]:
+            lines.append("Page cache: {} pages not modified (304)".format(counts["not_modified"]))
+        if page_queue is not None:
+            depth = page_queue.qsize()
+            lines.append("Pages waiting to be parsed: {}/{}".format(depth, page_queue.maxsize))
+            # A full queue means fetchers are blocked on the parsers; an empty one means parsers are starved
+            if page_queue.maxsize and depth >= page_queue.maxsize:
+                lines.append("Bottleneck: parse stage")
+            elif depth == 0 and counts["fetched"]:
+                lines.append("Bottleneck: fetch stage")
+        return lines
+
+# Bucket upper bounds for the run metrics histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+WRITE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+DEPTH_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+# name -> (type, help text, histogram buckets)
+METRIC_DEFINITIONS = {
+    "fetch_seconds": ("histogram", "Time from sending a request to reading the whole response", LATENCY_BUCKETS),
+    "connect_seconds": ("histogram", "Time to open a new connection, including the TLS handshake", LATENCY_BUCKETS),
+    "response_bytes": ("histogram", "Bytes downloaded per response, before decompression", SIZE_BUCKETS),
+    "parse_seconds": ("histogram", "Time to parse one notice page and extract its data", LATENCY_BUCKETS),
+    "extract_section_seconds": ("histogram", "Time to extract one section of a notice page", LATENCY_BUCKETS),
+    "queue_depth": ("histogram", "Items waiting in each pipeline queue, sampled once a second", DEPTH_BUCKETS),
+    "write_seconds": ("histogram", "Time to write the report file", WRITE_BUCKETS),
+    "retries_total": ("counter", "Requests and parses retried after an error", None),
+}
+
+# Cumulative histogram in the Prometheus style
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # The last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+        
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.max is None or value > self.max:
+            self.max = value
+            
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket that contains it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / float(bucket_count)
+            seen += bucket_count
+        return self.max
+        
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+# Thread-safe run metrics with Prometheus text and JSON export
+class MetricsRegistry:
+    """
+    Histograms and counters for one scraping run, keyed by metric name and labels.
+    
+    Metric names must be in METRIC_DEFINITIONS. Export with prometheus_text()
+    (the node_exporter textfile format) or summary() for a JSON-friendly dict
+    with estimated percentiles.
+    """
+    def __init__(self, prefix="oag_scraper"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}    # (name, labels) -> value
+        
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(METRIC_DEFINITIONS[name][2])
+            histogram.observe(value)
+            
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            
+    def format_labels(self, labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                              for k, v in pairs) + "}"
+        
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            for name in sorted(METRIC_DEFINITIONS):
+                kind, help_text, _ = METRIC_DEFINITIONS[name]
+                full_name = "{}_{}".format(self.prefix, name)
+                series = self.histograms if kind == "histogram" else self.counters
+                keys = sorted(key for key in series if key[0] == name)
+                if not keys:
+                    continue
+                lines.append("# HELP {} {}".format(full_name, help_text))
+                lines.append("# TYPE {} {}".format(full_name, kind))
+                for key in keys:
+                    labels = key[1]
+                    if kind == "counter":
+                        lines.append("{}{} {}".format(full_name, self.format_labels(labels), series[key]))
+                        continue
+                    histogram = series[key]
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += bucket_count
+                        lines.append("{}_bucket{} {}".format(
+                            full_name, self.format_labels(labels, [("le", bound)]), cumulative))
+                    lines.append("{}_sum{} {!r}".format(full_name, self.format_labels(labels), histogram.sum))
+                    lines.append("{}_count{} {}".format(full_name, self.format_labels(labels), histogram.count))
+        return "\n".join(lines) + "\n"
+        
+    def summary(self):
+        """Metrics as {name: [{"labels": {...}, ...values}]} for the JSON run summary."""
+        result = {}
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                entry = histogram.summary()
+                entry["labels"] = dict(labels)
+                result.setdefault(name, []).append(entry)
+            for (name, labels), value in sorted(self.counters.items()):
+                result.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return result
+
+# Write a file by renaming a temporary file over it, so readers never see half a file
+def write_file_atomically(path, content):
+    temp_path = "{}.tmp".format(path)
+    with open(temp_path, "w") as f:
+        f.write(content)
+    os.rename(temp_path, path)
+
+# Process-wide run metrics
+_metrics = MetricsRegistry()
+
+def configure_metrics():
+    """Start a fresh set of run metrics."""
+    global _metrics
+    _metrics = MetricsRegistry()
+    return _metrics
+
+def get_metrics():
+    return _metrics
+
+# Record a parsed page's timings from parse_notice_page
+def record_parse_metrics(elapsed, section_timings):
+    metrics = get_metrics()
+    metrics.observe("parse_seconds", elapsed)
+    for section, seconds in section_timings:
+        metrics.observe("extract_section_seconds", seconds, section=section)
+
+# cProfile and stack sampling for a fraction of pages
+class PageProfiler:
+    """
+    Profiles process_url_data on a random fraction of pages.
+    
+    Each sampled page runs under a per-thread cProfile.Profile while a
+    background thread (running only while a sampled page is being
+    processed) records its stack every interval seconds, giving
+    both exact call counts and flamegraph-ready stacks rooted at
+    process_url_data. Parser pool processes inherit the profiler when
+    forked. Every process writes its own files to output_dir after each
+    sampled page, because pool workers exit without running cleanup.
+    merge_profiles() combines them at the end of the run.
+    """
+    root_function = "process_url_data"
+    
+    def __init__(self, output_dir, fraction=0.05, interval=0.005):
+        self.output_dir = output_dir
+        self.fraction = fraction
+        self.interval = interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.active = set()
+        self.stacks = collections.Counter()
+        self.sampling = False
+        self.pid = os.getpid()
+        
+    def should_profile(self):
+        return random.random() < self.fraction
+        
+    def sample_stacks(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.active:
+                    self.sampling = False
+                    return
+                frames = sys._current_frames()
+                for ident in self.active:
+                    stack = self.collapse_stack(frames.get(ident))
+                    if stack:
+                        self.stacks[stack] += 1
+                        
+    def collapse_stack(self, frame):
+        """Frames from process_url_data down to frame, as "func (file:line);..." ."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append("{} ({}:{})".format(code.co_name, os.path.basename(code.co_filename),
+                                             code.co_firstlineno))
+            if code.co_name == self.root_function:
+                return ";".join(reversed(names))
+            frame = frame.f_back
+        return None
+        
+    def run(self, func, *args):
+        """Call func(*args) under the profilers."""
+        profiler = getattr(self.local, "profiler", None)
+        if profiler is None:
+            profiler = self.local.profiler = cProfile.Profile()
+        ident = threading.current_thread().ident
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked into a pool process: the parent's sampler thread and stacks stay behind
+                self.pid = os.getpid()
+                self.stacks = collections.Counter()
+                self.sampling = False
+            self.active.add(ident)
+            start_sampler = not self.sampling
+            self.sampling = True
+        if start_sampler:
+            sampler = threading.Thread(target=self.sample_stacks, name="StackSampler")
+            sampler.daemon = True
+            sampler.start()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            with self.lock:
+                self.active.discard(ident)
+            self.flush(profiler, ident)
+            
+    def flush(self, profiler, ident):
+        prefix = os.path.join(self.output_dir, "{}-{}".format(os.getpid(), ident))
+        try:
+            profiler.dump_stats(prefix + ".prof.tmp")
+            os.rename(prefix + ".prof.tmp", prefix + ".prof")
+            with self.lock:
+                lines = ["{} {}\n".format(stack, count) for stack, count in sorted(self.stacks.items())]
+            write_file_atomically(os.path.join(self.output_dir, "{}.collapsed".format(os.getpid())),
+                                  "".join(lines))
+        except (IOError, OSError) as e:
+            logging.error("Could not write profile to {}: {}".format(self.output_dir, e))
+
+# Process-wide page profiler, enabled with --profile
+_page_profiler = None
+
+def configure_page_profiler(output_dir=None, fraction=0.05):
+    """Profile this fraction of pages into output_dir (None turns profiling off)."""
+    global _page_profiler
+    _page_profiler = None
+    if output_dir and fraction > 0:
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        _page_profiler = PageProfiler(output_dir, fraction)
+    return _page_profiler
+
+def get_page_profiler():
+    return _page_profiler
+
+# process_url_data as a Notice record, under the page profiler when this page is sampled
+def extract_notice_data(url, soup, backend, section_timings=None):
+    profiler = _page_profiler
+    if profiler is not None and profiler.should_profile():
+        return profiler.run(process_url_data, url, soup, backend, section_timings, True)
+    return process_url_data(url, soup, backend, section_timings, True)
+
+# Combine the per-process profile files into one report
+def merge_profiles(profile_dir, output_prefix):
+    """
+    Merge the .prof and .collapsed files a PageProfiler wrote to profile_dir.
+    
+    Writes output_prefix.pstats (load with pstats or snakeviz), a text
+    summary in output_prefix.txt and output_prefix.collapsed, which
+    flamegraph.pl and speedscope read directly.
+    
+    Returns:
+        List of files written, empty if no page was profiled
+    """
+    names = sorted(os.listdir(profile_dir)) if os.path.isdir(profile_dir) else []
+    prof_files = [os.path.join(profile_dir, n) for n in names if n.endswith(".prof")]
+    if not prof_files:
+        return []
+    stats = pstats.Stats(prof_files[0])
+    for path in prof_files[1:]:
+        stats.add(path)
+    stats.dump_stats(output_prefix + ".pstats")
+    
+    with open(output_prefix + ".txt", "w") as f:
+        report = pstats.Stats(output_prefix + ".pstats", stream=f)
+        report.sort_stats("cumulative").print_stats(40)
+        report.sort_stats("tottime").print_stats("process_url_data|extract_section_data|extract_value")
+        
+    stacks = collections.Counter()
+    for name in names:
+        if name.endswith(".collapsed"):
+            with open(os.path.join(profile_dir, name)) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack and count.isdigit():
+                        stacks[stack] += int(count)
+    with open(output_prefix + ".collapsed", "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write("{} {}\n".format(stack, count))
+    return [output_prefix + ".pstats", output_prefix + ".txt", output_prefix + ".collapsed"]
+            
+# URL queue that hands out the highest-priority URL first
+class PriorityURLQueue(Queue.PriorityQueue):
+    """
+    Queue.PriorityQueue for url_worker: put((priority, url)) and get() returns
+    just the URL with the lowest priority value. URLs with equal priority
+    come out in the order they were added.
+    """
+    def _init(self, maxsize):
+        Queue.PriorityQueue._init(self, maxsize)
+        self.sequence = itertools.count()
+        
+    def _put(self, item):
+        priority, url = item
+        heapq.heappush(self.queue, (priority, next(self.sequence), url))
+        
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+# Exponential backoff with jitter
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """
+    Delay before retry number attempt: base * 2**(attempt - 1), capped at cap,
+    then jittered to between half and all of that so retrying workers spread out.
+    """
+    delay = min(cap, base * (2 ** max(0, attempt - 1)))
+    return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+# Parse a Retry-After header value into seconds
+def parse_retry_after(value):
+    """Return the seconds a Retry-After header asks for (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    import email.utils
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+def get_retry_after(error):
+    """Retry-After from an HTTPError's headers, in seconds, or None."""
+    headers = getattr(error, "hdrs", None)
+    if headers is None:
+        return None
+    return parse_retry_after(headers.get("retry-after"))
+
+def retry_wait(error, attempt, base_delay):
+    """Seconds to wait before retrying: the server's Retry-After if longer, else jittered backoff."""
+    return max(get_retry_after(error) or 0, backoff_delay(attempt, base_delay))
+
+# Concurrency state for one host
+class HostConcurrency:
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.blocked_until = 0
+        self.latency = None
+        self.baseline_latency = None
+        self.last_decrease = 0
+        self.congestion_streak = 0
+        self.throttled = 0
+
+# AIMD concurrency limit per host
+class AdaptiveConcurrencyController:
+    """
+    Additive-increase/multiplicative-decrease limit on concurrent requests per host.
+    
+    Every request takes a slot with acquire() and reports how it went with
+    release(). While responses are quick the limit grows by about one per
+    round of requests. A 429/503, timeout or connection error halves it, at
+    most once per second so a burst of failures only counts once. The host
+    is then paused for the server's Retry-After, or for a jittered
+    exponential backoff if it sent none. When latency rises above
+    latency_factor times the best latency seen, the limit stops growing.
+    """
+    throttle_statuses = (429, 503)
+    
+    def __init__(self, initial_limit=5, min_limit=1, max_limit=50, latency_factor=2.0,
+                 backoff_base=1.0, backoff_cap=60.0):
+        self.initial_limit = max(min_limit, min(initial_limit, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_factor = latency_factor
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.condition = threading.Condition()
+        self.hosts = {}
+        
+    def host_state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostConcurrency(self.initial_limit)
+        return state
+        
+    def slot_available(self, state):
+        if time.time() < state.blocked_until:
+            return False
+        return state.in_flight < int(state.limit)
+        
+    def acquire(self, host):
+        """Block until a request to host may start."""
+        with self.condition:
+            state = self.host_state(host)
+            while not self.slot_available(state):
+                wait = state.blocked_until - time.time()
+                self.condition.wait(min(max(wait, 0.05), 1.0))
+            state.in_flight += 1
+            
+    def try_acquire(self, host):
+        """Take a slot for host if one is free right now."""
+        with self.condition:
+            state = self.host_state(host)
+            if not self.slot_available(state):
+                return False
+            state.in_flight += 1
+            return True
+            
+    def release(self, host, status=None, latency=None, retry_after=None, error=False):
+        """
+        Return a slot and adjust the limit.
+        
+        Args:
+            host: Host the request went to
+            status: HTTP status of the response, or None if there was none
+            latency: Seconds the request took
+            retry_after: Seconds from a Retry-After header, if any
+            error: True for timeouts and connection errors
+        
+        With neither a status nor error, the slot is returned without
+        adjusting the limit.
+        """
+        with self.condition:
+            state = self.host_state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            if error or status in self.throttle_statuses:
+                self.on_congestion(state, retry_after)
+            elif status is not None:
+                self.on_success(state, latency)
+            self.condition.notify_all()
+            
+    def on_success(self, state, latency):
+        state.congestion_streak = 0
+        if latency is not None:
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            if state.baseline_latency is None or state.latency < state.baseline_latency:
+                state.baseline_latency = state.latency
+            if state.latency > self.latency_factor * state.baseline_latency:
+                return  # Server is slowing down; hold the limit
+        state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+        
+    def on_congestion(self, state, retry_after):
+        now = time.time()
+        state.throttled += 1
+        state.congestion_streak += 1
+        if now - state.last_decrease >= 1.0:
+            state.limit = max(self.min_limit, state.limit / 2.0)
+            state.last_decrease = now
+        delay = max(retry_after or 0, backoff_delay(state.congestion_streak, self.backoff_base, self.backoff_cap))
+        state.blocked_until = max(state.blocked_until, now + delay)
+        
+    def report_lines(self):
+        with self.condition:
+            return ["Host {}: concurrency limit {:.1f} ({}-{}), {} in flight, throttled {} times".format(
+                        host, state.limit, self.min_limit, self.max_limit, state.in_flight, state.throttled)
+                    for host, state in sorted(self.hosts.items())]
+
+# Global requests-per-second ceiling
+class TokenBucket:
+    """
+    Token bucket shared by everything that sends requests.
+    
+    Tokens refill at rate per second up to burst, and each request spends
+    one. acquire() reserves the next token and sleeps until it is due, so
+    waiting threads are served in order and the long-run rate never goes
+    above rate however many threads are running. try_acquire() is the
+    non-blocking form for the event loop. Time spent waiting is recorded
+    for the end-of-run report.
+    """
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("Request rate must be positive, got {}".format(rate))
+        self.rate = float(rate)
+        self.burst = float(max(1, burst if burst is not None else rate))
+        self.tokens = self.burst
+        self.updated = time.time()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        
+    def record_wait(self, seconds):
+        """Count one request that waited seconds for its token (caller holds the lock)."""
+        self.requests += 1
+        if seconds > 0:
+            self.waited += 1
+            self.wait_seconds += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            
+    def acquire(self):
+        """Block until a token is available; returns the seconds waited."""
+        with self.lock:
+            self.refill(time.time())
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.record_wait(wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+        
+    def try_acquire(self, waited=0.0):
+        """Take a token if one is available now, counting waited seconds already spent."""
+        with self.lock:
+            self.refill(time.time())
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.record_wait(waited)
+            return True
             
+    def next_token_in(self):
+        """Seconds until try_acquire can next succeed."""
+        with self.lock:
+            self.refill(time.time())
+            return max(0.0, (1 - self.tokens) / self.rate)
+            
+    def report_lines(self):
+        with self.lock:
+            avg_wait = self.wait_seconds / self.requests if self.requests else 0
+            return ["Request budget: {:g}/s (burst {:g}), {} requests, {} waited "
+                    "(avg {:.3f}s, max {:.2f}s, total {:.1f}s)".format(
+                        self.rate, self.burst, self.requests, self.waited,
+                        avg_wait, self.max_wait, self.wait_seconds)]
+
+# Process-wide request budget, enabled with --max-rps
+_request_budget = None
+
+def configure_request_budget(rate=None, burst=None):
+    """Cap every outbound request at rate per second (None removes the cap)."""
+    global _request_budget
+    _request_budget = TokenBucket(rate, burst) if rate else None
+    return _request_budget
+
+def get_request_budget():
+    return _request_budget
+
+# Decode a gzip or deflate encoded response body
+def decode_content_body(body, content_encoding):
+    """
+    Decode a response body according to its Content-Encoding header.
+    
+    Args:
+        body: Raw response body bytes
+        content_encoding: Value of the Content-Encoding header (may be None)
+        
+    Returns:
+        The decoded body bytes
+    """
+    encoding = (content_encoding or "").strip().lower()
+    if not body or encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        # 16 + MAX_WBITS tells zlib to expect a gzip header
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate data without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+class FetchResponse:
+    """Fully read HTTP response returned by HTTPFetcher."""
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        
+    def read(self):
+        return self.body
+        
+    def getcode(self):
+        return self.status
+        
+    def geturl(self):
+        return self.url
+        
+    def info(self):
+        return self.headers
+
+class HTTPConnectionPool:
+    """Pool of keep-alive connections to a single scheme/host/port."""
+    def __init__(self, scheme, host, port, maxsize, ssl_context, timeout):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.timeout = timeout
+        self.pool = Queue.LifoQueue(maxsize=maxsize)
+        
+    def new_connection(self):
+        if self.scheme == "https":
+            return httplib.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                           context=self.ssl_context)
+        return httplib.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        
+    def get_connection(self):
+        """Return an idle connection and whether it was reused."""
+        try:
+            return self.pool.get(block=False), True
+        except Queue.Empty:
+            return self.new_connection(), False
+            
+    def release_connection(self, conn):
+        try:
+            self.pool.put(conn, block=False)
+        except Queue.Full:
+            conn.close()
+            
+    def close(self):
+        while True:
+            try:
+                self.pool.get(block=False).close()
+            except Queue.Empty:
+                break
+
+class HTTPFetcher:
+    """
+    Shared HTTP client with per-host keep-alive connection pools.
+    
+    All threads share one SSL context and reuse open connections, so each
+    notice fetch no longer pays a fresh TCP and TLS handshake. Responses are
+    read fully and gzip/deflate bodies are decoded transparently. HTTP errors
+    are raised as urllib2.HTTPError and network errors as urllib2.URLError so
+    callers can keep the same exception handling they used with urlopen.
+    """
+    user_agent = "Mozilla/5.0 (compatible; oag-ca-gov-scraper)"
+    
+    def __init__(self, pool_size=5, timeout=30, max_redirects=5, controller=None):
+        self.pool_size = max(1, pool_size)
+        self.controller = controller
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        # Certificate validation is disabled, matching the previous urlopen calls
+        self.ssl_context = ssl._create_unverified_context()
+        self.pools = {}
+        self.lock = threading.Lock()
+        
+    def get_pool(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self.lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = HTTPConnectionPool(scheme, host, port, self.pool_size,
+                                          self.ssl_context, self.timeout)
+                self.pools[key] = pool
+            return pool
+            
+    def send(self, url, method, headers, body_limit=None):
+        """
+        Send one request, holding a slot from the concurrency controller if
+        there is one and drawing a token from the request budget.
+        """
+        controller = self.controller
+        budget = get_request_budget()
+        host = urlparse.urlsplit(url).hostname
+        if controller:
+            controller.acquire(host)
+        try:
+            if budget:
+                budget.acquire()
+            start = time.time()
+            response, body = self.send_request(url, method, headers, body_limit)
+        except BaseException:
+            # Every failure hands the slot back, or the host would run with one slot fewer from now on
+            if controller:
+                controller.release(host, error=True)
+            raise
+        latency = time.time() - start
+        if controller:
+            controller.release(host, status=response.status, latency=latency,
+                               retry_after=parse_retry_after(response.getheader("retry-after")))
+        metrics = get_metrics()
+        metrics.observe("fetch_seconds", latency, method=method)
+        metrics.observe("response_bytes", len(body))
+        return response, body
+        
+    def send_request(self, url, method, headers, body_limit=None):
+        parsed = urlparse.urlsplit(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise urllib2.URLError("Unsupported URL scheme: {}".format(url))
+        port = parsed.port or (443 if scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+            
+        request_headers = {
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": self.user_agent,
+        }
+        request_headers.update(headers or {})
+        
+        pool = self.get_pool(scheme, parsed.hostname, port)
+        # A reused connection may have been closed by the server while idle,
+        # so a failure on a reused connection is retried once on a fresh one
+        for attempt in range(2):
+            conn, reused = pool.get_connection()
+            try:
+                if not reused:
+                    connect_start = time.time()
+                    conn.connect()
+                    get_metrics().observe("connect_seconds", time.time() - connect_start)
+                conn.request(method, path, headers=request_headers)
+                response = conn.getresponse()
+                length = response.getheader("content-length", "")
+                too_long = not (length.isdigit() and int(length) <= body_limit) if body_limit is not None else False
+                if method != "HEAD" and too_long:
+                    # Only the status is wanted; drop the connection rather than read a large body
+                    conn.close()
+                    return response, ""
+                # httplib returns "" for HEAD, but the read is still needed to
+                # mark the response finished so the connection can be reused
+                body = response.read()
+            except (httplib.HTTPException, socket.error) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise urllib2.URLError(e)
+                
+            if response.getheader("connection", "").lower() == "close" or response.will_close:
+                conn.close()
+            else:
+                pool.release_connection(conn)
+            return response, body
+            
+    def request(self, url, method="GET", headers=None, body_limit=None):
+        """
+        Fetch a URL, following redirects.
+        
+        Args:
+            url: The URL to fetch
+            method: HTTP method (default: GET)
+            headers: Optional dictionary of extra request headers
+            body_limit: If set, bodies larger than this many bytes (or of unknown
+                length) are not read and the body is returned empty
+            
+        Returns:
+            FetchResponse with the decoded body
+            
+        Raises:
+            urllib2.HTTPError: For responses with a 4xx/5xx status
+            urllib2.URLError: For connection and protocol errors
+        """
+        for _ in range(self.max_redirects + 1):
+            response, body = self.send(url, method, headers, body_limit)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("location"):
+                url = urlparse.urljoin(url, response.getheader("location"))
+                if response.status == 303:
+                    method = "GET"
+                continue
+                
+            try:
+                body = decode_content_body(body, response.getheader("content-encoding"))
+            except zlib.error as e:
+                raise urllib2.URLError("Could not decode response from {}: {}".format(url, e))
+                
+            if response.status >= 400:
+                raise urllib2.HTTPError(url, response.status, response.reason,
+                                        response.msg, StringIO.StringIO(body))
+            return FetchResponse(url, response.status, response.reason, response.msg, body)
+            
+        raise urllib2.URLError("Too many redirects for {}".format(url))
+        
+    def close(self):
+        with self.lock:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools = {}
+
+# Process-wide fetcher shared by url_worker and discovery
+_http_fetcher = None
+_http_fetcher_lock = threading.Lock()
+
+def configure_http_fetcher(pool_size=5, timeout=30, controller=None):
+    """
+    Replace the shared fetcher, sizing its per-host pools (e.g. from --threads)
+    and optionally gating requests with an AdaptiveConcurrencyController.
+    """
+    global _http_fetcher
+    with _http_fetcher_lock:
+        if _http_fetcher is not None:
+            _http_fetcher.close()
+        _http_fetcher = HTTPFetcher(pool_size=pool_size, timeout=timeout, controller=controller)
+        return _http_fetcher
+
+def get_http_fetcher():
+    global _http_fetcher
+    with _http_fetcher_lock:
+        if _http_fetcher is None:
+            _http_fetcher = HTTPFetcher()
+        return _http_fetcher
+
+def fetch_url(url, method="GET", headers=None):
+    """Fetch a URL through the shared keep-alive HTTP fetcher."""
+    return get_http_fetcher().request(url, method=method, headers=headers)
+
+# Largest body read from a ranged GET probe before the connection is dropped instead
+PROBE_BODY_LIMIT = 1024
+
+def probe_url(url, method="HEAD"):
+    """
+    Request only the status of a URL, without downloading the page.
+    
+    Args:
+        url: The URL to check
+        method: "HEAD", or "GET" for a one-byte ranged GET whose body is not
+            read if the server ignores the range
+        
+    Returns:
+        FetchResponse with an empty or one-byte body
+        
+    Raises:
+        urllib2.HTTPError: For responses with a 4xx/5xx status
+        urllib2.URLError: For connection and protocol errors
+    """
+    if method == "HEAD":
+        return fetch_url(url, method="HEAD")
+    return get_http_fetcher().request(url, headers={"Range": "bytes=0-0", "Accept-Encoding": "identity"},
+                                      body_limit=PROBE_BODY_LIMIT)
+
+# On-disk cache of fetched notice HTML
+class PageCache:
+    """
+    Content-addressed cache of raw notice pages with HTTP validators.
+    
+    Page bodies are stored zlib-compressed under objects/, named by the SHA-1
+    of the content, so identical pages are stored once. A small JSON entry
+    per URL under index/ records the content hash and the ETag and
+    Last-Modified headers, which are sent back as If-None-Match and
+    If-Modified-Since so an unchanged page costs a 304 instead of a download.
+    Files are written to a temporary name and renamed, so concurrent writers
+    and interrupted runs never leave partial entries behind.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_dir = os.path.join(cache_dir, "index")
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        
+    def index_path(self, url):
+        digest = hashlib.sha1(url).hexdigest()
+        return os.path.join(self.index_dir, digest[:2], digest + ".json")
+        
+    def object_path(self, content_hash):
+        return os.path.join(self.objects_dir, content_hash[:2], content_hash)
+        
+    def write_file(self, path, data):
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass  # Directory already exists
+        temp_path = "{}.{}.{}.tmp".format(path, os.getpid(), threading.current_thread().ident)
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.rename(temp_path, path)
+        
+    def lookup(self, url):
+        """Return the cache entry for a URL, or None if it has not been cached."""
+        try:
+            with open(self.index_path(url), "r") as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+            
+    def read(self, entry):
+        """Return the cached HTML for a cache entry, or None if it is missing."""
+        if not entry:
+            return None
+        try:
+            with open(self.object_path(entry["content_hash"]), "rb") as f:
+                return zlib.decompress(f.read())
+        except (IOError, zlib.error, KeyError):
+            return None
+            
+    def get(self, url):
+        return self.read(self.lookup(url))
+        
+    def conditional_headers(self, entry):
+        """Headers that ask the server to answer 304 if the cached page is still current."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+        
+    def store(self, url, content, etag=None, last_modified=None):
+        content_hash = hashlib.sha1(content).hexdigest()
+        object_path = self.object_path(content_hash)
+        if not os.path.exists(object_path):
+            self.write_file(object_path, zlib.compress(content))
+        entry = {
+            "url": url,
+            "content_hash": content_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.write_file(self.index_path(url), json.dumps(entry))
+        return entry
+        
+    def iter_entries(self):
+        """Yield every cache entry."""
+        if not os.path.isdir(self.index_dir):
+            return
+        for root, _, files in os.walk(self.index_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    try:
+                        with open(os.path.join(root, name), "r") as f:
+                            yield json.load(f)
+                    except (IOError, ValueError):
+                        continue
+
+# Process-wide page cache, enabled with --cache-dir
+_page_cache = None
+
+def configure_page_cache(cache_dir):
+    """Enable (or with None, disable) the shared page cache."""
+    global _page_cache
+    _page_cache = PageCache(cache_dir) if cache_dir else None
+    return _page_cache
+
+def get_page_cache():
+    return _page_cache
+
+def fetch_notice_page(url, stats=None):
+    """
+    Fetch a notice page's HTML, revalidating against the page cache when one
+    is configured.
+    
+    Args:
+        url: Notice URL
+        stats: Optional PipelineStats to count pages answered with 304
+        
+    Returns:
+        The page HTML
+    """
+    cache = _page_cache
+    if cache is None:
+        return fetch_url(url).read()
+    entry = cache.lookup(url)
+    response = fetch_url(url, headers=cache.conditional_headers(entry))
+    if response.getcode() == 304:
+        content = cache.read(entry)
+        if content is not None:
+            if stats:
+                stats.add("not_modified")
+            return content
+        # The cached body has gone missing; fetch the page again unconditionally
+        response = fetch_url(url)
+    content = response.read()
+    headers = response.info()
+    cache.store(url, content, headers.getheader("etag"), headers.getheader("last-modified"))
+    return content
+
 # Thread worker function to process URLs
-def url_worker(url_queue, results_queue, failed_urls, counter, max_retries=3, retry_delay=5):
+def url_worker(url_queue, results_queue, failed_urls, counter, max_retries=3, retry_delay=5,
+               page_queue=None, stats=None, parser_backend=None):
     """
     Worker function for thread pool to process URLs.
     
     Args:
-        url_queue: Queue containing URLs to process
+        url_queue: Queue containing URLs to process. The worker blocks until a
+            URL arrives and stops at the first None sentinel, so URLs can keep
+            being added while it runs
         results_queue: Queue to store processed results
         failed_urls: Shared list to track failed URLs
         counter: AtomicCounter to track progress
         max_retries: Maximum number of retry attempts
-        retry_delay: Delay between retries in seconds
+        retry_delay: Base delay between retries in seconds, doubled on each retry
+            with jitter; a longer Retry-After from the server wins
+        page_queue: Optional bounded Queue for the parse stage. When given, the
+            worker only fetches and hands (url, page_content) to the parse stage
+        stats: Optional PipelineStats to record fetch counts and timings
+        parser_backend: Parser backend name used when parsing in this thread (default: index)
     """
-    while not url_queue.empty():
+    while True:
         try:
-            url = url_queue.get(block=False)
+            url = url_queue.get()
             thread_id = threading.current_thread().name
+            if url is None:
+                url_queue.task_done()
+                break
             
             # Track URL processing count for progress reporting
             current_count = counter.increment()
@@ -65,16 +1132,28 @@ def url_worker(url_queue, results_queue, failed_urls, counter, max_retries=3, re
                         logging.info("Thread {}: Processing URL {} (Attempt {}/{})".format(
                             thread_id, url, retries+1, max_retries))
                     
-                    # Create SSL context that ignores certificate validation
-                    context = ssl._create_unverified_context()
-                    response = urllib2.urlopen(url, context=context)
-                    page_content = response.read()
+                    # Fetch over the shared keep-alive connection pool
+                    fetch_start = time.time()
+                    page_content = fetch_notice_page(url, stats)
+                    if stats:
+                        stats.add("fetched")
+                        stats.add("fetch_seconds", time.time() - fetch_start)
+                    
+                    if page_queue is not None:
+                        # Hand off to the parse stage; blocks while the parsers are behind
+                        page_queue.put((url, page_content))
+                        success = True
+                        continue
                     
-                    # Parse the page using BeautifulSoup
-                    soup = BeautifulSoup(page_content, "html.parser")
+                    # Parse the page with the selected backend (BeautifulSoup by default)
+                    parse_start = time.time()
+                    backend = get_parser_backend(parser_backend or "index")
+                    soup = backend.parse(page_content)
                     
                     # Process the data (this will be defined in the main function)
-                    data = process_url_data(url, soup)
+                    section_timings = []
+                    data = extract_notice_data(url, soup, backend, section_timings)
+                    record_parse_metrics(time.time() - parse_start, section_timings)
                     
                     # Add to results queue
                     results_queue.put(data)
@@ -88,11 +1167,15 @@ def url_worker(url_queue, results_queue, failed_urls, counter, max_retries=3, re
                     logging.error(error_msg)
                     
                     if retries < max_retries:
-                        logging.info("Thread {}: Retrying in {} seconds...".format(thread_id, retry_delay))
-                        time.sleep(retry_delay)
+                        wait = retry_wait(e, retries, retry_delay)
+                        get_metrics().inc("retries_total", stage="fetch")
+                        logging.info("Thread {}: Retrying in {:.1f} seconds...".format(thread_id, wait))
+                        time.sleep(wait)
                     else:
                         with threading.Lock():
                             failed_urls.append(url)
+                        if stats:
+                            stats.add("fetch_failed")
                 except Exception as e:
                     retries += 1
                     error_msg = "Thread {}: Error processing URL: {} - {} (Attempt {}/{})".format(
@@ -101,56 +1184,772 @@ def url_worker(url_queue, results_queue, failed_urls, counter, max_retries=3, re
                     logging.error(error_msg)
                     
                     if retries < max_retries:
-                        logging.info("Thread {}: Retrying in {} seconds...".format(thread_id, retry_delay))
-                        time.sleep(retry_delay)
+                        wait = backoff_delay(retries, retry_delay)
+                        get_metrics().inc("retries_total", stage="parse")
+                        logging.info("Thread {}: Retrying in {:.1f} seconds...".format(thread_id, wait))
+                        time.sleep(wait)
                     else:
                         with threading.Lock():
                             failed_urls.append(url)
                 
             url_queue.task_done()
             
-        except Queue.Empty:
-            break  # Queue is empty, exit the worker
         except Exception as e:
             logging.error("Thread {}: Unexpected error: {}".format(thread_id, str(e)))
             break
 
+# Parse a fetched notice page (runs in the parsing process pool)
+def parse_notice_page(url, page_content, parser_backend="index"):
+    """
+    Parse raw notice HTML and extract its data.
+    
+    This is a module-level function so it can be sent to a multiprocessing
+    pool. Errors are returned rather than raised so the caller can retry the
+    URL in the same way url_worker does.
+    
+    Args:
+        url: The URL the page was fetched from
+        page_content: Raw HTML of the page
+        parser_backend: Parser backend name (default: index)
+        
+    Returns:
+        Tuple of (url, data, error, elapsed, section_timings) where data is the
+        Notice record, or None if parsing failed, error is the
+        error message, elapsed is the parse time in seconds and section_timings
+        lists (section type, seconds) for each section extracted
+    """
+    start = time.time()
+    section_timings = []
+    try:
+        backend = get_parser_backend(parser_backend)
+        soup = backend.parse(page_content)
+        data = extract_notice_data(url, soup, backend, section_timings)
+        return url, data, None, time.time() - start, section_timings
+    except Exception as e:
+        return url, None, str(e), time.time() - start, section_timings
+
+# Seconds a page may spend on the parse pool before it is given up as lost
+PARSE_TIMEOUT = 300
+
+# Pages handed to a multiprocessing pool, each finished exactly once
+class ParseJobs(object):
+    """
+    Submits parse_notice_page calls to a multiprocessing pool and makes sure
+    every one of them reaches its callback.
+    
+    Python 2's Pool.apply_async has no error callback, so a result that cannot
+    be pickled back never calls it, and a job whose worker process died never
+    finishes at all. reap() passes the callback an error result for any job
+    that failed, or that has had no result after timeout seconds, so a slot or
+    pending count released by the callback is never leaked. A late result for
+    a job that was already reaped is ignored.
+    """
+    def __init__(self, pool, timeout=PARSE_TIMEOUT):
+        self.pool = pool
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.jobs = {}        # job id -> [url, callback, async result, deadline]
+        self.ids = itertools.count()
+        self.lost = 0
+        
+    def __len__(self):
+        with self.lock:
+            return len(self.jobs)
+            
+    def submit(self, url, page_content, parser_backend, callback):
+        job_id = next(self.ids)
+        with self.lock:
+            self.jobs[job_id] = [url, callback, None, time.time() + self.timeout]
+        async_result = self.pool.apply_async(parse_notice_page, (url, page_content, parser_backend),
+                                             callback=lambda result: self.finish(job_id, result))
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id][2] = async_result
+                
+    def finish(self, job_id, result):
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+        if job is not None:
+            job[1](result)
+            
+    def reap(self):
+        """Finish failed and timed-out jobs with an error result."""
+        now = time.time()
+        with self.lock:
+            jobs = list(self.jobs.items())
+        for job_id, (url, callback, async_result, deadline) in jobs:
+            if async_result is None:
+                continue
+            # A successful result has already been through the callback once it is ready
+            if async_result.ready() and not async_result.successful():
+                try:
+                    async_result.get(0)
+                    error = "Parse failed"
+                except Exception as e:
+                    error = "Parse failed: {}".format(e)
+                self.finish(job_id, (url, None, error, 0.0, []))
+            elif not async_result.ready() and now > deadline:
+                self.lost += 1
+                self.finish(job_id, (url, None, "No parse result after {:.0f}s".format(self.timeout), 0.0, []))
+                
+    def close(self, poll_interval=0.1):
+        """Wait until every job has finished or been reaped, then shut the pool down."""
+        while len(self):
+            self.reap()
+            time.sleep(poll_interval)
+        self.pool.close()
+        if self.lost:
+            # The pool still counts lost jobs as outstanding, so join() would wait forever
+            self.pool.terminate()
+        else:
+            self.pool.join()
+
+# Parse stage of the threaded pipeline
+def parse_stage_worker(page_queue, results_queue, failed_urls, processes=None, max_pending=None,
+                       stats=None, parser_backend="index"):
+    """
+    Parse fetched pages on a multiprocessing pool so BeautifulSoup work does not
+    hold the GIL that the fetch threads need.
+    
+    Reads (url, page_content) items from page_queue until a None sentinel is
+    received. Pages that fail to parse are added to failed_urls.
+    
+    Args:
+        page_queue: Bounded Queue of (url, page_content) tuples from url_worker
+        results_queue: Queue to store processed results
+        failed_urls: Shared list to track failed URLs
+        processes: Number of parser processes (default: all cores)
+        max_pending: Maximum pages submitted to the pool at once (default: 2 per process)
+        stats: Optional PipelineStats to record parse counts and timings
+        parser_backend: Parser backend name (default: index)
+    """
+    processes = processes or multiprocessing.cpu_count()
+    slots = threading.BoundedSemaphore(max_pending or processes * 2)
+    
+    def on_parsed(result):
+        url, data, error, elapsed, section_timings = result
+        if error is None:
+            results_queue.put(data)
+            record_parse_metrics(elapsed, section_timings)
+            if stats:
+                stats.add("parsed")
+                stats.add("parse_seconds", elapsed)
+        else:
+            error_msg = "Parser: Error processing URL: {} - {}".format(url, error)
+            print(error_msg)
+            logging.error(error_msg)
+            failed_urls.append(url)
+            if stats:
+                stats.add("parse_failed")
+        slots.release()
+    
+    parse_jobs = ParseJobs(multiprocessing.Pool(processes=processes))
+    stop_reaping = threading.Event()
+    
+    def reap():
+        # Free the slots of pages whose result will never reach on_parsed
+        while not stop_reaping.is_set():
+            parse_jobs.reap()
+            stop_reaping.wait(1.0)
+            
+    reaper = threading.Thread(target=reap, name="ParseReaper")
+    reaper.daemon = True
+    reaper.start()
+    try:
+        while True:
+            item = page_queue.get()
+            if item is None:
+                break
+            # Limit work handed to the pool so the bounded page_queue applies backpressure
+            slots.acquire()
+            url, page_content = item
+            parse_jobs.submit(url, page_content, parser_backend, on_parsed)
+    finally:
+        parse_jobs.close()
+        stop_reaping.set()
+
+class HTTPResponseParser:
+    """Incremental HTTP/1.1 response parser used by the event loop engine."""
+    def __init__(self, method="GET"):
+        self.method = method
+        self.buffer = ""
+        self.status = None
+        self.reason = ""
+        self.headers = None
+        self.body_parts = []
+        self.mode = None
+        self.remaining = 0
+        self.chunk_left = None
+        self.in_trailer = False
+        self.will_close = False
+        self.complete = False
+        
+    def parse_head(self):
+        index = self.buffer.find("\r\n\r\n")
+        if index < 0:
+            return False
+        lines = self.buffer[:index].split("\r\n")
+        self.buffer = self.buffer[index + 4:]
+        status_parts = lines[0].split(" ", 2)
+        if len(status_parts) < 2 or not status_parts[0].startswith("HTTP/"):
+            raise httplib.BadStatusLine(lines[0])
+        self.status = int(status_parts[1])
+        self.reason = status_parts[2] if len(status_parts) > 2 else ""
+        self.headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                self.headers[key.strip().lower()] = value.strip()
+                
+        self.will_close = (status_parts[0] == "HTTP/1.0" or
+                           self.headers.get("connection", "").lower() == "close")
+        if self.method == "HEAD" or self.status in (204, 304) or self.status < 200:
+            self.complete = True
+        elif "chunked" in self.headers.get("transfer-encoding", "").lower():
+            self.mode = "chunked"
+        elif "content-length" in self.headers:
+            self.mode = "length"
+            self.remaining = int(self.headers["content-length"])
+            self.complete = self.remaining == 0
+        else:
+            # Body runs until the server closes the connection
+            self.mode = "eof"
+            self.will_close = True
+        return True
+        
+    def parse_chunks(self):
+        while not self.complete:
+            if self.in_trailer:
+                if self.buffer.startswith("\r\n"):
+                    self.complete = True
+                else:
+                    index = self.buffer.find("\r\n\r\n")
+                    if index >= 0:
+                        self.complete = True
+                if self.complete:
+                    self.buffer = ""
+                return
+            if self.chunk_left is None:
+                index = self.buffer.find("\r\n")
+                if index < 0:
+                    return
+                size = int(self.buffer[:index].split(";")[0].strip(), 16)
+                self.buffer = self.buffer[index + 2:]
+                if size == 0:
+                    self.in_trailer = True
+                    continue
+                # Include the CRLF that terminates the chunk data
+                self.chunk_left = size + 2
+            if len(self.buffer) < self.chunk_left:
+                return
+            self.body_parts.append(self.buffer[:self.chunk_left - 2])
+            self.buffer = self.buffer[self.chunk_left:]
+            self.chunk_left = None
+            
+    def feed(self, data):
+        """Feed received bytes; returns True once the response is complete."""
+        self.buffer += data
+        if self.headers is None and not self.parse_head():
+            return False
+        if self.complete:
+            return True
+        if self.mode == "length":
+            chunk = self.buffer[:self.remaining]
+            self.body_parts.append(chunk)
+            self.remaining -= len(chunk)
+            self.buffer = self.buffer[len(chunk):]
+            self.complete = self.remaining == 0
+        elif self.mode == "chunked":
+            self.parse_chunks()
+        else:
+            self.body_parts.append(self.buffer)
+            self.buffer = ""
+        return self.complete
+        
+    def feed_eof(self):
+        """Handle the server closing the connection."""
+        if self.headers is not None and self.mode == "eof":
+            self.complete = True
+        if not self.complete:
+            raise httplib.IncompleteRead("".join(self.body_parts))
+        return True
+        
+    def get_body(self):
+        return decode_content_body("".join(self.body_parts), self.headers.get("content-encoding"))
+
+class AsyncHTTPConnection:
+    """Non-blocking keep-alive HTTP(S) connection driven by EventLoopEngine."""
+    def __init__(self, scheme, host, port, addrinfo, ssl_context):
+        family, socktype, proto, _, sockaddr = addrinfo
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.sock = socket.socket(family, socktype, proto)
+        self.sock.setblocking(0)
+        err = self.sock.connect_ex(sockaddr)
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            self.sock.close()
+            raise socket.error(err, os.strerror(err))
+        self.state = "connecting"
+        self.want = select.POLLOUT
+        self.connect_started = time.time()
+        self.connect_seconds = None
+        self.reused = False
+        self.received_any = False
+        self.outgoing = ""
+        self.parser = None
+        
+    def fileno(self):
+        return self.sock.fileno()
+        
+    def start_request(self, method, path, headers):
+        lines = ["{} {} HTTP/1.1".format(method, path)]
+        for key, value in headers.items():
+            lines.append("{}: {}".format(key, value))
+        self.outgoing = "\r\n".join(lines) + "\r\n\r\n"
+        self.parser = HTTPResponseParser(method)
+        self.received_any = False
+        if self.state == "idle":
+            self.reused = True
+            self.state = "sending"
+            self.want = select.POLLOUT
+            
+    def advance(self):
+        """Make as much progress as possible; returns True when the response is complete."""
+        if self.state == "connecting":
+            err = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                raise socket.error(err, os.strerror(err))
+            if self.scheme == "https":
+                self.sock = self.ssl_context.wrap_socket(
+                    self.sock, server_hostname=self.host, do_handshake_on_connect=False)
+                self.state = "handshaking"
+            else:
+                self.state = "sending"
+                
+        try:
+            if self.state == "handshaking":
+                self.sock.do_handshake()
+                self.state = "sending"
+            if self.connect_seconds is None and self.state == "sending":
+                self.connect_seconds = time.time() - self.connect_started
+                
+            if self.state == "sending":
+                while self.outgoing:
+                    sent = self.sock.send(self.outgoing)
+                    self.outgoing = self.outgoing[sent:]
+                self.state = "reading"
+                self.want = select.POLLIN
+                
+            if self.state == "reading":
+                while True:
+                    data = self.sock.recv(65536)
+                    if not data:
+                        self.state = "closed"
+                        return self.parser.feed_eof()
+                    self.received_any = True
+                    if self.parser.feed(data):
+                        self.state = "closed" if self.parser.will_close else "idle"
+                        return True
+        except ssl.SSLWantReadError:
+            self.want = select.POLLIN
+        except ssl.SSLWantWriteError:
+            self.want = select.POLLOUT
+        except socket.error as e:
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+            self.want = select.POLLOUT if self.state == "sending" else select.POLLIN
+        return False
+        
+    def close(self):
+        self.state = "closed"
+        try:
+            self.sock.close()
+        except socket.error:
+            pass
+
+class FetchTask:
+    """A single URL being fetched by the event loop engine."""
+    def __init__(self, url, attempt=0):
+        self.url = url
+        self.request_url = url
+        self.attempt = attempt
+        self.redirects = 0
+        self.deadline = None
+        self.started = None
+        self.cache_entry = None
+        self.host = None
+        self.budget_wait_since = None
+
+class EventLoopEngine:
+    """
+    Single-threaded, non-blocking scraping engine.
+    
+    Python 2 has no asyncio, so this drives many concurrent keep-alive
+    connections from one select.poll() loop, bounded by max_in_flight, and
+    hands fetched HTML to a multiprocessing pool running parse_notice_page.
+    Failed fetches and parses are retried with jittered exponential backoff
+    starting at retry_delay seconds, without blocking the loop. With a
+    controller, each fetch also needs a slot from its host's adaptive limit,
+    so max_in_flight becomes a ceiling rather than a target. Results are the same Notice records
+    the threaded url_worker produces.
+    """
+    def __init__(self, results_queue, failed_urls, counter, max_in_flight=100,
+                 parse_processes=None, max_retries=3, retry_delay=5, timeout=30, stats=None,
+                 parser_backend="index", controller=None):
+        self.stats = stats
+        self.parser_backend = parser_backend
+        self.controller = controller
+        self.results_queue = results_queue
+        self.failed_urls = failed_urls
+        self.counter = counter
+        self.max_in_flight = max(1, max_in_flight)
+        self.parse_processes = parse_processes or multiprocessing.cpu_count()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.ssl_context = ssl._create_unverified_context()
+        self.poller = select.poll()
+        self.active = {}      # fd -> (connection, task)
+        self.idle = {}        # (scheme, host, port) -> [connection]
+        self.addresses = {}   # (host, port) -> addrinfo
+        self.ready = collections.deque()
+        self.timers = []      # heap of (due_time, sequence, task)
+        self.timer_sequence = 0
+        self.parsed = Queue.Queue()
+        self.parses_pending = 0
+        self.page_cache = get_page_cache()
+        self.request_budget = get_request_budget()
+        self.url_queue = None
+        
+    def pull_urls(self):
+        """Move URLs from url_queue to the ready list without blocking, until its sentinel."""
+        while self.url_queue is not None and len(self.ready) < self.max_in_flight:
+            try:
+                url = self.url_queue.get(block=False)
+            except Queue.Empty:
+                return
+            if url is None:
+                self.url_queue = None
+            else:
+                self.ready.append(FetchTask(url))
+        
+    def schedule_retry(self, task, error, retry_after=None, stage="fetch"):
+        thread_id = threading.current_thread().name
+        task.attempt += 1
+        error_msg = "Thread {}: Error fetching URL: {} - {} (Attempt {}/{})".format(
+            thread_id, task.url, error, task.attempt, self.max_retries)
+        print(error_msg)
+        logging.error(error_msg)
+        if task.attempt < self.max_retries:
+            delay = max(retry_after or 0, backoff_delay(task.attempt, self.retry_delay))
+            get_metrics().inc("retries_total", stage=stage)
+            logging.info("Thread {}: Retrying in {:.1f} seconds...".format(thread_id, delay))
+            task.request_url = task.url
+            task.redirects = 0
+            self.timer_sequence += 1
+            heapq.heappush(self.timers, (time.time() + delay, self.timer_sequence, task))
+        else:
+            self.failed_urls.append(task.url)
+            if self.stats:
+                self.stats.add("fetch_failed")
+            
+    def acquire_slot(self, task):
+        """Take a concurrency slot for the task's host; False if the controller says wait."""
+        if self.controller is None:
+            return True
+        host = urlparse.urlsplit(task.request_url).hostname
+        if not self.controller.try_acquire(host):
+            return False
+        task.host = host
+        return True
+        
+    def acquire_budget(self, task):
+        """Take a token from the request budget; False if the task has to wait for one."""
+        if self.request_budget is None:
+            return True
+        now = time.time()
+        waited = now - task.budget_wait_since if task.budget_wait_since else 0.0
+        if not self.request_budget.try_acquire(waited):
+            if task.budget_wait_since is None:
+                task.budget_wait_since = now
+            return False
+        task.budget_wait_since = None
+        return True
+        
+    def release_slot(self, task, status=None, error=False, retry_after=None):
+        if self.controller is None or task.host is None:
+            return
+        latency = time.time() - task.started if task.started else None
+        self.controller.release(task.host, status=status, latency=latency,
+                                retry_after=retry_after, error=error)
+        task.host = None
+        
+    def get_connection(self, scheme, host, port):
+        idle = self.idle.get((scheme, host, port))
+        if idle:
+            return idle.pop()
+        if (host, port) not in self.addresses:
+            # Resolve each host once; this is the only blocking call in the loop
+            self.addresses[(host, port)] = socket.getaddrinfo(
+                host, port, 0, socket.SOCK_STREAM)[0]
+        return AsyncHTTPConnection(scheme, host, port, self.addresses[(host, port)],
+                                   self.ssl_context)
+        
+    def start_fetch(self, task):
+        parsed = urlparse.urlsplit(task.request_url)
+        scheme = parsed.scheme.lower()
+        port = parsed.port or (443 if scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        try:
+            conn = self.get_connection(scheme, parsed.hostname, port)
+        except (socket.error, ssl.SSLError) as e:
+            self.release_slot(task, error=True)
+            self.schedule_retry(task, e)
+            return
+        task.started = time.time()
+        headers = {
+            "Host": parsed.hostname if port in (80, 443) else "{}:{}".format(parsed.hostname, port),
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": HTTPFetcher.user_agent,
+        }
+        if self.page_cache:
+            if task.cache_entry is None:
+                task.cache_entry = self.page_cache.lookup(task.url) or {}
+            headers.update(self.page_cache.conditional_headers(task.cache_entry))
+        conn.start_request("GET", path, headers)
+        task.deadline = time.time() + self.timeout
+        self.active[conn.fileno()] = (conn, task)
+        self.poller.register(conn.fileno(), conn.want)
+        
+    def release(self, fd, conn):
+        self.poller.unregister(fd)
+        del self.active[fd]
+        if conn.state == "idle":
+            idle = self.idle.setdefault((conn.scheme, conn.host, conn.port), [])
+            if len(idle) < self.max_in_flight:
+                idle.append(conn)
+                return
+        conn.close()
+        
+    def handle_event(self, fd, parse_jobs):
+        conn, task = self.active[fd]
+        try:
+            done = conn.advance()
+        except (socket.error, ssl.SSLError, httplib.HTTPException, ValueError) as e:
+            self.release(fd, conn)
+            conn.close()
+            if conn.reused and not conn.received_any:
+                # Idle keep-alive connection was closed by the server; try a fresh one
+                self.release_slot(task)
+                self.ready.appendleft(task)
+            else:
+                self.release_slot(task, error=True)
+                self.schedule_retry(task, e)
+            return
+            
+        if not done:
+            self.poller.modify(fd, conn.want)
+            return
+            
+        self.release(fd, conn)
+        response = conn.parser
+        metrics = get_metrics()
+        if not conn.reused and conn.connect_seconds is not None:
+            metrics.observe("connect_seconds", conn.connect_seconds)
+        metrics.observe("fetch_seconds", time.time() - task.started, method="GET")
+        metrics.observe("response_bytes", sum(len(part) for part in response.body_parts))
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        self.release_slot(task, status=response.status, retry_after=retry_after)
+        location = response.headers.get("location")
+        if response.status in (301, 302, 303, 307, 308) and location:
+            task.redirects += 1
+            if task.redirects > 5:
+                self.schedule_retry(task, "Too many redirects")
+            else:
+                task.request_url = urlparse.urljoin(task.request_url, location)
+                self.ready.appendleft(task)
+        elif response.status >= 400:
+            self.schedule_retry(task, "HTTP Error {}: {}".format(response.status, response.reason),
+                                retry_after)
+        else:
+            if response.status == 304:
+                body = self.page_cache.read(task.cache_entry) if self.page_cache else None
+                if body is None:
+                    # The cached body has gone missing; fetch the page again unconditionally
+                    task.cache_entry = {}
+                    self.ready.appendleft(task)
+                    return
+                if self.stats:
+                    self.stats.add("not_modified")
+            else:
+                try:
+                    body = response.get_body()
+                except zlib.error as e:
+                    self.schedule_retry(task, e)
+                    return
+                if self.page_cache:
+                    self.page_cache.store(task.url, body, response.headers.get("etag"),
+                                          response.headers.get("last-modified"))
+            if self.stats:
+                self.stats.add("fetched")
+                self.stats.add("fetch_seconds", time.time() - task.started)
+            self.parses_pending += 1
+            parse_jobs.submit(task.url, body, self.parser_backend,
+                              lambda result, task=task: self.parsed.put((task, result)))
+            
+    def drain_parsed(self):
+        while True:
+            try:
+                task, (url, data, error, elapsed, section_timings) = self.parsed.get(block=False)
+            except Queue.Empty:
+                break
+            self.parses_pending -= 1
+            if error is None:
+                self.results_queue.put(data)
+                record_parse_metrics(elapsed, section_timings)
+                if self.stats:
+                    self.stats.add("parsed")
+                    self.stats.add("parse_seconds", elapsed)
+            else:
+                if self.stats:
+                    self.stats.add("parse_failed")
+                self.schedule_retry(task, error, stage="parse")
+                
+    def expire_timeouts(self):
+        now = time.time()
+        for fd, (conn, task) in list(self.active.items()):
+            if task.deadline is not None and now > task.deadline:
+                self.release(fd, conn)
+                conn.close()
+                self.release_slot(task, error=True)
+                self.schedule_retry(task, "timed out")
+                
+    def run(self, urls):
+        """
+        Fetch and parse every URL, putting results on results_queue.
+        
+        urls is either a list or a Queue that url_producer is still filling;
+        a Queue is read until its None sentinel.
+        """
+        if isinstance(urls, Queue.Queue):
+            self.url_queue = urls
+        else:
+            for url in urls:
+                self.ready.append(FetchTask(url))
+            
+        parse_jobs = ParseJobs(multiprocessing.Pool(processes=self.parse_processes))
+        last_reap = time.time()
+        try:
+            while (self.ready or self.timers or self.active or self.parses_pending or
+                   self.url_queue is not None):
+                self.pull_urls()
+                now = time.time()
+                while self.timers and self.timers[0][0] <= now:
+                    self.ready.append(heapq.heappop(self.timers)[2])
+                    
+                # Stop starting fetches while the parsers are backed up
+                throttle_wait = None
+                while (self.ready and len(self.active) < self.max_in_flight and
+                       self.parses_pending < self.max_in_flight):
+                    task = self.ready.popleft()
+                    if not self.acquire_slot(task):
+                        # Host is at its adaptive limit or backing off
+                        self.ready.appendleft(task)
+                        throttle_wait = 0.1
+                        break
+                    if not self.acquire_budget(task):
+                        # Over the global request rate; wake up when the next token is due
+                        self.release_slot(task)
+                        self.ready.appendleft(task)
+                        throttle_wait = self.request_budget.next_token_in()
+                        break
+                    if task.attempt == 0 and task.redirects == 0:
+                        self.counter.increment()
+                    self.start_fetch(task)
+                    
+                poll_timeout = 0.5 if throttle_wait is None else min(0.5, throttle_wait)
+                if self.url_queue is not None and not self.ready:
+                    # Waiting on the URL source; check back soon
+                    poll_timeout = min(poll_timeout, 0.05)
+                if self.timers:
+                    poll_timeout = max(0, min(poll_timeout, self.timers[0][0] - time.time()))
+                for fd, _ in self.poller.poll(poll_timeout * 1000):
+                    if fd in self.active:
+                        self.handle_event(fd, parse_jobs)
+                        
+                if time.time() - last_reap >= 1.0:
+                    parse_jobs.reap()
+                    last_reap = time.time()
+                self.drain_parsed()
+                self.expire_timeouts()
+        finally:
+            parse_jobs.close()
+            for fd, (conn, _) in list(self.active.items()):
+                conn.close()
+            for connections in self.idle.values():
+                for conn in connections:
+                    conn.close()
+
+# Thread target that runs the event loop engine alongside main's progress monitor
+def event_loop_worker(urls, results_queue, failed_urls, counter, max_in_flight=100,
+                      max_retries=3, retry_delay=5, parse_processes=None, stats=None,
+                      parser_backend="index", controller=None):
+    try:
+        engine = EventLoopEngine(results_queue, failed_urls, counter,
+                                 max_in_flight=max_in_flight, parse_processes=parse_processes,
+                                 max_retries=max_retries, retry_delay=retry_delay, stats=stats,
+                                 parser_backend=parser_backend, controller=controller)
+        engine.run(urls)
+    except Exception as e:
+        logging.error("Event loop engine stopped with an unexpected error: {}".format(str(e)))
+
+# extract_section_data that also records how long the section took
+def timed_extract_section_data(section_div, section_type, backend, section_timings, label=None):
+    if section_timings is None:
+        return extract_section_data(section_div, section_type, backend)
+    start = time.time()
+    data = extract_section_data(section_div, section_type, backend)
+    section_timings.append((label or section_type, time.time() - start))
+    return data
+
 # Function to process URL data (will be called by worker threads)
-def process_url_data(url, soup):
+def process_url_data(url, soup, backend=None, section_timings=None, as_notice=False):
     """
     Process the data from a URL.
     
     Args:
         url: The URL being processed
-        soup: BeautifulSoup object containing the parsed HTML
+        soup: Parsed HTML; a BeautifulSoup object, or an lxml document when
+            using the lxml backend
+        backend: Optional parser backend name or instance (default: inferred from soup)
+        section_timings: Optional list to append (section type, seconds) to for
+            each section extracted
+        as_notice: Return the compact Notice record instead of a dictionary
         
     Returns:
-        Dictionary containing the extracted data
+        Dictionary containing the extracted data, or a Notice when as_notice is True
     """
+    backend = get_parser_backend(backend, soup)
+    
     # Check if notice has been withdrawn
-    notice_withdrawn = False
-    withdrawal_data = {}
-
-    # Look for the withdrawal banner
-    withdrawal_banner = soup.find("span", class_="label-danger", 
-                                string=lambda x: x and "THIS 60-DAY NOTICE HAS BEEN WITHDRAWN" in x)
-    if withdrawal_banner:
-        notice_withdrawn = True
+    notice_withdrawn = backend.is_withdrawn(soup)
     
     # Extract Withdrawal Letter
-    withdrawal_letter_div = soup.find("div", class_="field-label", string=lambda x: x and "Withdrawal Letter:" in x)
-    if withdrawal_letter_div and withdrawal_letter_div.find_next_sibling():
-        letter_item = withdrawal_letter_div.find_next_sibling().find("a")
-        if letter_item and letter_item.get("href"):
-            pdf_url = letter_item.get("href")
-            pdf_name = letter_item.text.strip()
-            withdrawal_data["Withdrawal Letter"] = "[{}]({})".format(pdf_name, pdf_url)
-            withdrawal_data["Withdrawal Status"] = "Withdrawn" 
-            withdrawal_data["Withdrawal ID"] = url.split("/")[-1]
-            withdrawal_data["Withdrawal Date"] = extract_value(soup, "Withdrawal Date:")
+    withdrawal_letter = backend.find_withdrawal_letter(soup)
+    withdrawal_data = None
+    if withdrawal_letter:
+        pdf_name, pdf_url = withdrawal_letter
+        # In WITHDRAWAL_FIELDS order: letter, status, ID, date
+        withdrawal_data = ("[{}]({})".format(pdf_name, pdf_url), "Withdrawn", url.split("/")[-1],
+                           backend.extract_value(soup, "Withdrawal Date:"))
 
     # Extract AG Number and ensure it's properly formatted
-    ag_number = extract_value(soup, "AG Number:")
+    ag_number = backend.extract_value(soup, "AG Number:")
     
     # Extract the year and number parts from the URL
     url_parts = url.split("-")
@@ -169,76 +1968,43 @@ def process_url_data(url, soup):
         url_id = url.split("/")[-1]
         pdf_url = "https://oag.ca.gov/prop65/60-Day-Notice-{0}/{0}.pdf".format(url_id)
     
-    # Extract relevant data from the main section
-    main_data = {
-        "link": url,
-        "AG Number": ag_number,
-        "Notice PDF": "[{}.pdf]({})".format(url.split("/")[-1], pdf_url),
-        "Date Filed": extract_value(soup, "Date Filed:"),
-        "Noticing Party": extract_value(soup, "Noticing Party:"),
-        "Plaintiff Attorney": extract_value(soup, "Plaintiff Attorney:"),
-        "Alleged Violators": extract_value(soup, "Alleged Violators:"),
-        "Chemicals": extract_value(soup, "Chemicals:"),
-        "Source": extract_value(soup, "Source:"),
-    }
+    # Extract relevant data from the main section, in NOTICE_FIELDS order
+    main_values = (
+        url,
+        ag_number,
+        "[{}.pdf]({})".format(url.split("/")[-1], pdf_url),
+        backend.extract_value(soup, "Date Filed:"),
+        backend.extract_value(soup, "Noticing Party:"),
+        backend.extract_value(soup, "Plaintiff Attorney:"),
+        backend.extract_value(soup, "Alleged Violators:"),
+        backend.extract_value(soup, "Chemicals:"),
+        backend.extract_value(soup, "Source:"),
+    )
 
-    # Add withdrawal information if notice has been withdrawn
-    if notice_withdrawn:
-        main_data.update(withdrawal_data)
+    # Find the section headings for each section type
+    civil_complaint_div, settlement_divs, corrected_settlement_divs, judgment_divs = backend.find_sections(soup)
 
     # Extract Civil Complaint Data
-    civil_complaint_div = soup.find("div", text="Civil Complaint")
-    flat_civil_complaint_data = {}
-    if civil_complaint_div:
-        civil_complaint_data = extract_section_data(civil_complaint_div, "Civil Complaint")
-        for key, value in civil_complaint_data.items():
-            flat_civil_complaint_data["Civil_Complaint_{}".format(key)] = value
-
-    # Find all settlement-related divs
-    all_settlement_divs = soup.find_all("div", string=lambda s: s and s.strip() in ["Settlement", "Corrected Settlement"])
-    
-    # Separate into correct categories
-    corrected_settlement_divs = [div for div in all_settlement_divs if div.string and div.string.strip() == "Corrected Settlement"]
-    settlement_divs = [div for div in all_settlement_divs if div.string and div.string.strip() == "Settlement"]
-    
-    # Extract Corrected Settlement Data (up to 5 settlements)
-    flat_corrected_settlement_data = {}
-    for i, div in enumerate(corrected_settlement_divs[:5]):
-        data = extract_section_data(div, "Settlement")
-        for key, value in data.items():
-            flat_corrected_settlement_data["Corrected_Settlement_{}_{}".format(i+1, key)] = value or ""
-
-    # Extract Settlement Data (up to 5 settlements)
-    flat_settlement_data = {}
-    for i, div in enumerate(settlement_divs[:5]):
-        data = extract_section_data(div, "Settlement")
-        for key, value in data.items():
-            flat_settlement_data["Settlement_{}_{}".format(i+1, key)] = value or ""
-
-    # Extract Judgment Data (up to 5 judgments)
-    judgment_divs = soup.find_all("div", text="Judgment")
-    flat_judgment_data = {}
-    for i, div in enumerate(judgment_divs[:5]):
-        data = extract_section_data(div, "Judgment")
-        for key, value in data.items():
-            flat_judgment_data["Judgment_{}_{}".format(i+1, key)] = value or ""
-
-    # Organize data into a dictionary with specific order
-    organized_data = {'data': main_data}
-    
-    if flat_civil_complaint_data:
-        organized_data['flat_civil_complaint_data'] = flat_civil_complaint_data
-        
-    if flat_settlement_data:
-        organized_data['flat_settlement_data'] = flat_settlement_data
-        
-    if flat_judgment_data:
-        organized_data['flat_judgment_data'] = flat_judgment_data
-
-    if flat_corrected_settlement_data:
-        organized_data['flat_corrected_settlement_data'] = flat_corrected_settlement_data
-
-    return organized_data
+    civil_complaint = None
+    if civil_complaint_div is not None:
+        civil_complaint = CivilComplaint.from_mapping(timed_extract_section_data(
+            civil_complaint_div, "Civil Complaint", backend, section_timings))
+
+    # Extract Corrected Settlement, Settlement and Judgment Data; the record keeps
+    # every section, and the flat views show the first MAX_FLAT_SECTIONS of each
+    corrected_settlements = [
+        Settlement.from_mapping(timed_extract_section_data(div, "Settlement", backend, section_timings,
+                                                           "Corrected Settlement"))
+        for div in corrected_settlement_divs]
+    settlements = [Settlement.from_mapping(timed_extract_section_data(div, "Settlement", backend, section_timings))
+                   for div in settlement_divs]
+    judgments = [Judgment.from_mapping(timed_extract_section_data(div, "Judgment", backend, section_timings))
+                 for div in judgment_divs]
+
+    # Withdrawal information is only kept if the notice has been withdrawn
+    notice = Notice(main_values, withdrawal_data if notice_withdrawn else None, civil_complaint,
+                    settlements, corrected_settlements, judgments)
+    return notice if as_notice else notice.to_dict()
 
 def read_urls_from_excel(excel_path, column_index=0, sheet_index=0):
     """
@@ -252,6 +2018,7 @@ def read_urls_from_excel(excel_path, column_index=0, sheet_index=0):
     """
     try:
         # Read Excel file using pandas
+        import pandas as pd
         df = pd.read_excel(excel_path, sheet_name=sheet_index)
         
         # Get the column name (or use the index if it's a number)
@@ -283,8 +2050,17 @@ def read_urls_from_tsv(tsv_path, column_index=0):
     Returns:
         List of URLs
     """
+    return list(iter_urls_from_tsv(tsv_path, column_index))
+
+# Stream URLs from a TSV file one line at a time
+def iter_urls_from_tsv(tsv_path, column_index=0):
+    """
+    Generator version of read_urls_from_tsv.
+    
+    Yields:
+        URLs in file order; nothing if the file cannot be read
+    """
     try:
-        urls = []
         with open(tsv_path, 'r') as f:
             # Skip header line if present
             next(f, None)
@@ -293,11 +2069,9 @@ def read_urls_from_tsv(tsv_path, column_index=0):
                 if len(parts) > column_index:
                     url = parts[column_index].strip()
                     if url.startswith("http"):
-                        urls.append(url)
-        return urls
+                        yield url
     except Exception as e:
         print("Error reading TSV file: {}".format(e))
-        return []
 
 
 # Add this helper function to convert monetary values to floats
@@ -323,6 +2097,11 @@ def convert_to_float(value_str):
         return value_str
 
 
+# URL of the notice with the given year and ID
+def notice_url(year, id_num):
+    # Format with leading zeros to ensure 5 digits (fixed format)
+    return "https://oag.ca.gov/prop65/60-Day-Notice-{}-{:05d}".format(year, id_num)
+
 def generate_urls_for_year_range(start_year, end_year, start_ids, end_ids):
     """
     Generate a list of all possible URLs for the given year range.
@@ -336,8 +2115,16 @@ def generate_urls_for_year_range(start_year, end_year, start_ids, end_ids):
     Returns:
         List of URLs
     """
-    urls = []
+    return list(iter_urls_for_year_range(start_year, end_year, start_ids, end_ids))
+
+# Lazily generate the URLs for a year range, one year at a time
+def iter_urls_for_year_range(start_year, end_year, start_ids, end_ids):
+    """
+    Generator version of generate_urls_for_year_range.
     
+    Yields:
+        URLs in year and ID order
+    """
     for year in range(start_year, end_year + 1):
         if year in start_ids:
             # Extract the numeric part of the ID and ensure they're integers
@@ -358,79 +2145,227 @@ def generate_urls_for_year_range(start_year, end_year, start_ids, end_ids):
             
             print("Processing year {} from ID {} to at least {}".format(year, start_id, end_id))
             
-            # Format with leading zeros to ensure 5 digits (fixed format)
-            id_format = "{:05d}"  # Always 5 digit format
-            
             # Generate URLs for the specified range
             for id_num in range(start_id, end_id + 1):
-                formatted_id = id_format.format(id_num)
-                url = "https://oag.ca.gov/prop65/60-Day-Notice-{}-{}".format(year, formatted_id)
-                urls.append(url)
-                
-    return urls
+                yield notice_url(year, id_num)
+
+# Check whether a notice URL exists
+def probe_notice_exists(url, max_retries=3, retry_delay=1, method="HEAD"):
+    """
+    Check whether a notice page exists without downloading it.
+    
+    Uses a HEAD request, falling back to a ranged GET if the server does not
+    support HEAD. A 404 or 410 means the notice does not exist. Other errors
+    are retried.
+    
+    Args:
+        url: Notice URL to check
+        max_retries: Number of attempts before giving up
+        retry_delay: Base backoff between attempts in seconds
+        method: "HEAD" (default) or "GET" for a ranged GET
+        
+    Returns:
+        True if the page exists, False if it does not, or None if it could
+        not be checked
+    """
+    attempt = 0
+    wait = retry_delay
+    while attempt < max_retries:
+        attempt += 1
+        try:
+            probe_url(url, method)
+            return True
+        except urllib2.HTTPError as e:
+            if e.code in (404, 410):
+                return False
+            if method == "HEAD" and e.code in (405, 501):
+                # HEAD not allowed here; retry straight away with a ranged GET
+                method = "GET"
+                attempt -= 1
+                continue
+            print("HTTP error {} checking {}, treating as temporary (Attempt {}/{})".format(
+                e.code, url, attempt, max_retries))
+            wait = retry_wait(e, attempt, retry_delay)
+        except Exception as e:
+            print("Error checking {}: {} (Attempt {}/{})".format(url, str(e), attempt, max_retries))
+            wait = backoff_delay(attempt, retry_delay)
+        if attempt < max_retries:
+            get_metrics().inc("retries_total", stage="probe")
+            time.sleep(wait)
+    logging.warning("Could not check {} after {} attempts".format(url, max_retries))
+    return None
+
+# Drop URLs whose notice pages do not exist before the fetch-and-parse stage
+def prefilter_existing_urls(urls, workers=5):
+    """
+    Probe URLs concurrently and keep only those that exist.
+    
+    URLs that could not be checked are kept, so a flaky probe never drops a
+    real notice.
+    
+    Args:
+        urls: List of notice URLs
+        workers: Number of concurrent probes
+        
+    Returns:
+        List of URLs in their original order
+    """
+    return list(iter_existing_urls(urls, workers))
+
+# Streaming version of prefilter_existing_urls
+def iter_existing_urls(urls, workers=5):
+    """
+    Probe URLs from any iterable concurrently and yield those that exist.
+    
+    The pool reads the source from its own thread, so a slow source such as
+    auto-discovery does not hold back probes of URLs it has already produced.
+    
+    Yields:
+        URLs that exist or could not be checked, in their original order
+    """
+    print("Pre-filtering URLs with existence probes...")
+    probe_pool = ThreadPool(max(1, workers))
+    
+    def probe(url):
+        return url, probe_notice_exists(url)
+    
+    kept = total = 0
+    try:
+        for url, exists in probe_pool.imap(probe, urls):
+            total += 1
+            if exists is not False:
+                kept += 1
+                yield url
+    finally:
+        # terminate rather than close, so a consumer that stops early does not wait out the source
+        probe_pool.terminate()
+        probe_pool.join()
+    print("Pre-filter kept {} of {} URLs".format(kept, total))
+    logging.info("Pre-filter kept {} of {} URLs".format(kept, total))
 
 # Function to dynamically discover the end_id for a year by testing URLs
-def discover_year_end_id(year, start_id):
+def discover_year_end_id(year, start_id, min_id=None, gap_tolerance=3, probe=None, on_live=None):
     """
-    Dynamically discover the last valid ID for a given year by testing URLs
-    until 3 consecutive failures are encountered.
+    Discover the last valid ID for a given year with galloping plus binary search.
+    
+    An ID counts as live if any of the gap_tolerance IDs starting at it exists,
+    so short runs of missing notices do not end the search; those IDs are
+    probed concurrently. From start_id the search gallops upward in doubling
+    steps until it hits a dead window, then binary searches between the last
+    live ID and that window. This costs O(log n) probe windows per year
+    instead of one request per ID.
     
     Args:
         year: The year to check
-        start_id: The ID to start checking from
+        start_id: The ID to start checking from, usually the last known end ID
+        min_id: Lowest ID to consider if start_id is already past the end;
+            defaults to start_id, so nothing below start_id is searched
+        gap_tolerance: Number of consecutive missing IDs that marks the end
+        probe: Function taking a URL and returning whether it exists
+            (default: probe_notice_exists, which uses HEAD requests)
+        on_live: Optional function called with each new highest live ID as the
+            search finds it. The final result is never lower, so every ID up to
+            that one can be scraped before the search finishes
         
     Returns:
-        The highest valid ID found
+        The highest valid ID found, or min_id - 1 if none was found
     """
-    id_format = "{:05d}"  # Always 5 digit format
-    current_id = start_id
-    consecutive_failures = 0
-    max_consecutive_failures = 3
-    last_valid_id = start_id - 1  # Initialize to one less than start
+    if min_id is None:
+        min_id = start_id
+    if probe is None:
+        probe = probe_notice_exists
+    gap_tolerance = max(1, gap_tolerance)
+    probe_pool = ThreadPool(gap_tolerance)
+    requests_made = [0]
+    
+    # Highest existing ID in the window [id_num, id_num + gap_tolerance), or None
+    def live_id(id_num):
+        ids = range(id_num, id_num + gap_tolerance)
+        urls = [notice_url(year, i) for i in ids]
+        results = probe_pool.map(probe, urls)
+        requests_made[0] += len(urls)
+        found = [i for i, exists in zip(ids, results) if exists]
+        found = max(found) if found else None
+        if found is not None and on_live:
+            on_live(found)
+        return found
     
     print("Discovering end ID for year {}, starting from {}...".format(year, start_id))
     
-    while consecutive_failures < max_consecutive_failures:
-        formatted_id = id_format.format(current_id)
-        url = "https://oag.ca.gov/prop65/60-Day-Notice-{}-{}".format(year, formatted_id)
+    try:
+        # Invariant: lo is live (or the min_id - 1 sentinel) and the window at hi is dead
+        found = live_id(start_id)
+        if found is None:
+            lo, hi = min_id - 1, start_id
+        else:
+            lo, step = found, 1
+            while True:
+                found = live_id(lo + step)
+                if found is None:
+                    hi = lo + step
+                    break
+                print("Found valid ID: {}".format(found))
+                lo, step = found, step * 2
         
-        try:
-            # Try to access the URL
-            print("Testing URL: {}".format(url))
-            context = ssl._create_unverified_context()
-            response = urllib2.urlopen(url, context=context)
-            
-            # If successful, update the last valid ID and reset failure counter
-            last_valid_id = current_id
-            consecutive_failures = 0
-            print("Found valid ID: {}".format(current_id))
-            
-        except urllib2.HTTPError as e:
-            if e.code == 404:
-                # URL not found - increment failure counter
-                consecutive_failures += 1
-                print("ID {} not found ({} consecutive failures)".format(
-                    current_id, consecutive_failures))
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            found = live_id(mid)
+            if found is None:
+                hi = mid
             else:
-                # Other HTTP error - treat as temporary failure
-                print("HTTP error {} for ID {}, treating as temporary".format(e.code, current_id))
-                time.sleep(1)  # Pause to avoid overwhelming the server
-                
-        except Exception as e:
-            # Other error - treat as temporary failure
-            print("Error checking ID {}: {}".format(current_id, str(e)))
-            time.sleep(1)  # Pause to avoid overwhelming the server
-            
-        # Increment the ID
-        current_id += 1
+                lo = found
+    finally:
+        probe_pool.close()
+        probe_pool.join()
+    
+    print("Discovered end ID for year {}: {} ({} probes)".format(year, lo, requests_made[0]))
+    return lo
+
+# Stream a year's URLs while discover_year_end_id is still searching for its end
+def iter_discovered_year_urls(year, first_id, start_id, min_id=None, gap_tolerance=3, probe=None,
+                              discovered_end_ids=None):
+    """
+    Run end ID discovery for a year in a background thread and yield URLs
+    from first_id up to each live ID as soon as the search confirms it.
+    
+    Args:
+        year: The year to discover
+        first_id: First ID to yield
+        start_id, min_id, gap_tolerance, probe: Passed to discover_year_end_id
+        discovered_end_ids: Optional dictionary that receives the year's end ID
         
-        # Small pause to be nice to the server
-        time.sleep(0.5)
+    Yields:
+        URLs in ID order
+    """
+    frontier = Queue.Queue()
+    result = {}
+    
+    def discover():
+        try:
+            result['end_id'] = discover_year_end_id(year, start_id, min_id=min_id,
+                                                    gap_tolerance=gap_tolerance, probe=probe,
+                                                    on_live=frontier.put)
+        except Exception as e:
+            logging.error("End ID discovery for year {} failed: {}".format(year, str(e)))
+        finally:
+            frontier.put(None)
     
-    print("Discovered end ID for year {}: {}".format(year, last_valid_id))
-    return last_valid_id
+    thread = threading.Thread(target=discover, name="Discover-{}".format(year))
+    thread.daemon = True
+    thread.start()
+    next_id = first_id
+    while True:
+        live_id = frontier.get()
+        if live_id is None:
+            break
+        for id_num in range(next_id, live_id + 1):
+            yield notice_url(year, id_num)
+        next_id = max(next_id, live_id + 1)
+    thread.join()
+    if 'end_id' in result and discovered_end_ids is not None:
+        discovered_end_ids[year] = result['end_id']
 
-def auto_discover_urls_for_year_range(start_year, end_year, start_ids):
+def auto_discover_urls_for_year_range(start_year, end_year, start_ids, gap_tolerance=3):
     """
     Generate a list of all possible URLs for the given year range,
     automatically discovering the end IDs for each year.
@@ -439,11 +2374,22 @@ def auto_discover_urls_for_year_range(start_year, end_year, start_ids):
         start_year: Starting year (e.g., 2015)
         end_year: Ending year (e.g., 2025)
         start_ids: Dictionary mapping years to starting IDs
+        gap_tolerance: Number of consecutive missing IDs that marks the end of a year
         
     Returns:
         List of URLs
     """
-    urls = []
+    return list(iter_auto_discovered_urls(start_year, end_year, start_ids, gap_tolerance))
+
+# Generator version of auto_discover_urls_for_year_range
+def iter_auto_discovered_urls(start_year, end_year, start_ids, gap_tolerance=3):
+    """
+    Yield the URLs for a year range while each year's end ID is discovered,
+    so scraping can start on a year's first IDs before its end is known.
+    
+    Yields:
+        URLs in year and ID order
+    """
     discovered_end_ids = {}
     
     for year in range(start_year, end_year + 1):
@@ -459,25 +2405,83 @@ def auto_discover_urls_for_year_range(start_year, end_year, start_ids):
                 # If no end_id is specified, use a reasonable starting point
                 current_known_end = start_id + 500
             
-            # Discover the actual end ID
-            end_id = discover_year_end_id(year, current_known_end)
-            discovered_end_ids[year] = end_id
-            
-            # Format with leading zeros to ensure 5 digits (fixed format)
-            id_format = "{:05d}"  # Always 5 digit format
-            
-            # Generate URLs for the specified range
-            for id_num in range(start_id, end_id + 1):
-                formatted_id = id_format.format(id_num)
-                url = "https://oag.ca.gov/prop65/60-Day-Notice-{}-{}".format(year, formatted_id)
-                urls.append(url)
+            # Discover the actual end ID, searching down to start_id if the known end is stale
+            for url in iter_discovered_year_urls(year, start_id, current_known_end, min_id=start_id,
+                                                 gap_tolerance=gap_tolerance,
+                                                 discovered_end_ids=discovered_end_ids):
+                yield url
+    
+    # Print a summary of what we discovered
+    print("\nDiscovered End IDs:")
+    for year in sorted(discovered_end_ids.keys()):
+        print("  {}: {}".format(year, discovered_end_ids[year]))
+
+# Drop repeated URLs across several sources
+def unique_urls(*sources):
+    """
+    Chain URL iterables, yielding each URL only the first time it appears.
+    
+    Args:
+        *sources: Iterables of URLs, read lazily in order
+        
+    Yields:
+        URLs not seen earlier in any source
+    """
+    seen = set()
+    for source in sources:
+        for url in source:
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+# Feed URLs from a lazy source to the fetch workers
+def url_producer(url_source, url_queue, workers, produced, journal=None, priority=None,
+                 batch_size=100):
+    """
+    Thread target that moves URLs from url_source onto url_queue as the
+    source yields them, then puts one None sentinel per worker so each
+    worker stops once the queue is drained.
+    
+    Args:
+        url_source: Iterable of URLs
+        url_queue: Queue.Queue, or PriorityURLQueue when priority is given
+        workers: Number of workers reading url_queue
+        produced: AtomicCounter of URLs queued so far
+        journal: Optional RunJournal that records each URL as pending
+        priority: Optional function mapping a URL to its PriorityURLQueue priority
+        batch_size: URLs per journal write
+    """
+    pending = []
     
-    # Print a summary of what we discovered
-    print("\nDiscovered End IDs:")
-    for year in sorted(discovered_end_ids.keys()):
-        print("  {}: {}".format(year, discovered_end_ids[year]))
-                
-    return urls
+    # Journal a batch before queueing it, so a URL's "done" record never precedes its "pending" one
+    def flush():
+        if journal is not None and pending:
+            journal.record_pending(pending)
+        for url in pending:
+            url_queue.put((priority(url), url) if priority else url)
+            produced.increment()
+        del pending[:]
+    
+    try:
+        for url in url_source:
+            pending.append(url)
+            # Hand URLs over straight away whenever the workers are waiting for them
+            if len(pending) >= batch_size or url_queue.empty():
+                flush()
+        flush()
+        print("Queued {} URLs".format(produced.get()))
+        logging.info("Queued {} URLs".format(produced.get()))
+        if journal is not None:
+            journal.record_sourced(produced.get())
+    except Exception as e:
+        print("Error reading URLs: {}".format(e))
+        logging.error("URL source stopped with an unexpected error: {}".format(str(e)))
+        flush()
+    finally:
+        for _ in range(workers):
+            # A one-element tuple sorts after every (tier, -year) priority, so
+            # workers only see their sentinel once the queued URLs are gone
+            url_queue.put(((PRIORITY_DONE,), None) if priority else None)
 
 # Example usage with proper 5-digit formatting:
 start_ids = {
@@ -508,9 +2512,6 @@ end_ids = {
     2025: 1211    # Will be formatted as 02000
 }
 
-# Generate URLs for the past 10 years
-all_urls = generate_urls_for_year_range(2015, 2025, start_ids, end_ids)
-
 
 # Function to format AG numbers properly with 5 digits
 def format_ag_number(ag_number):
@@ -526,12 +2527,19 @@ def format_ag_number(ag_number):
         pass
     return str(ag_number).zfill(5)  # fallback
     
-# Move this function outside main()
-def write_data_to_sheet_with_all_headers(sheet, all_data, all_headers_by_category):
-    # Define data categories here to ensure they're in scope
-    data_categories = ['data', 'flat_civil_complaint_data', 'flat_settlement_data', 
-                    'flat_judgment_data', 'flat_corrected_settlement_data']
+# Result categories in the order their columns appear in the output
+DATA_CATEGORIES = ['data', 'flat_civil_complaint_data', 'flat_settlement_data', 
+                   'flat_judgment_data', 'flat_corrected_settlement_data']
+
+# Build the fixed output column order
+def build_ordered_headers():
+    """
+    Build the output column order: main data, withdrawal, civil complaint, then
+    up to 5 settlements, corrected settlements and judgments.
     
+    Returns:
+        List of column headers
+    """
     # Define the exact column order with withdrawal columns removed
     ordered_headers = [
         # Main data
@@ -645,22 +2653,16 @@ def write_data_to_sheet_with_all_headers(sheet, all_data, all_headers_by_categor
         ]
         ordered_headers.extend(judgment_fields)
     
-    # Write headers in the first row - openpyxl uses 1-based indexing
-    for col_idx, header in enumerate(ordered_headers, 1):
-        sheet.cell(row=1, column=col_idx, value=header)
-    
-    # Create a mapping of headers to their column index - openpyxl uses 1-based indexing
-    header_to_column = {header: i for i, header in enumerate(ordered_headers, 1)}
-    
-    # Initialize all empty values to prevent None errors
-    for col_idx, _ in enumerate(ordered_headers, 1):
-        for row_idx in range(2, len(all_data) + 2):
-            sheet.cell(row=row_idx, column=col_idx, value="")
-    
-    # Process each URL's data - openpyxl uses 1-based indexing for rows too
-    row_idx = 2  # Start from row 2 (after headers)
-    
-    def is_monetary_field(header):
+    return ordered_headers
+
+# Headers already checked by is_monetary_field
+_monetary_fields = {}
+
+# Check whether a column holds a dollar amount that should be written as a number
+def is_monetary_field(header):
+    # Headers come from a small fixed set, so each is only checked once
+    result = _monetary_fields.get(header)
+    if result is None:
         monetary_keywords = [
             "civil penalty", 
             "fees", 
@@ -671,208 +2673,1683 @@ def write_data_to_sheet_with_all_headers(sheet, all_data, all_headers_by_categor
             "total"
         ]
         header_lower = header.lower()
-        return any(keyword in header_lower for keyword in monetary_keywords)
+        result = _monetary_fields[header] = any(keyword in header_lower for keyword in monetary_keywords)
+    return result
+
+# Flatten one result entry into a row of cell values
+def build_sheet_row(entry, header_to_index):
+    """
+    Build the cell values for one result entry in output column order.
+    
+    Args:
+        entry: Notice record or result dictionary from process_url_data
+        header_to_index: Dictionary mapping each header to its 0-based column index
+        
+    Returns:
+        List of cell values, with None for empty cells
+    """
+    row = [None] * len(header_to_index)
+    
+    # Process all categories of data
+    for header, value in iter_entry_columns(entry):
+        # Find the column for this header
+        if header in header_to_index:
+            # Check if this is a monetary field that should be converted to float
+            if is_monetary_field(header):
+                value = convert_to_float(value)
+            
+            # Only keep non-empty values
+            if value:
+                row[header_to_index[header]] = value
+    
+    # Handle 'link' value separately to avoid duplication
+    link = entry_link(entry)
+    if link is not None:
+        row[header_to_index['link']] = link
+        
+    return row
 
+# Move this function outside main()
+def write_data_to_sheet_with_all_headers(sheet, all_data, all_headers_by_category):
+    """
+    Write the header row and one row per entry to an openpyxl worksheet.
+    
+    Each row is built once and appended, so this works with both regular and
+    write-only worksheets. all_headers_by_category is kept for compatibility;
+    the column order is fixed by build_ordered_headers().
+    """
+    ordered_headers = build_ordered_headers()
+    header_to_index = {header: i for i, header in enumerate(ordered_headers)}
+    
+    sheet.append(ordered_headers)
     for entry in all_data:
-        # Process all categories of data
-        for category in data_categories:
-            if category in entry:
-                for header, value in entry[category].items():
-                    # Find the column for this header
-                    if header in header_to_column:
-                        # Check if this is a monetary field that should be converted to float
-                        if is_monetary_field(header):
-                            value = convert_to_float(value)
-                        
-                        # Write value to cell - only if not empty
-                        if value:  # Only write non-empty values
-                            sheet.cell(row=row_idx, column=header_to_column[header], value=value)
+        sheet.append(build_sheet_row(entry, header_to_index))
+
+# Stream result rows to an .xlsx file without holding the sheet in memory
+class StreamingXlsxWriter:
+    """
+    Writes result rows to an .xlsx file using an openpyxl write-only workbook.
+    
+    Rows are serialised as they are written instead of being kept as cell
+    objects, so memory use stays flat regardless of the number of notices.
+    The file is only complete once close() has been called.
+    """
+    def __init__(self, output_filename, sheet_title="Main Data"):
+        self.output_filename = output_filename
+        self.ordered_headers = build_ordered_headers()
+        self.header_to_index = {header: i for i, header in enumerate(self.ordered_headers)}
+        import openpyxl
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_title)
+        self.sheet.append(self.ordered_headers)
+        self.rows_written = 0
+        
+    def write(self, entry):
+        self.sheet.append(build_sheet_row(entry, self.header_to_index))
+        self.rows_written += 1
+        
+    def write_all(self, entries):
+        for entry in entries:
+            self.write(entry)
+            
+    def close(self):
+        self.workbook.save(self.output_filename)
+
+# Check whether a column holds a notice date
+def is_date_field(header):
+    return header.endswith("Date") or header.endswith("Date Filed")
+
+# Parse a date as shown on notice pages (MM/DD/YYYY)
+def parse_notice_date(value):
+    """Convert a date string like 08/12/2021 to a datetime.date, or None if it does not parse."""
+    if isinstance(value, datetime.date):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(str(value).strip(), "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+# Column type for each output header: "float" for money, "date" for dates, otherwise "string"
+def build_column_types(ordered_headers):
+    column_types = []
+    for header in ordered_headers:
+        if is_monetary_field(header):
+            column_types.append("float")
+        elif is_date_field(header):
+            column_types.append("date")
+        else:
+            column_types.append("string")
+    return column_types
+
+# Flatten one result entry into a row of typed values
+def build_typed_row(entry, header_to_index, column_types):
+    """
+    Build a row like build_sheet_row, but with typed values: monetary columns are
+    floats and date columns are datetime.date objects. Values that do not convert
+    become None rather than leaving mixed types in a column. Only empty values
+    are dropped, so a $0.00 payment is written as 0.0.
+    """
+    row = [None] * len(header_to_index)
+    for header, value in iter_entry_columns(entry):
+        index = header_to_index.get(header)
+        if index is None or value is None or value == "":
+            continue
+        column_type = column_types[index]
+        if column_type == "float":
+            value = convert_to_float(value)
+            value = value if isinstance(value, float) else None
+        elif column_type == "date":
+            value = parse_notice_date(value)
+        row[index] = value
+    
+    link = entry_link(entry)
+    if link is not None:
+        row[header_to_index['link']] = link
+    return row
+
+# Base class for the typed (non-Excel) output formats
+class TypedResultWriter(object):
+    """
+    Shared setup for writers that emit the build_ordered_headers() schema as
+    typed columns. Subclasses implement write_row() and close().
+    """
+    def __init__(self, output_filename):
+        self.output_filename = output_filename
+        self.ordered_headers = build_ordered_headers()
+        self.header_to_index = {header: i for i, header in enumerate(self.ordered_headers)}
+        self.column_types = build_column_types(self.ordered_headers)
+        self.rows_written = 0
+        
+    def write(self, entry):
+        self.write_row(build_typed_row(entry, self.header_to_index, self.column_types))
+        self.rows_written += 1
+        
+    def write_all(self, entries):
+        for entry in entries:
+            self.write(entry)
+
+# CSV output with ISO dates and plain numbers
+class CsvResultWriter(TypedResultWriter):
+    def __init__(self, output_filename):
+        TypedResultWriter.__init__(self, output_filename)
+        self.file = open(output_filename, "wb")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.ordered_headers)
+        
+    def format_value(self, value):
+        if value is None:
+            return ""
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        if isinstance(value, float):
+            return repr(value)
+        if isinstance(value, unicode):
+            return value.encode("utf-8")
+        return value
+        
+    def write_row(self, row):
+        self.writer.writerow([self.format_value(value) for value in row])
+        
+    def close(self):
+        self.file.close()
+
+# JSON Lines output, one object per notice with keys in column order
+class JsonlResultWriter(TypedResultWriter):
+    def __init__(self, output_filename):
+        TypedResultWriter.__init__(self, output_filename)
+        self.file = open(output_filename, "w")
+        
+    def write_row(self, row):
+        record = collections.OrderedDict(
+            (header, value.isoformat() if isinstance(value, datetime.date) else value)
+            for header, value in zip(self.ordered_headers, row))
+        self.file.write(json.dumps(record) + "\n")
+        
+    def close(self):
+        self.file.close()
+
+# Parquet output written in row groups so memory stays bounded
+class ParquetResultWriter(TypedResultWriter):
+    """
+    Writes typed columns (string, float64, date32) to a Parquet file.
+    
+    Requires pyarrow, which is only imported when this format is used. Rows are
+    buffered and flushed as a row group every row_group_size rows.
+    """
+    def __init__(self, output_filename, row_group_size=10000):
+        TypedResultWriter.__init__(self, output_filename)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.pyarrow = pyarrow
+        arrow_types = {"string": pyarrow.string(), "float": pyarrow.float64(), "date": pyarrow.date32()}
+        self.arrow_types = [arrow_types[column_type] for column_type in self.column_types]
+        self.schema = pyarrow.schema([pyarrow.field(header, arrow_type)
+                                      for header, arrow_type in zip(self.ordered_headers, self.arrow_types)])
+        self.writer = pyarrow.parquet.ParquetWriter(output_filename, self.schema)
+        self.row_group_size = row_group_size
+        self.columns = [[] for _ in self.ordered_headers]
+        self.buffered_rows = 0
+        
+    def write_row(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.buffered_rows += 1
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+            
+    def flush(self):
+        arrays = [self.pyarrow.array(column, type=arrow_type)
+                  for column, arrow_type in zip(self.columns, self.arrow_types)]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.columns = [[] for _ in self.ordered_headers]
+        self.buffered_rows = 0
+        
+    def close(self):
+        # Always write at least one row group so the file carries its schema
+        if self.buffered_rows or not self.rows_written:
+            self.flush()
+        self.writer.close()
+
+# SQL column name for a field label, e.g. "City, State, Zip" -> city_state_zip
+def sql_column_name(field):
+    return re.sub(r"[^a-z0-9]+", "_", field.lower()).strip("_")
+
+# Normalized output with one table per record type
+class SqliteResultWriter(object):
+    """
+    Writes notices to a SQLite database instead of one wide row per notice.
+    
+    The notices table has one row per notice keyed by ag_number, and the
+    civil_complaints, settlements and judgments tables have one row per
+    section, with every section kept rather than the first five. Corrected
+    settlements are settlements rows with corrected = 1. Money columns are
+    REAL and dates ISO text, so questions such as total payments by
+    plaintiff attorney are a GROUP BY over the narrow settlements table.
+    The file is replaced on each run, and rows are inserted in batches in a
+    single transaction.
+    """
+    def __init__(self, output_filename, batch_size=1000):
+        self.output_filename = output_filename
+        self.batch_size = batch_size
+        self.rows_written = 0
+        if os.path.exists(output_filename):
+            os.remove(output_filename)
+        self.connection = sqlite3.connect(output_filename)
+        
+        notice_fields = [field for field in NOTICE_FIELDS if field != "AG Number"] + list(WITHDRAWAL_FIELDS)
+        self.tables = collections.OrderedDict([
+            ("notices", (notice_fields + ["Status"], [], "ag_number")),
+            ("civil_complaints", (SECTION_FIELDS["Civil Complaint"], [], "ag_number")),
+            ("settlements", (SECTION_FIELDS["Settlement"], ["section_number INTEGER", "corrected INTEGER"],
+                             "ag_number, corrected, section_number")),
+            ("judgments", (SECTION_FIELDS["Judgment"], ["section_number INTEGER"], "ag_number, section_number")),
+        ])
+        self.column_types = {}
+        self.insert_statements = {}
+        self.pending = {}
+        for table, (fields, key_columns, primary_key) in self.tables.items():
+            self.column_types[table] = build_column_types(fields)
+            sql_types = {"float": "REAL", "date": "DATE", "string": "TEXT"}
+            columns = (["ag_number TEXT NOT NULL"] + key_columns +
+                       ["{} {}".format(sql_column_name(field), sql_types[column_type])
+                        for field, column_type in zip(fields, self.column_types[table])])
+            self.connection.execute("CREATE TABLE {} ({}, PRIMARY KEY ({}))".format(
+                table, ", ".join(columns), primary_key))
+            self.insert_statements[table] = "INSERT OR REPLACE INTO {} VALUES ({})".format(
+                table, ", ".join(["?"] * len(columns)))
+            self.pending[table] = []
+            
+    def typed_values(self, table, values):
+        row = []
+        for value, column_type in zip(values, self.column_types[table]):
+            if column_type == "float":
+                value = convert_to_float(value)
+                value = value if isinstance(value, float) else None
+            elif column_type == "date":
+                value = parse_notice_date(value)
+                value = value.isoformat() if value is not None else None
+            elif value == "":
+                value = None
+            row.append(value)
+        return row
+        
+    def write(self, entry):
+        notice = entry if isinstance(entry, Notice) else Notice.from_dict(entry)
+        ag_number = notice.values[NOTICE_FIELDS.index("AG Number")]
+        if not ag_number:
+            # Fall back to the ID in the URL, e.g. 2021-02146
+            match = NOTICE_URL_RE.search(notice.link or "")
+            ag_number = "{}-{}".format(match.group(1), match.group(2).zfill(5)) if match else notice.link
+        
+        main_fields = dict(notice.main_columns())
+        notice_fields = self.tables["notices"][0]
+        self.pending["notices"].append(
+            [ag_number] + self.typed_values("notices", [main_fields.get(field) for field in notice_fields]))
+        if notice.civil_complaint is not None:
+            self.pending["civil_complaints"].append(
+                [ag_number] + self.typed_values("civil_complaints", notice.civil_complaint.values))
+        for corrected, sections in ((0, notice.settlements), (1, notice.corrected_settlements)):
+            for number, section in enumerate(sections, 1):
+                self.pending["settlements"].append(
+                    [ag_number, number, corrected] + self.typed_values("settlements", section.values))
+        for number, section in enumerate(notice.judgments, 1):
+            self.pending["judgments"].append([ag_number, number] + self.typed_values("judgments", section.values))
+        self.rows_written += 1
+        if len(self.pending["notices"]) >= self.batch_size:
+            self.flush()
+            
+    def write_all(self, entries):
+        for entry in entries:
+            self.write(entry)
+            
+    def flush(self):
+        for table, rows in self.pending.items():
+            if rows:
+                self.connection.executemany(self.insert_statements[table], rows)
+                self.pending[table] = []
+                
+    def close(self):
+        self.flush()
+        self.connection.commit()
+        self.connection.close()
+
+RESULT_WRITERS = {
+    "xlsx": StreamingXlsxWriter,
+    "csv": CsvResultWriter,
+    "jsonl": JsonlResultWriter,
+    "parquet": ParquetResultWriter,
+    "sqlite": SqliteResultWriter,
+}
+
+# MIME type used when emailing each output format
+OUTPUT_MIME_TYPES = {
+    "xlsx": ("application", "vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("text", "csv"),
+    "jsonl": ("application", "x-ndjson"),
+    "parquet": ("application", "octet-stream"),
+    "sqlite": ("application", "vnd.sqlite3"),
+}
+
+def open_result_writer(output_format, output_filename):
+    """
+    Create the writer for an output format.
+    
+    Args:
+        output_format: One of RESULT_WRITERS ("xlsx", "csv", "jsonl", "parquet" or "sqlite")
+        output_filename: Path of the file to write
+        
+    Returns:
+        Writer with write(entry), write_all(entries) and close() methods
+    """
+    if output_format not in RESULT_WRITERS:
+        raise ValueError("Unknown output format: {}".format(output_format))
+    return RESULT_WRITERS[output_format](output_filename)
+
+# Field labels shown on the notice page for each section type
+SECTION_FIELD_MAPPING = {
+    "Civil Complaint": {
+        "Case Name": "Case Name:",
+        "Court Name": "Court Name:",
+        "Date Filed": "Date Filed:",
+        "Court Docket Number": "Court Docket Number:",
+        "Plaintiff": "Plaintiff:",
+        "Plaintiff Attorney": "Plaintiff Attorney:",
+        "Defendant": "Defendant:",
+        "Type of Claim": "Type of Claim:",
+        "Relief Sought": "Relief Sought:",
+        "Contact Name": "Contact Name:",
+        "Contact Organization": "Contact Organization:",
+        "Email Address": "Email Address:",
+        "Address": "Address:",
+        "City, State, Zip": "City, State, Zip:",
+        "Phone Number": "Phone Number:"
+    },
+    "Settlement": {
+        "Settlement Date": "Settlement Date:",
+        "Case Name": "Case Name:",
+        "Court Name": "Court Name:",
+        "Court Docket Number": "Court Docket Number:",
+        "Plaintiff": "Plaintiff:",
+        "Plaintiff Attorney": "Plaintiff Attorney:",
+        "Defendant": "Defendant:",
+        "Injunctive Relief": "Injunctive Relief:",
+        "Non-Contingent Civil Penalty": "Non-Contingent Civil Penalty:",
+        "Attorneys Fees and Costs": "Attorney(s) Fees and Costs:",
+        "Payment in Lieu of Penalty": "Payment in Lieu of Penalty:",
+        "Total Payments": "Total Payments:",
+        "Will settlement be submitted to court?": "Will settlement be submitted to court?",
+        "Contact Name": "Contact Name:",
+        "Contact Organization": "Contact Organization:",
+        "Email Address": "Email Address:",
+        "Address": "Address:",
+        "City, State, Zip": "City, State, Zip:",
+        "Phone Number": "Phone Number:"
+    },
+    "Judgment": {
+        "Judgment Date": "Judgment Date:",
+        "Settlement reported to AG": "Settlement reported to AG:",
+        "Case Name": "Case Name:",
+        "Court Name": "Court Name:",
+        "Court Docket Number": "Court Docket Number:",
+        "Plaintiff": "Plaintiff:",
+        "Plaintiff Attorney": "Plaintiff Attorney:",
+        "Defendant": "Defendant:",
+        "Injunctive Relief": "Injunctive Relief:",
+        "Non-Contingent Civil Penalty": "Non-Contingent Civil Penalty:",
+        "Attorneys Fees and Costs": "Attorney(s) Fees and Costs:",
+        "Payment in Lieu of Penalty": "Payment in Lieu of Penalty:",
+        "Total Payments": "Total Payments:",
+        "Is Judgment Pursuant to Settlement?": "Is Judgment Pursuant to Settlement?",
+        "Contact Name": "Contact Name:",
+        "Contact Organization": "Contact Organization:",
+        "Email Address": "Email Address:",
+        "Address": "Address:",
+        "City, State, Zip": "City, State, Zip:",
+        "Phone Number": "Phone Number:"
+    }
+}
+
+# Fixed field order of each section type; names are interned so every record shares them
+SECTION_FIELDS = dict((section_type, tuple(intern(field) for field in sorted(mapping)))
+                      for section_type, mapping in SECTION_FIELD_MAPPING.items())
+
+# Main notice fields, in the order Notice stores them
+NOTICE_FIELDS = tuple(intern(field) for field in (
+    "link", "AG Number", "Notice PDF", "Date Filed", "Noticing Party", "Plaintiff Attorney",
+    "Alleged Violators", "Chemicals", "Source"))
+WITHDRAWAL_FIELDS = tuple(intern(field) for field in (
+    "Withdrawal Letter", "Withdrawal Status", "Withdrawal ID", "Withdrawal Date"))
+
+# Sections of each type that get columns in the flat output
+MAX_FLAT_SECTIONS = 5
+
+# Flat column names such as "Settlement_2_Case Name", built once per prefix and shared
+_section_column_names = {}
+
+def section_column_names(prefix, fields):
+    names = _section_column_names.get(prefix)
+    if names is None:
+        names = _section_column_names[prefix] = tuple(intern(prefix + field) for field in fields)
+    return names
+
+# One extracted section of a notice
+class NoticeSection(object):
+    """
+    Section values stored as a tuple in the subclass's FIELDS order, so a
+    record holds no dictionary and no key strings of its own.
+    """
+    __slots__ = ('values',)
+    FIELDS = ()
+    
+    def __init__(self, values):
+        self.values = values
+        
+    def __reduce__(self):
+        return (self.__class__, (self.values,))
+        
+    @classmethod
+    def from_mapping(cls, data):
+        """Build a record from an extract_section_data dictionary; missing values become ""."""
+        return cls(tuple(data.get(field) or "" for field in cls.FIELDS))
+        
+    def items(self):
+        return zip(self.FIELDS, self.values)
+        
+    def columns(self, prefix):
+        """(flat column name, value) pairs with the given column prefix."""
+        return zip(section_column_names(prefix, self.FIELDS), self.values)
+
+class CivilComplaint(NoticeSection):
+    __slots__ = ()
+    FIELDS = SECTION_FIELDS["Civil Complaint"]
+
+class Settlement(NoticeSection):
+    __slots__ = ()
+    FIELDS = SECTION_FIELDS["Settlement"]
+
+class Judgment(NoticeSection):
+    __slots__ = ()
+    FIELDS = SECTION_FIELDS["Judgment"]
+
+# Flat section key such as Corrected_Settlement_2_Case Name: (section type, number, field)
+FLAT_SECTION_KEY_RE = re.compile(r"^(Corrected_Settlement|Settlement|Judgment)_(\d+)_(.+)$")
+
+# Compact record of one scraped notice
+class Notice(object):
+    """
+    Typed result of process_url_data: the main fields as a tuple in
+    NOTICE_FIELDS order plus section records. The flat, prefixed column
+    view used by the writers, comparison and journal is only generated when
+    it is asked for, and keeps the first MAX_FLAT_SECTIONS sections of each
+    type like the dictionaries did.
+    """
+    __slots__ = ('values', 'withdrawal', 'status', 'civil_complaint', 'settlements',
+                 'corrected_settlements', 'judgments')
+    
+    def __init__(self, values, withdrawal=None, civil_complaint=None, settlements=(),
+                 corrected_settlements=(), judgments=(), status=None):
+        self.values = values
+        self.withdrawal = withdrawal
+        self.civil_complaint = civil_complaint
+        self.settlements = tuple(settlements)
+        self.corrected_settlements = tuple(corrected_settlements)
+        self.judgments = tuple(judgments)
+        self.status = status
+        
+    def __reduce__(self):
+        return (Notice, (self.values, self.withdrawal, self.civil_complaint, self.settlements,
+                         self.corrected_settlements, self.judgments, self.status))
+        
+    def to_record(self):
+        """JSON-serializable form of every field and section, with no MAX_FLAT_SECTIONS limit."""
+        return {
+            "values": list(self.values),
+            "withdrawal": list(self.withdrawal) if self.withdrawal is not None else None,
+            "civil_complaint": list(self.civil_complaint.values) if self.civil_complaint is not None else None,
+            "settlements": [list(section.values) for section in self.settlements],
+            "corrected_settlements": [list(section.values) for section in self.corrected_settlements],
+            "judgments": [list(section.values) for section in self.judgments],
+            "status": self.status,
+        }
+        
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild a record from to_record output, such as one read back from a journal."""
+        civil_complaint = record.get("civil_complaint")
+        withdrawal = record.get("withdrawal")
+        return cls(tuple(record["values"]),
+                   tuple(withdrawal) if withdrawal is not None else None,
+                   CivilComplaint(tuple(civil_complaint)) if civil_complaint is not None else None,
+                   [Settlement(tuple(values)) for values in record.get("settlements", [])],
+                   [Settlement(tuple(values)) for values in record.get("corrected_settlements", [])],
+                   [Judgment(tuple(values)) for values in record.get("judgments", [])],
+                   record.get("status"))
+        
+    @classmethod
+    def from_dict(cls, entry):
+        """
+        Rebuild a record from a process_url_data dictionary. The dictionary
+        only holds the first MAX_FLAT_SECTIONS sections of each type.
+        """
+        data = entry.get('data') or {}
+        withdrawal = None
+        if any(field in data for field in WITHDRAWAL_FIELDS):
+            withdrawal = tuple(data.get(field) for field in WITHDRAWAL_FIELDS)
+        civil_complaint = None
+        if entry.get('flat_civil_complaint_data'):
+            civil_complaint = CivilComplaint.from_mapping(dict(
+                (key[len("Civil_Complaint_"):], value)
+                for key, value in entry['flat_civil_complaint_data'].items()))
+        sections = {"Settlement": {}, "Corrected_Settlement": {}, "Judgment": {}}
+        for category in ('flat_settlement_data', 'flat_judgment_data', 'flat_corrected_settlement_data'):
+            for key, value in (entry.get(category) or {}).items():
+                match = FLAT_SECTION_KEY_RE.match(key)
+                if match:
+                    section_type, number, field = match.groups()
+                    sections[section_type].setdefault(int(number), {})[field] = value
+                    
+        def records(section_class, section_type):
+            numbered = sections[section_type]
+            return [section_class.from_mapping(numbered[number]) for number in sorted(numbered)]
+        return cls(tuple(data.get(field) for field in NOTICE_FIELDS), withdrawal, civil_complaint,
+                   records(Settlement, "Settlement"), records(Settlement, "Corrected_Settlement"),
+                   records(Judgment, "Judgment"), data.get('Status'))
+        
+    @property
+    def link(self):
+        return self.values[0]
+        
+    def main_columns(self):
+        columns = list(zip(NOTICE_FIELDS, self.values))
+        if self.withdrawal is not None:
+            columns.extend(zip(WITHDRAWAL_FIELDS, self.withdrawal))
+        if self.status is not None:
+            columns.append(('Status', self.status))
+        return columns
+        
+    def category_columns(self):
+        """(category, [(column, value), ...]) for each non-empty DATA_CATEGORIES category."""
+        categories = [('data', self.main_columns())]
+        if self.civil_complaint is not None:
+            categories.append(('flat_civil_complaint_data', self.civil_complaint.columns("Civil_Complaint_")))
+        for category, prefix, sections in (
+                ('flat_settlement_data', "Settlement_{}_", self.settlements),
+                ('flat_judgment_data', "Judgment_{}_", self.judgments),
+                ('flat_corrected_settlement_data', "Corrected_Settlement_{}_", self.corrected_settlements)):
+            if sections:
+                columns = []
+                for i, section in enumerate(sections[:MAX_FLAT_SECTIONS]):
+                    columns.extend(section.columns(prefix.format(i + 1)))
+                categories.append((category, columns))
+        return categories
+        
+    def iter_columns(self):
+        for _, columns in self.category_columns():
+            for column in columns:
+                yield column
+                
+    def section_counts(self):
+        """Number of flat civil complaint, settlement, judgment and corrected settlement sections."""
+        return (1 if self.civil_complaint is not None else 0,
+                min(len(self.settlements), MAX_FLAT_SECTIONS),
+                min(len(self.judgments), MAX_FLAT_SECTIONS),
+                min(len(self.corrected_settlements), MAX_FLAT_SECTIONS))
+        
+    def to_dict(self):
+        """The process_url_data dictionary for this notice."""
+        return dict((category, dict(columns)) for category, columns in self.category_columns())
+
+# Helpers that accept either a Notice or a process_url_data dictionary
+def entry_link(entry):
+    if isinstance(entry, Notice):
+        return entry.link
+    return entry.get('data', {}).get('link')
+
+def set_entry_status(entry, status):
+    if isinstance(entry, Notice):
+        entry.status = status
+    else:
+        entry['data']['Status'] = status
+
+def iter_entry_columns(entry):
+    """(column, value) pairs of every category of an entry, in DATA_CATEGORIES order."""
+    if isinstance(entry, Notice):
+        return entry.iter_columns()
+    return ((key, value) for category in DATA_CATEGORIES for key, value in (entry.get(category) or {}).items())
+
+# Labels looked up in the main (top) section of a notice page
+MAIN_FIELD_LABELS = [
+    "AG Number:",
+    "Date Filed:",
+    "Noticing Party:",
+    "Plaintiff Attorney:",
+    "Alleged Violators:",
+    "Chemicals:",
+    "Source:",
+    "Withdrawal Date:",
+    "Withdrawal Letter:",
+]
+
+WITHDRAWN_BANNER_TEXT = "THIS 60-DAY NOTICE HAS BEEN WITHDRAWN"
+
+# A label's value node is a string where a tag was expected, or the other way round
+class UnexpectedNodeError(Exception):
+    """
+    Raised by every parser backend when the node after a label is not the
+    kind the extraction reads: the value is taken as the .text of a sibling
+    tag or as a stripped trailing string. BeautifulSoup itself would fail
+    with an AttributeError or TypeError from deep inside the tree, so all
+    backends check the node first and raise this instead, and
+    extract_section_data records the field as empty.
+    """
+
+# Text of a BeautifulSoup value node that must be a tag
+def soup_node_text(node):
+    if isinstance(node, basestring):
+        raise UnexpectedNodeError("Expected a tag after the label, found text {!r}".format(node[:40]))
+    return node.text
+
+# Stripped BeautifulSoup value node that must be a string
+def soup_strip_node(node):
+    if not isinstance(node, basestring):
+        raise UnexpectedNodeError("Expected text after the label, found a <{}> tag".format(node.name))
+    return node.strip()
+
+class SoupParserBackend:
+    """BeautifulSoup html.parser backend; the reference extraction implementation."""
+    name = "bs4"
+    
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self.beautiful_soup = BeautifulSoup
+        
+    def parse(self, page_content):
+        return self.beautiful_soup(page_content, "html.parser")
+        
+    def is_withdrawn(self, soup):
+        # Look for the withdrawal banner
+        withdrawal_banner = soup.find("span", class_="label-danger", 
+                                    string=lambda x: x and WITHDRAWN_BANNER_TEXT in x)
+        return bool(withdrawal_banner)
+        
+    def find_withdrawal_letter(self, soup):
+        """Return (pdf_name, pdf_url) for the withdrawal letter link, or None."""
+        withdrawal_letter_div = soup.find("div", class_="field-label", string=lambda x: x and "Withdrawal Letter:" in x)
+        if withdrawal_letter_div and withdrawal_letter_div.find_next_sibling():
+            letter_item = withdrawal_letter_div.find_next_sibling().find("a")
+            if letter_item and letter_item.get("href"):
+                return letter_item.text.strip(), letter_item.get("href")
+        return None
+        
+    def find_sections(self, soup):
+        """
+        Find the section heading divs of a notice page.
+        
+        Returns:
+            Tuple of (civil_complaint_div, settlement_divs, corrected_settlement_divs,
+            judgment_divs); civil_complaint_div is None when there is no complaint
+        """
+        civil_complaint_div = soup.find("div", text="Civil Complaint")
+        
+        # Find all settlement-related divs
+        all_settlement_divs = soup.find_all("div", string=lambda s: s and s.strip() in ["Settlement", "Corrected Settlement"])
+        
+        # Separate into correct categories
+        corrected_settlement_divs = [div for div in all_settlement_divs if div.string and div.string.strip() == "Corrected Settlement"]
+        settlement_divs = [div for div in all_settlement_divs if div.string and div.string.strip() == "Settlement"]
+        
+        judgment_divs = soup.find_all("div", text="Judgment")
+        return civil_complaint_div, settlement_divs, corrected_settlement_divs, judgment_divs
+        
+    def extract_value(self, soup, label_text):
+        label = soup.find("div", class_="field-label", string=lambda x: x and label_text in x)
+        if label and label.find_next_sibling():
+            sibling = label.find_next_sibling()
+            if sibling:
+                return sibling.text.strip()
+        return ""
+        
+    def extract_value_from_element(self, element, label_text):
+        children = element.find_next()
+        if not children:
+            return ""
+
+        # Special handling for Non-Contingent Civil Penalty
+        if label_text == 'Non-Contingent Civil Penalty:':
+            # Look for details-label div with details div containing Non-Contingent Civil Penalty text
+            penalty_fields = children.find_all('div', class_='details-label')
+            for field in penalty_fields:
+                details = field.find('div', class_='details')
+                if details and 'Non-Contingent Civil Penalty' in details.text:
+                    # Extract the text directly from the details-label div (outside the details div)
+                    # First get all text in the parent div
+                    full_text = field.get_text().strip()
+                    # Remove the text from the nested details div
+                    details_text = details.get_text().strip()
+                    # What remains should be the amount
+                    amount = full_text.replace(details_text, '').strip()
+                    return amount
+
+        # Special handling for Address fields
+        if label_text == 'Address:':
+            # Try to find field with prop65-address class first
+            address_field = children.find('div', class_=lambda c: c and "field-name-field-prop65-address" in c)
+            if address_field:
+                field_item = address_field.find('div', class_='field-item')
+                if field_item:
+                    return field_item.text.strip()
+                
+            # Try to find div containing the address label
+            address_label = children.find(lambda tag: tag.name == 'div' and 
+                                        (tag.get('class') and 'field-label' in tag.get('class')) and 
+                                        label_text in tag.text)
+            if address_label and address_label.find_next_sibling():
+                return address_label.find_next_sibling().text.strip()
+    
+        # Special handling for Email Address
+        if label_text == 'Email Address:':
+            # Try to find a link (a tag) which would indicate an email address
+            email_a_tag = children.find('a', href=lambda href: href and 'mailto:' in href)
+            if email_a_tag:
+                return email_a_tag.text.strip()
+        
+            # If no mailto link is found, try the standard field-label approach
+            email_div = children.find('div', class_="field-label", string=lambda x: x and label_text in x)
+            if email_div and email_div.find_next_sibling():
+                return email_div.find_next_sibling().text.strip()
+        
+            # If still not found, try the details class
+            email_div = children.find('div', class_="details", string=lambda x: x and label_text in x)
+            if email_div:
+                # Look for an anchor tag that might contain the email
+                email_a = email_div.parent.find('a')
+                if email_a:
+                    return email_a.text.strip()
+            
+                # If no anchor tag, try getting text after the details div
+                if email_div.parent:
+                    next_text = soup_strip_node(email_div.parent.contents[-1]) if len(email_div.parent.contents) > 1 else ""
+                    if next_text:
+                        return next_text
+                
+            return ""
+    
+        # Try to find field-label first (general case)
+        sibling = children.find('div', class_="field-label", string=lambda x: x and label_text in x)
+        if sibling and sibling.next_sibling:
+            return soup_node_text(sibling.next_sibling).strip()
+    
+        # If not found, try details class
+        sibling = children.find('div', class_="details", string=lambda x: x and label_text in x)
+        if sibling:
+            # Get the parent of the details div
+            parent = sibling.parent
+            if parent:
+                # Get the text directly after the div.details
+                next_text = soup_strip_node(parent.contents[-1]) if len(parent.contents) > 1 else ""
+                if next_text:
+                    return next_text
+                
+            # Try other potential locations
+            next_text = soup_strip_node(sibling.next_sibling) if sibling.next_sibling else ""
+            if next_text:
+                return next_text
+            
+            field_item = sibling.find_next('div', class_='field-item')
+            if field_item:
+                return field_item.text.strip()
+            
+        return ""
+
+class LxmlParserBackend:
+    """
+    lxml backend using precompiled XPath expressions.
+    
+    Every lookup mirrors SoupParserBackend step for step, including
+    BeautifulSoup's .string, .text and next_sibling semantics, so both
+    backends return identical dictionaries for the same page. XPath does the
+    tree search and Python only confirms the candidates it returns.
+    """
+    name = "lxml"
+    
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        from bs4 import UnicodeDammit
+        self.lxml_html = lxml.html
+        self.etree = etree
+        self.unicode_dammit = UnicodeDammit
+        self.xpath = etree.XPath
+        
+        self.all_text = etree.XPath("descendant::text()")
+        self.next_element = etree.XPath("(descendant::*|following::*)[1]")
+        self.next_sibling_element = etree.XPath("following-sibling::*[1]")
+        self.first_link = etree.XPath("descendant::a[1]")
+        self.first_mailto_link = etree.XPath("descendant::a[contains(@href, 'mailto:')][1]")
+        self.details_label_divs = etree.XPath("descendant::div[{}]".format(xpath_has_class("details-label")))
+        self.first_details_div = etree.XPath("descendant::div[{}][1]".format(xpath_has_class("details")))
+        self.first_address_field = etree.XPath(
+            "descendant::div[contains(@class, 'field-name-field-prop65-address')][1]")
+        self.first_field_item = etree.XPath("descendant::div[{}][1]".format(xpath_has_class("field-item")))
+        self.next_field_item = etree.XPath("(descendant::div[{0}]|following::div[{0}])[1]".format(
+            xpath_has_class("field-item")))
+        self.field_label_divs = etree.XPath("descendant::div[{}]".format(xpath_has_class("field-label")))
+        self.withdrawn_banners = self.compile_label_lookup("span", "label-danger", WITHDRAWN_BANNER_TEXT)
+        self.section_headings = {}
+        for title in ("Civil Complaint", "Settlement", "Judgment"):
+            self.section_headings[title] = self.compile_label_lookup("div", None, title)
+            
+        # One precompiled lookup per label for both label styles used on notice pages
+        self.field_label_lookups = {}
+        self.details_lookups = {}
+        labels = set(MAIN_FIELD_LABELS)
+        for mapping in SECTION_FIELD_MAPPING.values():
+            labels.update(mapping.values())
+        for label in labels:
+            self.field_label_lookups[label] = self.compile_label_lookup("div", "field-label", label)
+            self.details_lookups[label] = self.compile_label_lookup("div", "details", label)
+            
+    def compile_label_lookup(self, tag_name, class_name, text):
+        # Only elements with a single child node can have a BeautifulSoup .string
+        conditions = ["count(node())=1", "contains(., {})".format(xpath_literal(text))]
+        if class_name:
+            conditions.insert(0, xpath_has_class(class_name))
+        return self.xpath("descendant::{}[{}]".format(tag_name, " and ".join(conditions)))
+        
+    def parse(self, page_content):
+        if isinstance(page_content, bytes):
+            # Decode exactly as BeautifulSoup would so both backends see the same text
+            page_content = self.unicode_dammit(page_content, is_html=True).unicode_markup
+        try:
+            return self.lxml_html.document_fromstring(page_content)
+        except self.etree.ParserError:
+            # lxml rejects empty documents; BeautifulSoup returns an empty tree
+            return self.lxml_html.document_fromstring("<html></html>")
+        
+    def contents(self, node):
+        """Child nodes in BeautifulSoup order: text, then each child and its tail."""
+        contents = []
+        if node.text:
+            contents.append(node.text)
+        for child in node:
+            contents.append(child)
+            if child.tail:
+                contents.append(child.tail)
+        return contents
+        
+    def string(self, node):
+        """BeautifulSoup's Tag.string: the text of a node with a single descendant string."""
+        while True:
+            contents = self.contents(node)
+            if len(contents) != 1:
+                return None
+            child = contents[0]
+            if isinstance(child, basestring):
+                return unicode(child)
+            if not isinstance(child.tag, basestring):
+                # Comments count as strings in BeautifulSoup
+                return unicode(child.text or "")
+            node = child
+            
+    def get_text(self, node):
+        return u"".join(self.all_text(node))
+        
+    def node_text(self, node):
+        """soup_node_text for lxml: text and comments raise UnexpectedNodeError."""
+        if isinstance(node, basestring):
+            raise UnexpectedNodeError("Expected a tag after the label, found text {!r}".format(node[:40]))
+        if not isinstance(node.tag, basestring):
+            raise UnexpectedNodeError("Expected a tag after the label, found a comment")
+        return self.get_text(node)
+        
+    def strip_node(self, node):
+        """soup_strip_node for lxml: comments count as strings, elements raise UnexpectedNodeError."""
+        if isinstance(node, basestring):
+            return unicode(node).strip()
+        if not isinstance(node.tag, basestring):
+            return unicode(node.text or "").strip()
+        raise UnexpectedNodeError("Expected text after the label, found a <{}> tag".format(node.tag))
+        
+    def next_node(self, node):
+        """BeautifulSoup's next_sibling, which includes text and comments."""
+        if node.tail:
+            return node.tail
+        return node.getnext()
+        
+    def first(self, results):
+        return results[0] if results else None
+        
+    def find_labelled(self, lookups, node, label_text, class_name):
+        lookup = lookups.get(label_text)
+        if lookup is None:
+            lookup = lookups[label_text] = self.compile_label_lookup("div", class_name, label_text)
+        for candidate in lookup(node):
+            string = self.string(candidate)
+            if string and label_text in string:
+                return candidate
+        return None
+        
+    def find_field_label(self, node, label_text):
+        return self.find_labelled(self.field_label_lookups, node, label_text, "field-label")
+        
+    def find_details(self, node, label_text):
+        return self.find_labelled(self.details_lookups, node, label_text, "details")
+        
+    def is_withdrawn(self, doc):
+        for candidate in self.withdrawn_banners(doc):
+            string = self.string(candidate)
+            if string and WITHDRAWN_BANNER_TEXT in string:
+                return True
+        return False
+        
+    def find_withdrawal_letter(self, doc):
+        withdrawal_letter_div = self.find_field_label(doc, "Withdrawal Letter:")
+        if withdrawal_letter_div is not None:
+            sibling = self.first(self.next_sibling_element(withdrawal_letter_div))
+            if sibling is not None:
+                letter_item = self.first(self.first_link(sibling))
+                if letter_item is not None and letter_item.get("href"):
+                    return self.get_text(letter_item).strip(), unicode(letter_item.get("href"))
+        return None
+        
+    def find_sections(self, doc):
+        civil_complaint_div = None
+        for candidate in self.section_headings["Civil Complaint"](doc):
+            if self.string(candidate) == "Civil Complaint":
+                civil_complaint_div = candidate
+                break
+                
+        corrected_settlement_divs = []
+        settlement_divs = []
+        for candidate in self.section_headings["Settlement"](doc):
+            string = self.string(candidate)
+            if string and string.strip() == "Corrected Settlement":
+                corrected_settlement_divs.append(candidate)
+            elif string and string.strip() == "Settlement":
+                settlement_divs.append(candidate)
+                
+        judgment_divs = [candidate for candidate in self.section_headings["Judgment"](doc)
+                         if self.string(candidate) == "Judgment"]
+        return civil_complaint_div, settlement_divs, corrected_settlement_divs, judgment_divs
+        
+    def extract_value(self, doc, label_text):
+        label = self.find_field_label(doc, label_text)
+        if label is not None:
+            sibling = self.first(self.next_sibling_element(label))
+            if sibling is not None:
+                return self.get_text(sibling).strip()
+        return ""
+        
+    def extract_value_from_element(self, element, label_text):
+        children = self.first(self.next_element(element))
+        if children is None:
+            return ""
+            
+        # Special handling for Non-Contingent Civil Penalty
+        if label_text == 'Non-Contingent Civil Penalty:':
+            for field in self.details_label_divs(children):
+                details = self.first(self.first_details_div(field))
+                if details is not None and 'Non-Contingent Civil Penalty' in self.get_text(details):
+                    full_text = self.get_text(field).strip()
+                    details_text = self.get_text(details).strip()
+                    return full_text.replace(details_text, '').strip()
+                    
+        # Special handling for Address fields
+        if label_text == 'Address:':
+            address_field = self.first(self.first_address_field(children))
+            if address_field is not None:
+                field_item = self.first(self.first_field_item(address_field))
+                if field_item is not None:
+                    return self.get_text(field_item).strip()
+                    
+            for address_label in self.field_label_divs(children):
+                if label_text in self.get_text(address_label):
+                    sibling = self.first(self.next_sibling_element(address_label))
+                    if sibling is not None:
+                        return self.get_text(sibling).strip()
+                    break
+                    
+        # Special handling for Email Address
+        if label_text == 'Email Address:':
+            email_a_tag = self.first(self.first_mailto_link(children))
+            if email_a_tag is not None:
+                return self.get_text(email_a_tag).strip()
+                
+            email_div = self.find_field_label(children, label_text)
+            if email_div is not None:
+                sibling = self.first(self.next_sibling_element(email_div))
+                if sibling is not None:
+                    return self.get_text(sibling).strip()
+                    
+            email_div = self.find_details(children, label_text)
+            if email_div is not None:
+                parent = email_div.getparent()
+                email_a = self.first(self.first_link(parent))
+                if email_a is not None:
+                    return self.get_text(email_a).strip()
+                contents = self.contents(parent)
+                next_text = self.strip_node(contents[-1]) if len(contents) > 1 else ""
+                if next_text:
+                    return next_text
+            return ""
+            
+        # General case: field-label first, then the details class
+        sibling = self.find_field_label(children, label_text)
+        if sibling is not None:
+            next_node = self.next_node(sibling)
+            if next_node is not None:
+                return self.node_text(next_node).strip()
+                
+        sibling = self.find_details(children, label_text)
+        if sibling is not None:
+            parent = sibling.getparent()
+            if parent is not None:
+                contents = self.contents(parent)
+                next_text = self.strip_node(contents[-1]) if len(contents) > 1 else ""
+                if next_text:
+                    return next_text
+                    
+            next_node = self.next_node(sibling)
+            next_text = self.strip_node(next_node) if next_node is not None else ""
+            if next_text:
+                return next_text
+                
+            field_item = self.first(self.next_field_item(sibling))
+            if field_item is not None:
+                return self.get_text(field_item).strip()
+                
+        return ""
+
+# Single-pass index of the label/value nodes on a notice page
+class NoticePageIndex:
+    """
+    Index of a parsed notice page built with one walk over the DOM.
+    
+    Every tag gets its document-order position and the position of its last
+    descendant, so "descendants of X" and "after X" become position ranges.
+    The walk records each field-label, details, details-label, field-item and
+    address div, every link, and the section headings, so the extraction
+    lookups that used to scan a subtree per label become bisects into
+    these lists. Label matches are cached per label, so each label is checked
+    against the page's label nodes only once.
+    """
+    parser_backend_name = "index"
+    indexed_classes = ("field-label", "details", "details-label", "field-item")
+    
+    def __init__(self, soup):
+        self.soup = soup
+        self.tags = []
+        self.ends = []
+        self.parents = []
+        self.positions = {}
+        self.class_positions = dict((name, []) for name in self.indexed_classes)
+        self.address_fields = []
+        self.links = []
+        self.mailto_links = []
+        self.strings = {}
+        self.texts = {}
+        self.label_matches = {}
+        self.withdrawn = False
+        self.civil_complaint = None
+        self.settlements = []
+        self.corrected_settlements = []
+        self.judgments = []
+        self.build()
+        
+    def build(self):
+        from bs4 import Tag
+        # Iterative pre-order walk over (node, parent_position) pairs; an int marks the end of that subtree
+        stack = [(child, -1) for child in reversed(self.soup.contents)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, int):
+                self.ends[item] = len(self.tags) - 1
+                continue
+            tag, parent_position = item
+            if not isinstance(tag, Tag):
+                continue
+            position = len(self.tags)
+            self.tags.append(tag)
+            self.ends.append(position)
+            self.parents.append(parent_position)
+            self.positions[id(tag)] = position
+            self.index_tag(tag, position)
+            stack.append(position)
+            stack.extend((child, position) for child in reversed(tag.contents))
+            
+    def index_tag(self, tag, position):
+        if tag.name == "div":
+            classes = tag.get("class") or []
+            for name in self.indexed_classes:
+                if name in classes:
+                    self.class_positions[name].append(position)
+            if any("field-name-field-prop65-address" in name for name in classes):
+                self.address_fields.append(position)
+            string = tag.string
+            self.strings[position] = string
+            if string == "Civil Complaint" and self.civil_complaint is None:
+                self.civil_complaint = position
+            elif string == "Judgment":
+                self.judgments.append(position)
+            if string and string.strip() == "Settlement":
+                self.settlements.append(position)
+            elif string and string.strip() == "Corrected Settlement":
+                self.corrected_settlements.append(position)
+        elif tag.name == "a":
+            self.links.append(position)
+            href = tag.get("href")
+            if href and "mailto:" in href:
+                self.mailto_links.append(position)
+        elif tag.name == "span" and "label-danger" in (tag.get("class") or []):
+            string = tag.string
+            if string and WITHDRAWN_BANNER_TEXT in string:
+                self.withdrawn = True
+                
+    def first_between(self, positions, start, end):
+        """First position in the sorted list that is > start and <= end, or None."""
+        i = bisect.bisect_right(positions, start)
+        if i < len(positions) and positions[i] <= end:
+            return positions[i]
+        return None
+        
+    def all_between(self, positions, start, end):
+        return positions[bisect.bisect_right(positions, start):bisect.bisect_right(positions, end)]
+        
+    def descendant_range(self, position):
+        # Position -1 stands for the document itself
+        if position < 0:
+            return -1, len(self.tags) - 1
+        return position, self.ends[position]
+        
+    def labels_matching(self, class_name, label_text):
+        """Positions of class_name divs whose .string contains label_text."""
+        key = (class_name, label_text)
+        matches = self.label_matches.get(key)
+        if matches is None:
+            matches = [position for position in self.class_positions[class_name]
+                       if self.strings[position] and label_text in self.strings[position]]
+            self.label_matches[key] = matches
+        return matches
+        
+    def find_label(self, class_name, position, label_text):
+        start, end = self.descendant_range(position)
+        return self.first_between(self.labels_matching(class_name, label_text), start, end)
+        
+    def text(self, position):
+        text = self.texts.get(position)
+        if text is None:
+            text = self.texts[position] = self.tags[position].text
+        return text
+        
+    def next_sibling_position(self, position):
+        """Position of the next sibling tag (BeautifulSoup's find_next_sibling()), or None."""
+        candidate = self.ends[position] + 1
+        if candidate < len(self.tags) and self.parents[candidate] == self.parents[position]:
+            return candidate
+        return None
+
+class IndexedElement(object):
+    """Handle for a tag inside a NoticePageIndex, used by IndexedParserBackend."""
+    __slots__ = ("index", "position")
+    parser_backend_name = "index"
+    
+    def __init__(self, index, position):
+        self.index = index
+        self.position = position
+
+class IndexedParserBackend:
+    """
+    BeautifulSoup backend that extracts through a NoticePageIndex.
+    
+    It follows SoupParserBackend step for step, but every search over a
+    subtree is answered from the index, and only the final local navigation
+    (siblings, parents, text) touches the BeautifulSoup tree. Per-page cost is
+    one parse plus one walk instead of hundreds of subtree scans.
+    """
+    name = "index"
+    
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self.beautiful_soup = BeautifulSoup
+        
+    def parse(self, page_content):
+        return NoticePageIndex(self.beautiful_soup(page_content, "html.parser"))
+        
+    def is_withdrawn(self, index):
+        return index.withdrawn
         
-        # Handle 'link' value separately to avoid duplication
-        if 'data' in entry and 'link' in entry.get('data', {}):
-            sheet.cell(row=row_idx, column=header_to_column['link'], 
-                    value=entry['data']['link'])
+    def find_withdrawal_letter(self, index):
+        label = index.find_label("field-label", -1, "Withdrawal Letter:")
+        if label is not None:
+            sibling = index.next_sibling_position(label)
+            if sibling is not None:
+                start, end = index.descendant_range(sibling)
+                link = index.first_between(index.links, start, end)
+                if link is not None and index.tags[link].get("href"):
+                    return index.text(link).strip(), index.tags[link].get("href")
+        return None
         
-        # Move to next row
-        row_idx += 1
-
-# Function to safely extract data
-def extract_value(soup, label_text):
-    label = soup.find("div", class_="field-label", string=lambda x: x and label_text in x)
-    if label and label.find_next_sibling():
-        sibling = label.find_next_sibling()
-        if sibling:
-            return sibling.text.strip()
-    return ""
-
-def extract_value_from_element(element, label_text):
-    children = element.find_next()
-    if not children:
+    def find_sections(self, index):
+        wrap = lambda position: IndexedElement(index, position)
+        civil_complaint = wrap(index.civil_complaint) if index.civil_complaint is not None else None
+        return (civil_complaint,
+                [wrap(position) for position in index.settlements],
+                [wrap(position) for position in index.corrected_settlements],
+                [wrap(position) for position in index.judgments])
+        
+    def extract_value(self, index, label_text):
+        label = index.find_label("field-label", -1, label_text)
+        if label is not None:
+            sibling = index.next_sibling_position(label)
+            if sibling is not None:
+                return index.text(sibling).strip()
         return ""
-
-    # Special handling for Non-Contingent Civil Penalty
-    if label_text == 'Non-Contingent Civil Penalty:':
-        # Look for details-label div with details div containing Non-Contingent Civil Penalty text
-        penalty_fields = children.find_all('div', class_='details-label')
-        for field in penalty_fields:
-            details = field.find('div', class_='details')
-            if details and 'Non-Contingent Civil Penalty' in details.text:
-                # Extract the text directly from the details-label div (outside the details div)
-                # First get all text in the parent div
-                full_text = field.get_text().strip()
-                # Remove the text from the nested details div
-                details_text = details.get_text().strip()
-                # What remains should be the amount
-                amount = full_text.replace(details_text, '').strip()
-                return amount
-
-    # Special handling for Address fields
-    if label_text == 'Address:':
-        # Try to find field with prop65-address class first
-        address_field = children.find('div', class_=lambda c: c and "field-name-field-prop65-address" in c)
-        if address_field:
-            field_item = address_field.find('div', class_='field-item')
-            if field_item:
-                return field_item.text.strip()
+        
+    def extract_value_from_element(self, element, label_text):
+        index = element.index
+        # find_next(): the next tag in document order
+        children = element.position + 1
+        if children >= len(index.tags):
+            return ""
+        start, end = index.descendant_range(children)
+        
+        # Special handling for Non-Contingent Civil Penalty
+        if label_text == 'Non-Contingent Civil Penalty:':
+            for field in index.all_between(index.class_positions["details-label"], start, end):
+                details = index.first_between(index.class_positions["details"], field, index.ends[field])
+                if details is not None and 'Non-Contingent Civil Penalty' in index.text(details):
+                    full_text = index.tags[field].get_text().strip()
+                    details_text = index.tags[details].get_text().strip()
+                    return full_text.replace(details_text, '').strip()
+                    
+        # Special handling for Address fields
+        if label_text == 'Address:':
+            address_field = index.first_between(index.address_fields, start, end)
+            if address_field is not None:
+                field_item = index.first_between(index.class_positions["field-item"], address_field,
+                                                 index.ends[address_field])
+                if field_item is not None:
+                    return index.text(field_item).strip()
+                    
+            for address_label in index.all_between(index.class_positions["field-label"], start, end):
+                if label_text in index.text(address_label):
+                    sibling = index.next_sibling_position(address_label)
+                    if sibling is not None:
+                        return index.text(sibling).strip()
+                    break
+                    
+        # Special handling for Email Address
+        if label_text == 'Email Address:':
+            email_a_tag = index.first_between(index.mailto_links, start, end)
+            if email_a_tag is not None:
+                return index.text(email_a_tag).strip()
                 
-        # Try to find div containing the address label
-        address_label = children.find(lambda tag: tag.name == 'div' and 
-                                    (tag.get('class') and 'field-label' in tag.get('class')) and 
-                                    label_text in tag.text)
-        if address_label and address_label.find_next_sibling():
-            return address_label.find_next_sibling().text.strip()
-    
-    # Special handling for Email Address
-    if label_text == 'Email Address:':
-        # Try to find a link (a tag) which would indicate an email address
-        email_a_tag = children.find('a', href=lambda href: href and 'mailto:' in href)
-        if email_a_tag:
-            return email_a_tag.text.strip()
-        
-        # If no mailto link is found, try the standard field-label approach
-        email_div = children.find('div', class_="field-label", string=lambda x: x and label_text in x)
-        if email_div and email_div.find_next_sibling():
-            return email_div.find_next_sibling().text.strip()
-        
-        # If still not found, try the details class
-        email_div = children.find('div', class_="details", string=lambda x: x and label_text in x)
-        if email_div:
-            # Look for an anchor tag that might contain the email
-            email_a = email_div.parent.find('a')
-            if email_a:
-                return email_a.text.strip()
-            
-            # If no anchor tag, try getting text after the details div
-            if email_div.parent:
-                next_text = email_div.parent.contents[-1].strip() if len(email_div.parent.contents) > 1 else ""
+            email_div = index.find_label("field-label", children, label_text)
+            if email_div is not None:
+                sibling = index.next_sibling_position(email_div)
+                if sibling is not None:
+                    return index.text(sibling).strip()
+                    
+            email_div = index.find_label("details", children, label_text)
+            if email_div is not None:
+                parent_start, parent_end = index.descendant_range(index.parents[email_div])
+                email_a = index.first_between(index.links, parent_start, parent_end)
+                if email_a is not None:
+                    return index.text(email_a).strip()
+                    
+                parent = index.tags[email_div].parent
+                next_text = soup_strip_node(parent.contents[-1]) if len(parent.contents) > 1 else ""
                 if next_text:
                     return next_text
-                
-        return ""
-    
-    # Try to find field-label first (general case)
-    sibling = children.find('div', class_="field-label", string=lambda x: x and label_text in x)
-    if sibling and sibling.next_sibling:
-        return sibling.next_sibling.text.strip()
-    
-    # If not found, try details class
-    sibling = children.find('div', class_="details", string=lambda x: x and label_text in x)
-    if sibling:
-        # Get the parent of the details div
-        parent = sibling.parent
-        if parent:
-            # Get the text directly after the div.details
-            next_text = parent.contents[-1].strip() if len(parent.contents) > 1 else ""
+            return ""
+            
+        # Try to find field-label first (general case)
+        sibling = index.find_label("field-label", children, label_text)
+        if sibling is not None and index.tags[sibling].next_sibling:
+            return soup_node_text(index.tags[sibling].next_sibling).strip()
+            
+        # If not found, try details class
+        sibling = index.find_label("details", children, label_text)
+        if sibling is not None:
+            tag = index.tags[sibling]
+            parent = tag.parent
+            if parent:
+                next_text = soup_strip_node(parent.contents[-1]) if len(parent.contents) > 1 else ""
+                if next_text:
+                    return next_text
+                    
+            next_text = soup_strip_node(tag.next_sibling) if tag.next_sibling else ""
             if next_text:
                 return next_text
                 
-        # Try other potential locations
-        next_text = sibling.next_sibling.strip() if sibling.next_sibling else ""
-        if next_text:
-            return next_text
-            
-        field_item = sibling.find_next('div', class_='field-item')
-        if field_item:
-            return field_item.text.strip()
-            
-    return ""
+            field_item = index.first_between(index.class_positions["field-item"], sibling, len(index.tags))
+            if field_item is not None:
+                return index.text(field_item).strip()
+                
+        return ""
+
+# XPath test for a class token, matching BeautifulSoup's class_ filter
+def xpath_has_class(class_name):
+    return "contains(concat(' ', normalize-space(@class), ' '), ' {} ')".format(class_name)
+
+# Quote a string for use in an XPath expression
+def xpath_literal(text):
+    if '"' not in text:
+        return '"{}"'.format(text)
+    if "'" not in text:
+        return "'{}'".format(text)
+    return "concat({})".format(", '\"', ".join('"{}"'.format(part) for part in text.split('"')))
+
+PARSER_BACKENDS = {
+    "bs4": SoupParserBackend,
+    "lxml": LxmlParserBackend,
+    "index": IndexedParserBackend,
+}
+_parser_backend_instances = {}
+
+def get_parser_backend(backend=None, document=None):
+    """
+    Resolve a parser backend.
+    
+    Args:
+        backend: Backend name ("bs4", "lxml" or "index"), a backend instance, or
+            None to pick the backend matching document
+        document: Optional parsed document used to infer the backend
+        
+    Returns:
+        A shared backend instance
+    """
+    if backend is not None and not isinstance(backend, basestring):
+        return backend
+    if backend is None:
+        # Check the class, not the instance: BeautifulSoup tags turn unknown attributes into searches
+        backend = getattr(document.__class__, "parser_backend_name", None)
+    if backend is None:
+        # lxml elements have an xpath() method; BeautifulSoup objects do not
+        backend = "lxml" if hasattr(type(document), "xpath") else "bs4"
+    if backend not in PARSER_BACKENDS:
+        raise ValueError("Unknown parser backend: {}".format(backend))
+    instance = _parser_backend_instances.get(backend)
+    if instance is None:
+        instance = _parser_backend_instances[backend] = PARSER_BACKENDS[backend]()
+    return instance
+
+# Function to safely extract data
+def extract_value(soup, label_text, backend=None):
+    return get_parser_backend(backend, soup).extract_value(soup, label_text)
+
+def extract_value_from_element(element, label_text, backend=None):
+    return get_parser_backend(backend, element).extract_value_from_element(element, label_text)
 
 # Consolidated function to extract data based on section type
-def extract_section_data(div, section_type):
+def extract_section_data(div, section_type, backend=None):
     data = {}
-    field_mapping = {
-        "Civil Complaint": {
-            "Case Name": "Case Name:",
-            "Court Name": "Court Name:",
-            "Date Filed": "Date Filed:",
-            "Court Docket Number": "Court Docket Number:",
-            "Plaintiff": "Plaintiff:",
-            "Plaintiff Attorney": "Plaintiff Attorney:",
-            "Defendant": "Defendant:",
-            "Type of Claim": "Type of Claim:",
-            "Relief Sought": "Relief Sought:",
-            "Contact Name": "Contact Name:",
-            "Contact Organization": "Contact Organization:",
-            "Email Address": "Email Address:",
-            "Address": "Address:",
-            "City, State, Zip": "City, State, Zip:",
-            "Phone Number": "Phone Number:"
-        },
-        "Settlement": {
-            "Settlement Date": "Settlement Date:",
-            "Case Name": "Case Name:",
-            "Court Name": "Court Name:",
-            "Court Docket Number": "Court Docket Number:",
-            "Plaintiff": "Plaintiff:",
-            "Plaintiff Attorney": "Plaintiff Attorney:",
-            "Defendant": "Defendant:",
-            "Injunctive Relief": "Injunctive Relief:",
-            "Non-Contingent Civil Penalty": "Non-Contingent Civil Penalty:",
-            "Attorneys Fees and Costs": "Attorney(s) Fees and Costs:",
-            "Payment in Lieu of Penalty": "Payment in Lieu of Penalty:",
-            "Total Payments": "Total Payments:",
-            "Will settlement be submitted to court?": "Will settlement be submitted to court?",
-            "Contact Name": "Contact Name:",
-            "Contact Organization": "Contact Organization:",
-            "Email Address": "Email Address:",
-            "Address": "Address:",
-            "City, State, Zip": "City, State, Zip:",
-            "Phone Number": "Phone Number:"
-        },
-        "Judgment": {
-            "Judgment Date": "Judgment Date:",
-            "Settlement reported to AG": "Settlement reported to AG:",
-            "Case Name": "Case Name:",
-            "Court Name": "Court Name:",
-            "Court Docket Number": "Court Docket Number:",
-            "Plaintiff": "Plaintiff:",
-            "Plaintiff Attorney": "Plaintiff Attorney:",
-            "Defendant": "Defendant:",
-            "Injunctive Relief": "Injunctive Relief:",
-            "Non-Contingent Civil Penalty": "Non-Contingent Civil Penalty:",
-            "Attorneys Fees and Costs": "Attorney(s) Fees and Costs:",
-            "Payment in Lieu of Penalty": "Payment in Lieu of Penalty:",
-            "Total Payments": "Total Payments:",
-            "Is Judgment Pursuant to Settlement?": "Is Judgment Pursuant to Settlement?",
-            "Contact Name": "Contact Name:",
-            "Contact Organization": "Contact Organization:",
-            "Email Address": "Email Address:",
-            "Address": "Address:",
-            "City, State, Zip": "City, State, Zip:",
-            "Phone Number": "Phone Number:"
-        }
-    }
-    
-    mapping = field_mapping.get(section_type, field_mapping["Settlement"])
+    backend = get_parser_backend(backend, div)
+    mapping = SECTION_FIELD_MAPPING.get(section_type, SECTION_FIELD_MAPPING["Settlement"])
     
     for field, label in mapping.items():
-        value = extract_value_from_element(div, label)
+        try:
+            value = backend.extract_value_from_element(div, label)
+        except UnexpectedNodeError as e:
+            # Same for every backend: the field is left empty rather than failing the page
+            logging.warning("Skipping {} {}: {}".format(section_type, field, e))
+            value = ""
         data[field] = value if value is not None else ""
     
     return data
 
+
+# Append-only journal of a scrape run so interrupted runs can be resumed
+class RunJournal:
+    """
+    JSONL progress journal for one scrape run, stored under reports_dir.
+    
+    The first record holds the run options, followed by one "pending" record
+    per URL as it is queued and a "sourced" record once the URL source is
+    exhausted. Each processed URL then gets a "done" record, holding
+    Notice.to_record for a Notice so that no section is dropped or the
+    process_url_data dictionary otherwise, or a "failed" record. The latest
+    record for a URL wins, so a resumed run only retries URLs that are not done.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        
+    def write_records(self, records):
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a")
+            for record in records:
+                self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            
+    def record_start(self, run_id, urls, options):
+        records = [{"event": "start", "run_id": run_id, "options": options}]
+        records.extend({"event": "pending", "url": url} for url in urls)
+        self.write_records(records)
+        
+    def record_pending(self, urls):
+        self.write_records([{"event": "pending", "url": url} for url in urls])
+        
+    def record_sourced(self, count):
+        self.write_records([{"event": "sourced", "count": count}])
+        
+    def record_results(self, results):
+        records = []
+        for data in results:
+            record = {"event": "done", "url": entry_link(data)}
+            if isinstance(data, Notice):
+                record["notice"] = data.to_record()
+            else:
+                record["data"] = data
+            records.append(record)
+        self.write_records(records)
+        
+    def record_failures(self, urls):
+        self.write_records([{"event": "failed", "url": url} for url in urls])
+        
+    def load(self):
+        """
+        Read the journal back.
+        
+        Returns:
+            Tuple of (options, urls, results, statuses): the run options, every URL
+            in its original order, a dictionary of URL to result (a Notice or a
+            process_url_data dictionary) for finished URLs, and a dictionary of
+            URL to its latest status. options has a
+            "sourced" key once every URL of the run had been queued
+        """
+        options = {}
+        urls = []
+        results = {}
+        statuses = {}
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash can leave a partial last line
+                    logging.warning("Skipping unreadable journal line in {}".format(self.path))
+                    continue
+                event = record.get("event")
+                if event == "start":
+                    options = record.get("options") or {}
+                    continue
+                if event == "sourced":
+                    options["sourced"] = record.get("count")
+                    continue
+                url = record.get("url")
+                if url not in statuses:
+                    urls.append(url)
+                statuses[url] = event
+                if event == "done":
+                    if "notice" in record:
+                        results[url] = Notice.from_record(record["notice"])
+                    else:
+                        results[url] = record.get("data")
+                else:
+                    results.pop(url, None)
+        return options, urls, results, statuses
+        
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def get_run_journal_path(reports_dir, run_id):
+    """Path of the journal file for a run ID under reports_dir/runs."""
+    return os.path.join(reports_dir, "runs", "{}.jsonl".format(run_id))
+
+# Consumer that writes each result as it arrives instead of holding the whole run
+class ResultSink:
+    """
+    Thread target that reads result entries from results_queue until a None
+    sentinel. Each batch is journaled, each entry is filtered against the
+    state store or comparison data and written to the report, and nothing is
+    kept afterwards except counts and, with a state store, a compact hash row
+    per written notice. Memory is bounded by the size of results_queue.
+    
+    The report is opened with the first entry to write. With a state store or
+    comparison data and no new or changed notices no report is written at
+    all; otherwise an empty run still produces an empty report. The state
+    store is only updated once the report has been closed. If writing fails
+    the error is kept in error and the queue is still drained to the
+    sentinel, discarding the remaining results.
+    """
+    def __init__(self, results_queue, output_format, output_filename, journal=None,
+                 state_db=None, comparison_data=None, batch_size=100):
+        self.results_queue = results_queue
+        self.output_format = output_format
+        self.output_filename = output_filename
+        self.journal = journal
+        self.state_db = state_db
+        self.comparison_data = comparison_data
+        self.batch_size = batch_size
+        self.filtering = bool(state_db or comparison_data)
+        self.writer = None
+        self.state_store = None
+        self.state_rows = []
+        self.counts = collections.Counter()
+        self.received = 0
+        self.written = 0
+        self.write_seconds = 0.0
+        self.error = None
+        
+    def classify(self, entry):
+        if self.state_store is not None:
+            return self.state_store.classify(entry)
+        if self.comparison_data:
+            return comparison_status(entry, self.comparison_data)
+        return 'Scraped'
+        
+    def add(self, entry):
+        """Filter and write one entry."""
+        self.received += 1
+        status = self.classify(entry)
+        self.counts[status] += 1
+        if status is None:
+            print("Warning: Found entry without URL")
+            return
+        if status == 'Unchanged':
+            return
+        if status != 'Scraped':
+            set_entry_status(entry, status)
+            print("{} entry found: {}".format(status, entry_link(entry)))
+        if self.state_store is not None:
+            self.state_rows.append(self.state_store.state_row(entry))
+        write_start = time.time()
+        if self.writer is None:
+            self.writer = open_result_writer(self.output_format, self.output_filename)
+        self.writer.write(entry)
+        self.write_seconds += time.time() - write_start
+        self.written += 1
+        
+    def add_safely(self, entry):
+        # A bad entry is logged and skipped, so the sink keeps draining and the fetch side never blocks
+        try:
+            self.add(entry)
+        except Exception as e:
+            logging.error("Could not write result for {}: {}".format(entry_link(entry), str(e)))
+        
+    def next_batch(self):
+        """Block for the next entry, then take whatever else is already queued, up to batch_size."""
+        batch = [self.results_queue.get()]
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self.results_queue.get(block=False))
+            except Queue.Empty:
+                break
+        return batch
+        
+    def run(self, previous_results=()):
+        """
+        Args:
+            previous_results: Entries already journaled by the run being resumed;
+                they are written first and not journaled again
+        """
+        finished = False
+        try:
+            # SQLite connections belong to the thread that opened them
+            if self.state_db:
+                self.state_store = NoticeStateStore(self.state_db)
+            for entry in previous_results:
+                self.add_safely(entry)
+            while not finished:
+                batch = self.next_batch()
+                if batch[-1] is None:
+                    batch.pop()
+                    finished = True
+                if self.journal is not None and batch:
+                    self.journal.record_results(batch)
+                for entry in batch:
+                    self.add_safely(entry)
+            self.close()
+        except Exception as e:
+            self.error = e
+            logging.error("Could not finish writing {}: {}".format(self.output_filename, str(e)))
+            # Keep emptying the bounded queue up to the sentinel so that no fetch or parse
+            # thread blocks on put(); discarded results are not journaled, so --resume retries them
+            while not finished:
+                finished = self.next_batch()[-1] is None
+        finally:
+            if self.state_store is not None:
+                self.state_store.close()
+                
+    def close(self):
+        """Finish the report, then remember the state of every notice written to it."""
+        if self.writer is None and not self.filtering:
+            self.writer = open_result_writer(self.output_format, self.output_filename)
+        if self.writer is not None:
+            write_start = time.time()
+            self.writer.close()
+            self.write_seconds += time.time() - write_start
+            get_metrics().observe("write_seconds", self.write_seconds, format=self.output_format)
+        if self.state_store is not None and self.state_rows:
+            self.state_store.record_rows(self.state_rows)
+        if self.filtering:
+            print("\n{} Summary:".format("State Store" if self.state_store is not None else "Comparison"))
+            print("  - Total entries checked: {}".format(self.received))
+            print("  - Entries with updates: {}".format(self.counts['Updated']))
+            print("  - Unchanged entries (skipped): {}".format(self.counts['Unchanged']))
+            print("  - New entries: {}".format(self.counts['New']))
+            print("  - Total entries to write: {}".format(self.written))
+
 # Update the main function to handle TSV files
-def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto_discover=False):
+def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto_discover=False,
+         engine="threads", max_in_flight=100, parse_processes=None, parser_backend="index",
+         resume=None, output_format="xlsx", gap_tolerance=3, prefilter=False, cache_dir=None,
+         state_db=None, stale_sample=1.0, max_threads=None, max_rps=None, burst=None, profile=None,
+         reports_dir="/reports/oag_gov_scrapes"):
     """
     Main function to execute the OAG CA Gov scraper.
     This function sets up logging, processes input files or URLs, and scrapes data from the provided URLs.
@@ -885,9 +4362,34 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
         input_file (str): Optional path to input file with URLs to scrape (.xls, .xlsx, .tsv, or .txt)
         threads (int): Number of threads to use for scraping (default: 5)
         no_auto_discover (bool): If True, disables auto-discovery of new records
+        engine (str): Scraping engine, "threads" (default) or "asyncio" for the
+            non-blocking event loop with a parsing process pool
+        max_in_flight (int): Maximum concurrent fetches for the asyncio engine (default: 100)
+        parse_processes (int): Number of HTML parsing processes (default: all cores;
+            0 parses inside the fetch threads)
+        parser_backend (str): HTML parser backend, "index" (default), "bs4" or "lxml"
+        resume (str): Optional run ID of an interrupted run to resume from its journal
+        output_format (str): Report format, "xlsx" (default), "csv", "jsonl", "parquet" or "sqlite"
+        gap_tolerance (int): Consecutive missing IDs that mark the end of a year during auto-discovery
+        prefilter (bool): If True, drop URLs whose pages do not exist using HEAD probes before scraping
+        cache_dir (str): Optional directory for the raw HTML page cache; cached pages are
+            revalidated with conditional requests instead of downloaded again
+        state_db (str): Optional SQLite state store used instead of the comparison workbook
+            to report only new and updated notices
+        stale_sample (float): Fraction of stale, resolved notices to re-check on --compare-file runs
+        max_threads (int): Upper limit for the adaptive per-host concurrency, which starts at
+            threads and grows while the server keeps up (default: threads, i.e. no growth;
+            the asyncio engine grows up to max_in_flight)
+        max_rps (float): Optional ceiling on requests per second across discovery, probes
+            and scraping, however many threads are running
+        burst (int): Requests allowed back to back under max_rps (default: max_rps)
+        profile (float): Optional fraction of pages (0-1) whose extraction is profiled; merged
+            cProfile stats and collapsed stacks are written to the reports directory
+        reports_dir (str): Directory for reports, logs, run journals and metrics
+            (default: /reports/oag_gov_scrapes)
     """
     # For script usage, parse command line arguments if no parameters provided
-    if all(param is None for param in (year_range, compare_file, input_file)) and len(sys.argv) > 1:
+    if all(param is None for param in (year_range, compare_file, input_file, resume)) and len(sys.argv) > 1:
         parser = argparse.ArgumentParser(description='OAG CA Gov Prop65 Notice Scraper')
         parser.add_argument('--year-range', nargs=2, metavar=('START_YEAR', 'END_YEAR'),
                             type=int, help='Specify start and end year for scraping')
@@ -899,6 +4401,51 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
                             help='Number of threads to use for scraping (default: 5)')
         parser.add_argument('--no-auto-discover', action='store_true',
                             help='Disable auto-discovery of new records')
+        parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads',
+                            help='Scraping engine: worker threads (default) or a non-blocking '
+                                 'event loop with a parsing process pool')
+        parser.add_argument('--max-in-flight', type=int, default=100,
+                            help='Maximum concurrent fetches for the asyncio engine (default: 100)')
+        parser.add_argument('--parse-processes', type=int, default=None,
+                            help='Number of HTML parsing processes (default: all cores; '
+                                 '0 parses inside the fetch threads)')
+        parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS.keys()), default='index',
+                            help='HTML parser backend: indexed BeautifulSoup (default), plain '
+                                 'BeautifulSoup, or lxml with precompiled XPath')
+        parser.add_argument('--resume', metavar='RUN_ID', type=str,
+                            help='Resume an interrupted run, retrying only its pending and failed URLs')
+        parser.add_argument('--output-format', choices=sorted(RESULT_WRITERS.keys()), default='xlsx',
+                            help='Report format: Excel (default), CSV, JSON Lines, or Parquet with '
+                                 'typed money and date columns, or SQLite with normalized notice, '
+                                 'complaint, settlement and judgment tables and no five-section limit')
+        parser.add_argument('--gap-tolerance', type=int, default=3,
+                            help='Consecutive missing IDs that mark the end of a year during '
+                                 'auto-discovery (default: 3)')
+        parser.add_argument('--prefilter', action='store_true',
+                            help='Check URLs with HEAD requests first and only scrape those that exist')
+        parser.add_argument('--cache-dir', type=str, default=None,
+                            help='Cache fetched pages here and revalidate them with ETag/Last-Modified '
+                                 'on later runs')
+        parser.add_argument('--state-db', metavar='FILE', type=str, default=None,
+                            help='SQLite file of per-notice content hashes; only new and updated '
+                                 'notices are reported (created on first use)')
+        parser.add_argument('--stale-sample', metavar='FRACTION', type=float, default=1.0,
+                            help='With --compare-file, re-check only this fraction of stale, resolved '
+                                 'notices (default: 1.0; they are always fetched last)')
+        parser.add_argument('--max-threads', type=int, default=None,
+                            help='Let concurrency grow from --threads up to this many requests while '
+                                 'the server stays fast, backing off on 429/503 and timeouts')
+        parser.add_argument('--max-rps', type=float, default=None,
+                            help='Never send more than this many requests per second in total, across '
+                                 'discovery, probes and scraping')
+        parser.add_argument('--burst', type=int, default=None,
+                            help='Requests that may be sent back to back under --max-rps (default: --max-rps)')
+        parser.add_argument('--profile', metavar='FRACTION', type=float, nargs='?', const=0.05, default=None,
+                            help='Profile extraction on this fraction of pages (default: 0.05) and write '
+                                 'cProfile stats and flamegraph stacks to the reports directory')
+        parser.add_argument('--reports-dir', type=str, default=reports_dir,
+                            help='Directory for reports, logs, run journals and metrics '
+                                 '(default: {})'.format(reports_dir))
         args = parser.parse_args()
         
         # Use command line args if provided
@@ -907,9 +4454,24 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
         input_file = args.input_file
         threads = args.threads
         no_auto_discover = args.no_auto_discover
+        engine = args.engine
+        max_in_flight = args.max_in_flight
+        parse_processes = args.parse_processes
+        parser_backend = args.parser
+        resume = args.resume
+        output_format = args.output_format
+        gap_tolerance = args.gap_tolerance
+        prefilter = args.prefilter
+        cache_dir = args.cache_dir
+        state_db = args.state_db
+        stale_sample = args.stale_sample
+        max_threads = args.max_threads
+        max_rps = args.max_rps
+        burst = args.burst
+        profile = args.profile
+        reports_dir = args.reports_dir
     
     # Create reports directory if it doesn't exist
-    reports_dir = "/reports/oag_gov_scrapes"
     if not os.path.exists(reports_dir):
         try:
             os.makedirs(reports_dir)
@@ -929,17 +4491,85 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
     # Log start of scraping
     logging.info("Starting OAG CA Gov scraper")
     
-    # Initialize variables that might be used later
+    # Every run keeps a journal so it can be resumed with --resume RUN_ID
+    run_id = resume or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    journal_path = get_run_journal_path(reports_dir, run_id)
+    journal = RunJournal(journal_path)
+    previous_results = []
+    resume_urls = None
+    if resume:
+        if not os.path.exists(journal_path):
+            error_msg = "No journal found for run {} at {}".format(resume, journal_path)
+            print(error_msg)
+            logging.error(error_msg)
+            return
+        options, journal_urls, journal_results, statuses = journal.load()
+        previous_results = [journal_results[url] for url in journal_urls if url in journal_results]
+        resume_urls = [url for url in journal_urls if statuses.get(url) != "done"]
+        # Reuse the original comparison file so the report is filtered the same way
+        compare_file = compare_file or options.get("compare_file")
+        print("Resuming run {}: {} URLs already done, {} pending or failed".format(
+            run_id, len(previous_results), len(resume_urls)))
+        logging.info("Resuming run {}: {} URLs already done, {} pending or failed".format(
+            run_id, len(previous_results), len(resume_urls)))
+    else:
+        try:
+            os.makedirs(os.path.dirname(journal_path))
+        except OSError:
+            pass  # Directory already exists
+        print("Run ID: {} (resume with --resume {})".format(run_id, run_id))
+        logging.info("Run ID: {}".format(run_id))
+    
+    # Concurrency starts at --threads and adapts per host between 1 and the maximum;
+    # the threaded engine runs one worker per possible slot
+    worker_threads = max(threads, max_threads or threads)
+    controller = AdaptiveConcurrencyController(
+        initial_limit=threads, max_limit=max_in_flight if engine == "asyncio" else worker_threads)
+    
+    # Size the keep-alive connection pools to match the worker threads
+    configure_http_fetcher(pool_size=worker_threads, controller=controller)
+    request_budget = configure_request_budget(max_rps, burst)
+    if request_budget:
+        print("Limiting requests to {:g} per second".format(max_rps))
+        logging.info("Limiting requests to {:g} per second (burst {:g})".format(max_rps, request_budget.burst))
+        
+    def rate_report():
+        lines = controller.report_lines()
+        if request_budget:
+            lines += request_budget.report_lines()
+        return lines
+    configure_page_cache(cache_dir)
+    metrics = configure_metrics()
+    profile_dir = os.path.join(reports_dir, "profile_{}".format(run_id))
+    if profile:
+        configure_page_profiler(profile_dir, profile)
+        print("Profiling {:.0%} of pages".format(profile))
+    
+    # Initialize variables that might be used later; results_queue is bounded so
+    # memory stays flat if the result sink ever falls behind the fetches
     url_queue = Queue.Queue()
-    results_queue = Queue.Queue()
+    results_queue = Queue.Queue(maxsize=1000)
     failed_urls = []
     counter = AtomicCounter()
-    num_threads = threads  # Use provided threads value
+    num_threads = worker_threads
     
-    # Check for comparison file first - this needs to happen before determining URLs
+    # Every branch below picks a lazy URL source; a producer thread streams it
+    # to the workers, so scraping starts while later URLs are still being found
+    url_source = None
+    url_priority = None
     comparison_data = None
     urls_from_comparison = []
-    if compare_file and os.path.exists(compare_file):
+    if resume_urls is not None:
+        # The journal already fixes the URL set; only reload comparison data for filtering
+        if compare_file and os.path.exists(compare_file):
+            comparison_data = load_comparison_data(compare_file)
+        if "sourced" not in options:
+            print("Run {} stopped before all of its URLs were queued; only those queued are resumed".format(run_id))
+            logging.warning("Run {} stopped before all of its URLs were queued".format(run_id))
+        url_source = resume_urls
+        num_threads = max(1, min(worker_threads, len(resume_urls)))
+        goto_start_scraping = True
+    elif compare_file and os.path.exists(compare_file):
         print("Loading comparison data from: {}".format(compare_file))
         logging.info("Loading comparison data from: {}".format(compare_file))
         try:
@@ -954,83 +4584,39 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
                 logging.info("Extracted {} URLs from comparison file to check for updates".format(len(urls_from_comparison)))
                 
                 # When using auto-discovery, also check for new records at the end of each year
+                auto_discovered_urls = []
                 if not no_auto_discover:
                     print("Auto-discovery enabled - will also check for new records")
-                    # Extract years from URLs to auto-discover
-                    years_to_check = set()
+                    # For each year in the comparison file, find the highest ID in the existing URLs
+                    highest_ids = {}
                     for url in urls_from_comparison:
-                        url_parts = url.split("-")
-                        if len(url_parts) >= 2:
-                            try:
-                                year = int(url_parts[-2])
-                                years_to_check.add(year)
-                            except (ValueError, IndexError):
-                                pass
+                        match = NOTICE_URL_RE.search(url)
+                        if match:
+                            year, id_num = int(match.group(1)), int(match.group(2))
+                            highest_ids[year] = max(highest_ids.get(year, 0), id_num)
                     
-                    if years_to_check:
-                        print("Years found in comparison file: {}".format(sorted(years_to_check)))
-                        # For each year, find the highest ID in the existing URLs
-                        highest_ids = {}
-                        for year in years_to_check:
-                            highest_id = 0
-                            for url in urls_from_comparison:
-                                if "-{}-".format(year) in url:
-                                    url_parts = url.split("-")
-                                    if len(url_parts) >= 2:
-                                        try:
-                                            id_num = int(url_parts[-1])
-                                            highest_id = max(highest_id, id_num)
-                                        except (ValueError, IndexError):
-                                            pass
-                            if highest_id > 0:
-                                highest_ids[year] = highest_id
-                        
-                        # Auto-discover new URLs for each year starting from the highest known ID
-                        auto_discovered_urls = []
-                        for year in sorted(highest_ids.keys()):
-                            print("Auto-discovering new URLs for year {} starting from ID {}".format(
-                                year, highest_ids[year] + 1))
-                            # Start looking from one past the highest known ID
-                            end_id = discover_year_end_id(year, highest_ids[year] + 1)
-                            if end_id > highest_ids[year]:
-                                print("Found {} new records for year {}".format(
-                                    end_id - highest_ids[year], year))
-                                # Generate URLs for the new range
-                                for id_num in range(highest_ids[year] + 1, end_id + 1):
-                                    formatted_id = "{:05d}".format(id_num)
-                                    url = "https://oag.ca.gov/prop65/60-Day-Notice-{}-{}".format(year, formatted_id)
-                                    auto_discovered_urls.append(url)
-                            else:
-                                print("No new records found for year {}".format(year))
-                        
-                        if auto_discovered_urls:
-                            print("Auto-discovered {} new URLs to check".format(len(auto_discovered_urls)))
-                            urls_from_comparison.extend(auto_discovered_urls)
+                    if highest_ids:
+                        print("Years found in comparison file: {}".format(sorted(highest_ids)))
+                        # Auto-discover new URLs for each year starting from one past the highest known ID;
+                        # the URLs are only generated as the producer thread reads them
+                        auto_discovered_urls = itertools.chain.from_iterable(
+                            iter_discovered_year_urls(year, highest_ids[year] + 1, highest_ids[year] + 1,
+                                                      gap_tolerance=gap_tolerance)
+                            for year in sorted(highest_ids))
                 
                 # If we have a comparison file, we'll ONLY process those URLs
                 if urls_from_comparison:
-                    urls = urls_from_comparison
-                    print("Will process {} URLs from comparison file".format(len(urls)))
-                    logging.info("Will process {} URLs from comparison file".format(len(urls)))
+                    # Fetch the notices most likely to have changed first; newly discovered
+                    # IDs are scored as they arrive and jump ahead in the priority queue
+                    prioritized_urls = prioritize_urls(urls_from_comparison, comparison_data, stale_sample)
+                    url_source = unique_urls((url for _, url in prioritized_urls), auto_discovered_urls)
                     
-                    # Create queues for multi-threading
-                    url_queue = Queue.Queue()
-                    results_queue = Queue.Queue()
-                    
-                    # Add URLs to the queue
-                    for url in urls:
-                        url_queue.put(url)
-                    
-                    # Shared list to track failed URLs (thread-safe with locks)
-                    failed_urls = []
-                    
-                    # Create a counter for tracking progress
-                    counter = AtomicCounter()
-                    
-                    # Determine the number of threads to use
-                    num_threads = min(threads, len(urls))
-                    print("Using {} threads for scraping".format(num_threads))
-                    logging.info("Using {} threads for scraping".format(num_threads))
+                    def url_priority(url):
+                        return score_url_priority(url, comparison_data.get(url))
+                    url_queue = PriorityURLQueue()
+                    print("Will process {} URLs from comparison file plus any discovered".format(len(prioritized_urls)))
+                    logging.info("Will process {} URLs from comparison file plus any discovered".format(
+                        len(prioritized_urls)))
                     
                     # Skip the rest of the URL determination logic
                     goto_start_scraping = True
@@ -1052,7 +4638,6 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
     # Only determine URLs if we're not using comparison file URLs
     if not goto_start_scraping:
         # Determine which URLs to scrape based on command line arguments
-        urls = []
         
         # Option 1: Check for input file (highest priority)
         if input_file and os.path.exists(input_file):
@@ -1062,28 +4647,28 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
             if input_file_path.endswith(('.xls', '.xlsx')):
                 print("Reading URLs from Excel file: {}".format(input_file_path))
                 logging.info("Reading URLs from Excel file: {}".format(input_file_path))
-                urls = read_urls_from_excel(input_file_path)
+                url_source = iter(read_urls_from_excel(input_file_path))
                 
             # Check if it's a TSV file
             elif input_file_path.endswith('.tsv') or input_file_path.endswith('.txt'):
                 print("Reading URLs from TSV file: {}".format(input_file_path))
                 logging.info("Reading URLs from TSV file: {}".format(input_file_path))
-                urls = read_urls_from_tsv(input_file_path)
+                url_source = iter_urls_from_tsv(input_file_path)
                 
             else:
                 error_msg = "Unsupported file format. Please provide an Excel (.xls, .xlsx) or TSV (.tsv, .txt) file."
                 print(error_msg)
                 logging.error(error_msg)
                 return
-                
-            if not urls:
+            
+            # Peek at the first URL so an empty or unreadable file still stops the run here
+            first_url = next(url_source, None)
+            if first_url is None:
                 error_msg = "No valid URLs found in the input file or file could not be read."
                 print(error_msg)
                 logging.error(error_msg)
                 return
-                
-            print("Found {} URLs in the input file.".format(len(urls)))
-            logging.info("Found {} URLs in the input file.".format(len(urls)))
+            url_source = unique_urls(itertools.chain([first_url], url_source))
         
         # Option 2: Year range specified
         elif year_range:
@@ -1096,29 +4681,22 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
             if no_auto_discover:
                 # Use predefined end IDs
                 filtered_end_ids = {year: end_ids.get(year, 5000) for year in range(start_year, end_year + 1)}
-                urls = generate_urls_for_year_range(start_year, end_year, filtered_start_ids, filtered_end_ids)
-                print("Generated {} URLs for years {}-{}".format(len(urls), start_year, end_year))
-                logging.info("Generated {} URLs for years {}-{}".format(len(urls), start_year, end_year))
+                url_source = iter_urls_for_year_range(start_year, end_year, filtered_start_ids, filtered_end_ids)
             else:
-                # Auto-discover the end IDs and generate URLs
-                urls = auto_discover_urls_for_year_range(start_year, end_year, filtered_start_ids)
-                print("Auto-discovered and generated {} URLs for years {}-{}".format(
-                    len(urls), start_year, end_year))
-                logging.info("Auto-discovered and generated {} URLs for years {}-{}".format(
-                    len(urls), start_year, end_year))
-        
-        # Option 3: Default to all URLs from predefined list or hardcoded list
-        elif all_urls:
-            # Use the generated list of URLs
+                # Auto-discover the end IDs while the first IDs of each year are already being scraped
+                url_source = iter_auto_discovered_urls(start_year, end_year, filtered_start_ids,
+                                                       gap_tolerance=gap_tolerance)
+        
+        # Option 3: Default to all URLs for the predefined years
+        elif start_ids:
             print("Using generated list of URLs.")
             logging.info("Using generated list of URLs.")
-            urls = all_urls
-            print("Number of URLs: {}".format(len(urls)))
+            url_source = iter_urls_for_year_range(2015, 2025, start_ids, end_ids)
         else:
             # Use the hardcoded list of URLs as fallback
             print("Using hardcoded list of URLs.")
             logging.info("Using hardcoded list of URLs.")
-            urls = [
+            url_source = [
                 "https://oag.ca.gov/prop65/60-Day-Notice-2021-02146",
                 "https://oag.ca.gov/prop65/60-Day-Notice-2021-02145",
                 "https://oag.ca.gov/prop65/60-Day-Notice-2021-02147",
@@ -1126,56 +4704,156 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
                 "https://oag.ca.gov/prop65/60-Day-Notice-2022-02148"
             ]
 
-        # Create queues for multi-threading
-        url_queue = Queue.Queue()
-        results_queue = Queue.Queue()
-        
-        # Add URLs to the queue
-        for url in urls:
-            url_queue.put(url)
-        
-        # Shared list to track failed URLs (thread-safe with locks)
-        failed_urls = []
-        
-        # Create a counter for tracking progress
-        counter = AtomicCounter()
-        
-        # Determine the number of threads to use
-        num_threads = min(threads, len(urls))
-        print("Using {} threads for scraping".format(num_threads))
-        logging.info("Using {} threads for scraping".format(num_threads))
-
+    if prefilter and resume_urls is None:
+        url_source = iter_existing_urls(url_source, workers=threads)
+    
+    print("Using {} threads for scraping".format(num_threads))
+    logging.info("Using {} threads for scraping".format(num_threads))
+    if resume_urls is None:
+        # URLs are journaled as pending by the producer as they are queued
+        journal.record_start(run_id, [], {
+            "year_range": list(year_range) if year_range else None,
+            "compare_file": compare_file,
+            "input_file": input_file,
+        })
+    
+    # Define output filename with date-only stamp
+    if compare_file:
+        output_filename = os.path.join(reports_dir, "60-Day-Notices-Updated-{}.{}".format(date_stamp, output_format))
+    else:
+        output_filename = os.path.join(reports_dir, "60-Day-Notices-{}.{}".format(date_stamp, output_format))
+    
+    # The sink journals, filters and writes each result as it arrives, starting with
+    # those restored from the journal of a resumed run
+    sink = ResultSink(results_queue, output_format, output_filename, journal=journal,
+                      state_db=state_db, comparison_data=comparison_data)
+    sink_thread = threading.Thread(target=sink.run, args=(previous_results,), name="ResultSink")
+    sink_thread.daemon = True
+    sink_thread.start()
+    
+    # The producer ends the URL stream with a sentinel per reader: each fetch thread,
+    # or the single event loop
+    produced = AtomicCounter()
+    producer_thread = threading.Thread(
+        target=url_producer,
+        args=(url_source, url_queue, 1 if engine == "asyncio" else num_threads, produced,
+              journal if resume_urls is None else None, url_priority),
+        name="URLProducer"
+    )
+    producer_thread.daemon = True
+    producer_thread.start()
+    
     # Create and start worker threads
-    threads_list = []
-    for i in range(num_threads):
+    threads_list = [producer_thread]
+    fetch_threads = []
+    stats = PipelineStats()
+    page_queue = None
+    parse_thread = None
+    if engine == "asyncio":
+        # A single event loop thread drives all fetches; parsing runs in a process pool
+        print("Using asyncio engine with up to {} concurrent fetches".format(max_in_flight))
+        logging.info("Using asyncio engine with up to {} concurrent fetches".format(max_in_flight))
         thread = threading.Thread(
-            target=url_worker,
-            args=(url_queue, results_queue, failed_urls, counter, 3, 5),
-            name="Worker-{}".format(i+1)
+            target=event_loop_worker,
+            args=(url_queue, results_queue, failed_urls, counter, max_in_flight, 3, 5,
+                  parse_processes, stats, parser_backend, controller),
+            name="EventLoop"
         )
         thread.daemon = True
         thread.start()
         threads_list.append(thread)
+    else:
+        if parse_processes != 0:
+            # Fetch threads hand pages to a parser process pool through a bounded queue
+            processes = parse_processes or multiprocessing.cpu_count()
+            print("Using {} parser processes".format(processes))
+            logging.info("Using {} parser processes".format(processes))
+            page_queue = Queue.Queue(maxsize=max(num_threads, processes) * 2)
+            parse_thread = threading.Thread(
+                target=parse_stage_worker,
+                args=(page_queue, results_queue, failed_urls, processes, None, stats, parser_backend),
+                name="Parser"
+            )
+            parse_thread.daemon = True
+            parse_thread.start()
+            threads_list.append(parse_thread)
+            
+        for i in range(num_threads):
+            thread = threading.Thread(
+                target=url_worker,
+                args=(url_queue, results_queue, failed_urls, counter, 3, 5, page_queue, stats,
+                      parser_backend),
+                name="Worker-{}".format(i+1)
+            )
+            thread.daemon = True
+            thread.start()
+            threads_list.append(thread)
+            fetch_threads.append(thread)
     
     # Track start time for progress estimation
     start_time = time.time()
-    total_urls = len(urls)
+    
+    # Failures are journaled as they happen; results are journaled by the sink
+    journaled_failures = [0]
+    
+    def journal_failures():
+        new_failures = failed_urls[journaled_failures[0]:]
+        if new_failures:
+            journal.record_failures(new_failures)
+            journaled_failures[0] += len(new_failures)
+    
+    # Metrics are rewritten as a Prometheus textfile during the run and summarized as JSON at the end
+    metrics_path = os.path.join(reports_dir, "metrics_{}.prom".format(run_id))
+    metrics_summary_path = os.path.join(reports_dir, "metrics_{}.json".format(run_id))
+    
+    def export_metrics(succeeded):
+        try:
+            write_file_atomically(metrics_path, metrics.prometheus_text())
+            summary = {
+                "run_id": run_id,
+                "urls": produced.get(),
+                "succeeded": succeeded,
+                "failed": len(failed_urls),
+                "elapsed_seconds": time.time() - start_time,
+                "pipeline": stats.snapshot(),
+                "metrics": metrics.summary(),
+            }
+            write_file_atomically(metrics_summary_path, json.dumps(summary, indent=2, sort_keys=True))
+        except (IOError, OSError) as e:
+            logging.error("Could not write metrics to {}: {}".format(reports_dir, e))
     
     # Monitor progress while threads are running
     try:
+        parse_stage_closed = False
         while any(thread.is_alive() for thread in threads_list):
+            metrics.observe("queue_depth", url_queue.qsize(), queue="urls")
+            metrics.observe("queue_depth", results_queue.qsize(), queue="results")
+            if page_queue is not None:
+                metrics.observe("queue_depth", page_queue.qsize(), queue="pages")
+            journal_failures()
+            
+            # Once every fetch thread is done, tell the parse stage no more pages are coming
+            if parse_thread and not parse_stage_closed and not any(t.is_alive() for t in fetch_threads):
+                page_queue.put(None)
+                parse_stage_closed = True
+                
             # Calculate progress
             processed_count = counter.get()
             if processed_count > 0 and processed_count % 10 == 0:  # Update every 10 URLs
+                total_urls = produced.get()
                 speed, elapsed, remaining, completion = estimate_progress(start_time, processed_count, total_urls)
                 
                 print("\n--- PROGRESS UPDATE ---")
-                print("Processed {}/{} URLs".format(processed_count, total_urls))
+                print("Processed {}/{} URLs{}".format(processed_count, total_urls,
+                                                      " (more still being queued)" if producer_thread.is_alive() else ""))
                 print("Speed: {:.2f} URLs/minute".format(speed))
                 print("Elapsed time: {}".format(elapsed))
                 print("Estimated remaining: {}".format(remaining))
                 print("Estimated completion: {}".format(completion))
+                for line in stats.report_lines(page_queue) + rate_report():
+                    print(line)
                 print("-----------------------\n")
+                export_metrics(sink.received)
                 
             time.sleep(1)  # Check status every second
             
@@ -1185,13 +4863,27 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
         for thread in threads_list:
             thread.join(10)  # Wait up to 10 seconds for each thread
 
-    # Extract results from the queue
-    all_data = []
-    while not results_queue.empty():
-        all_data.append(results_queue.get())
+    # Tell the sink no more results are coming and wait for it to finish the report
+    journal_failures()
+    if sink_thread.is_alive():
+        results_queue.put(None)
+        sink_thread.join()
+    journal.close()
+    scraped_count = sink.received
 
     # Log summary of results
-    logging.info("Scraping completed. Processed {} URLs successfully.".format(len(all_data)))
+    logging.info("Scraping completed. Processed {} URLs successfully.".format(scraped_count))
+    for line in stats.report_lines() + rate_report():
+        logging.info(line)
+    export_metrics(scraped_count)
+    print("Run metrics written to {}".format(metrics_summary_path))
+    if profile:
+        profile_files = merge_profiles(profile_dir, profile_dir)
+        if profile_files:
+            print("Profile written to {}".format(", ".join(profile_files)))
+            logging.info("Profile written to {}".format(", ".join(profile_files)))
+        else:
+            print("No pages were profiled")
     
     if failed_urls:
         logging.warning("Failed to process {} URLs:".format(len(failed_urls)))
@@ -1204,64 +4896,31 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
             for url in failed_urls:
                 f.write(url + "\n")
 
-    # Define output filename with date-only stamp
-    if compare_file:
-        output_filename = os.path.join(reports_dir, "60-Day-Notices-Updated-{}.xlsx".format(date_stamp))
-    else:
-        output_filename = os.path.join(reports_dir, "60-Day-Notices-{}.xlsx".format(date_stamp))
+    if sink.error is not None:
+        print("Error writing {}: {}".format(output_filename, sink.error))
+        return
     
-    # Check if we need to filter data based on comparison
-    if comparison_data:
-        print("Comparing scraped data with existing data...")
-        all_data = compare_and_update_data(all_data, comparison_data)
-        if not all_data:
+    # With a state store or comparison file, only new or changed notices were written
+    if sink.filtering:
+        if not sink.written:
             print("No changes or new data found. Exiting.")
             logging.info("No changes or new data found. Exiting.")
             return
-        print("After filtering, we have {} entries with new or changed data".format(len(all_data)))
-    
-    # Now, extract all possible headers from all data
-    all_headers_by_category = {}
-    data_categories = ['data', 'flat_civil_complaint_data', 'flat_settlement_data', 
-                       'flat_judgment_data', 'flat_corrected_settlement_data']
-
-    # Initialize headers for each category
-    for category in data_categories:
-        all_headers_by_category[category] = set()
-
-    # Gather all possible headers from all data
-    for entry in all_data:
-        for category in data_categories:
-            if category in entry:
-                all_headers_by_category[category].update(entry[category].keys())
-
-    # Remove 'link' from data category since we'll handle it separately
-    if 'link' in all_headers_by_category.get('data', []):
-        all_headers_by_category['data'].remove('link')
-
-    # Create a new Excel workbook using openpyxl
-    workbook = openpyxl.Workbook()
-    main_sheet = workbook.active
-    if main_sheet:
-        main_sheet.title = "Main Data"
-    else:
-        # If for some reason the active sheet is None, create a new sheet
-        main_sheet = workbook.create_sheet("Main Data")
-        
-    # Write data to the sheet
-    write_data_to_sheet_with_all_headers(main_sheet, all_data, all_headers_by_category)
-
-    # Save the Excel file
-    workbook.save(output_filename)
+        print("After filtering, we have {} entries with new or changed data".format(sink.written))
     print("Data successfully written to {}".format(output_filename))
     
-    # Create MIME attachment for the Excel file
+    email_report(output_filename, output_format)
+
+# Email the finished report to the team
+def email_report(output_filename, output_format):
+    # Create MIME attachment for the report file
     from email.mime.base import MIMEBase
     from email import encoders
+    from nile.utils.send_email import email_custom
     
     # Create attachment
     with open(output_filename, 'rb') as file:
-        attachment = MIMEBase('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        attachment = MIMEBase(*OUTPUT_MIME_TYPES[output_format])
         attachment.set_payload(file.read())
     
     # Encode file in ASCII characters to send by email    
@@ -1278,11 +4937,233 @@ def main(year_range=None, compare_file=None, input_file=None, threads=5, no_auto
     msg = "The OAG CA Gov Scraper has been completed. The file is attached."
     email_custom(recipients, "OAG_SCRAPER@denile.co", subject, msg, mime_attachments=[attachment])
 
+# Derive the notice URL from a saved page's file name
+def saved_page_url(path):
+    """Map a saved file like 60-Day-Notice-2021-02146.html back to its notice URL."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return "https://oag.ca.gov/prop65/{}".format(name)
+
+# Read saved notice pages from a directory, page cache or archive
+def iter_saved_pages(source):
+    """
+    Yield (url, html) for every saved notice page in source.
+    
+    Args:
+        source: A --cache-dir page cache, a directory of .html files, or a
+            .zip/.tar/.tar.gz archive of .html files
+    """
+    if os.path.isdir(source):
+        if os.path.isdir(os.path.join(source, "index")) and os.path.isdir(os.path.join(source, "objects")):
+            cache = PageCache(source)
+            for entry in cache.iter_entries():
+                content = cache.read(entry)
+                if content is not None:
+                    yield entry["url"], content
+            return
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith((".html", ".htm")):
+                    with open(os.path.join(root, name), "rb") as f:
+                        yield saved_page_url(name), f.read()
+    elif zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        try:
+            for name in sorted(archive.namelist()):
+                if name.endswith((".html", ".htm")):
+                    yield saved_page_url(name), archive.read(name)
+        finally:
+            archive.close()
+    elif tarfile.is_tarfile(source):
+        archive = tarfile.open(source)
+        try:
+            for member in archive:
+                if member.isfile() and member.name.endswith((".html", ".htm")):
+                    yield saved_page_url(member.name), archive.extractfile(member).read()
+        finally:
+            archive.close()
+    else:
+        raise ValueError("Not a page cache, directory or archive: {}".format(source))
+
+# Pool.imap passes a single argument
+def parse_saved_page(args):
+    return parse_notice_page(*args)
+
+# Offline entry point: re-run extraction over saved HTML
+def reparse(source=None, output_file=None, output_format="xlsx", processes=None,
+            parser_backend="index", batch_size=1000):
+    """
+    Re-run process_url_data over previously saved notice pages without any
+    network access and write the normal report.
+    
+    Pages are parsed on all CPU cores and read in batches, and each result is
+    streamed straight to the output writer, so memory use does not grow with
+    the number of pages.
+    
+    Args:
+        source (str): Page cache directory, directory of .html files, or archive
+        output_file (str): Report path (default: 60-Day-Notices-Reparsed-<date>.<format>)
+        output_format (str): Report format, "xlsx" (default), "csv", "jsonl", "parquet" or "sqlite"
+        processes (int): Number of parsing processes (default: all cores)
+        parser_backend (str): HTML parser backend, "index" (default), "bs4" or "lxml"
+        batch_size (int): Number of pages read into memory at a time
+        
+    Returns:
+        Tuple of (output_file, parsed_count, failed_urls)
+    """
+    if source is None:
+        parser = argparse.ArgumentParser(prog='oag_ca_gov_scraper.py reparse',
+                                         description='Re-extract notice data from saved HTML pages')
+        parser.add_argument('source', metavar='SOURCE',
+                            help='Page cache directory (--cache-dir), directory of .html files, '
+                                 'or .zip/.tar archive')
+        parser.add_argument('--output', metavar='FILE', type=str, default=None,
+                            help='Output file (default: 60-Day-Notices-Reparsed-<date>.<format>)')
+        parser.add_argument('--output-format', choices=sorted(RESULT_WRITERS.keys()), default='xlsx',
+                            help='Report format (default: xlsx)')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Number of parsing processes (default: all cores)')
+        parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS.keys()), default='index',
+                            help='HTML parser backend (default: index)')
+        args = parser.parse_args(sys.argv[2:])
+        source = args.source
+        output_file = args.output
+        output_format = args.output_format
+        processes = args.processes
+        parser_backend = args.parser
+        
+    if output_file is None:
+        date_stamp = datetime.datetime.now().strftime("%Y_%m_%d")
+        output_file = "60-Day-Notices-Reparsed-{}.{}".format(date_stamp, output_format)
+    
+    processes = processes or multiprocessing.cpu_count()
+    print("Reparsing pages from {} with {} processes".format(source, processes))
+    start_time = time.time()
+    
+    writer = open_result_writer(output_format, output_file)
+    failed_urls = []
+    parsed_count = 0
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        pages = iter_saved_pages(source)
+        while True:
+            batch = [(url, content, parser_backend) for url, content in itertools.islice(pages, batch_size)]
+            if not batch:
+                break
+            chunksize = max(1, len(batch) // (processes * 4))
+            for url, data, error, elapsed, section_timings in pool.imap(parse_saved_page, batch, chunksize):
+                if error is None:
+                    writer.write(data)
+                    parsed_count += 1
+                else:
+                    print("Error parsing saved page {}: {}".format(url, error))
+                    failed_urls.append(url)
+            print("Reparsed {} pages ({} failed)".format(parsed_count, len(failed_urls)))
+    finally:
+        pool.close()
+        pool.join()
+        writer.close()
+    
+    print("Reparse finished in {:.1f}s: {} pages written to {}, {} failed".format(
+        time.time() - start_time, parsed_count, output_file, len(failed_urls)))
+    return output_file, parsed_count, failed_urls
+
+# Scheduling tiers for --compare-file runs, most likely to have changed first
+PRIORITY_NEW = 0              # IDs not in the comparison file yet
+PRIORITY_OPEN_COMPLAINT = 1   # Civil complaint filed but no judgment yet
+PRIORITY_RECENT = 2           # Filed this year or last year
+PRIORITY_OTHER = 3
+PRIORITY_STALE = 4            # Resolved and older than STALE_AFTER_YEARS
+PRIORITY_DONE = 5             # End-of-stream sentinels from url_producer
+STALE_AFTER_YEARS = 3
+
+NOTICE_URL_RE = re.compile(r'60-Day-Notice-(\d{4})-(\d+)')
+
+def row_has_section(row, prefix):
+    """Check whether a comparison row has any non-empty field for a section prefix."""
+    return any(value not in (None, "") for key, value in row.items()
+               if isinstance(key, basestring) and key.startswith(prefix))
+
+# Score how likely a notice is to have changed since the comparison file was written
+def score_url_priority(url, comparison_row=None, today=None):
+    """
+    Args:
+        url: Notice URL
+        comparison_row: The URL's row from load_comparison_data, or None for a new ID
+        today: Date used to judge recency (default: today)
+        
+    Returns:
+        Tuple (tier, -year); lower values should be fetched first
+    """
+    today = today or datetime.date.today()
+    match = NOTICE_URL_RE.search(url)
+    year = int(match.group(1)) if match else today.year
+    if comparison_row is None:
+        return (PRIORITY_NEW, -year)
+    
+    has_complaint = row_has_section(comparison_row, 'Civil_Complaint_')
+    has_judgment = row_has_section(comparison_row, 'Judgment_')
+    has_settlement = (row_has_section(comparison_row, 'Settlement_') or
+                      row_has_section(comparison_row, 'Corrected_Settlement_'))
+    if has_complaint and not has_judgment:
+        tier = PRIORITY_OPEN_COMPLAINT
+    elif year >= today.year - 1:
+        tier = PRIORITY_RECENT
+    elif (has_judgment or has_settlement) and year <= today.year - STALE_AFTER_YEARS:
+        tier = PRIORITY_STALE
+    else:
+        tier = PRIORITY_OTHER
+    return (tier, -year)
+
+# Order URLs so the notices most likely to have changed are fetched first
+def prioritize_urls(urls, comparison_data, stale_sample=1.0, today=None):
+    """
+    Score and sort URLs for a --compare-file run.
+    
+    New IDs come first, then notices with an open civil complaint, then recent
+    filings, with stale resolved notices last. Newer years come first within
+    a tier, so a run that is cut short has still checked the notices most
+    likely to have new settlements or judgments.
+    
+    Args:
+        urls: URLs to schedule
+        comparison_data: Dictionary from load_comparison_data
+        stale_sample: Fraction of stale notices to keep (default: 1.0, all of them)
+        today: Date used to judge recency (default: today)
+        
+    Returns:
+        List of (priority, url) tuples in fetch order
+    """
+    prioritized = []
+    tier_counts = collections.Counter()
+    skipped = 0
+    for url in urls:
+        priority = score_url_priority(url, comparison_data.get(url), today)
+        if priority[0] == PRIORITY_STALE and stale_sample < 1.0 and random.random() >= stale_sample:
+            skipped += 1
+            continue
+        tier_counts[priority[0]] += 1
+        prioritized.append((priority, url))
+    # sort is stable, so URLs keep their original order within a priority
+    prioritized.sort(key=lambda item: item[0])
+    
+    print("Scheduling: {} new, {} open complaints, {} recent, {} other, {} stale ({} stale skipped)".format(
+        tier_counts[PRIORITY_NEW], tier_counts[PRIORITY_OPEN_COMPLAINT], tier_counts[PRIORITY_RECENT],
+        tier_counts[PRIORITY_OTHER], tier_counts[PRIORITY_STALE], skipped))
+    return prioritized
+
+# Patterns used when reading links back from a comparison workbook
+MARKDOWN_LINK_RE = re.compile(r'\[.*?\]\((.*?)\)')
+NOTICE_ID_RE = re.compile(r'(\d{4}[-/]\d{5})')
+
 # Function to load comparison data from an Excel file
 def load_comparison_data(excel_file):
     """
     Load comparison data from an Excel file.
     
+    The workbook is opened read-only and streamed row by row, so memory use
+    stays flat however large the previous report is.
+    
     Args:
         excel_file: Path to the Excel file
         
@@ -1292,27 +5173,33 @@ def load_comparison_data(excel_file):
     comparison_data = {}
     
     try:
-        # Load the workbook
-        workbook = openpyxl.load_workbook(excel_file)
+        # Load the workbook in read-only mode so rows are streamed from disk
+        import openpyxl
+        workbook = openpyxl.load_workbook(excel_file, read_only=True)
         if not workbook:
             print("Error: Could not load workbook from file: {}".format(excel_file))
             return comparison_data
-            
+    except Exception as e:
+        print("Error loading comparison data: {}".format(e))
+        logging.error("Error loading comparison data: {}".format(e))
+        return {}
+        
+    try:
         # Get the active sheet
         sheet = workbook.active
         if not sheet:
             print("Error: No active sheet found in workbook: {}".format(excel_file))
             return comparison_data
         
+        rows = sheet.iter_rows(values_only=True)
+        
         # Get header row from first row
-        if sheet.max_row < 1:
+        header_row = next(rows, None)
+        if header_row is None:
             print("Error: Sheet has no data rows")
             return comparison_data
             
-        headers = []
-        for cell in sheet[1]:
-            if cell.value:
-                headers.append(cell.value)
+        headers = [value for value in header_row if value]
         
         if not headers:
             print("Error: No headers found in first row")
@@ -1342,37 +5229,29 @@ def load_comparison_data(excel_file):
             print("No 'link' or URL column found in comparison file.")
             return comparison_data
         
-        # Read data rows
-        max_row = sheet.max_row or 0
-        for row_idx in range(2, max_row + 1):
-            row_data = {}
-            url = None
+        # Read data rows in a single pass
+        column_count = len(headers)
+        for row in rows:
+            # Read-only rows can be shorter than the header row when trailing cells are empty
+            if len(row) < column_count:
+                row = tuple(row) + (None,) * (column_count - len(row))
+            row_data = dict(zip(headers, row))
             
-            for col_idx, header in enumerate(headers, 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                if not cell:
-                    continue
-                    
-                cell_value = cell.value
-                
-                # Get URL from the link column
-                if col_idx - 1 == link_index:
-                    # Handle potential URL format variations
-                    if cell_value:
-                        cell_value_str = str(cell_value)
-                        # Extract URL if it's in markdown format [text](url)
-                        md_match = re.search(r'\[.*?\]\((.*?)\)', cell_value_str)
-                        if md_match:
-                            url = md_match.group(1)
-                        # Otherwise use the raw value if it looks like a URL
-                        elif 'http' in cell_value_str:
-                            url = cell_value_str
-                        # If it contains oag.ca.gov/prop65, it's likely a URL fragment
-                        elif 'oag.ca.gov/prop65' in cell_value_str:
-                            url = cell_value_str
-                
-                # Store all other values
-                row_data[header] = cell_value
+            # Get URL from the link column
+            url = None
+            cell_value = row[link_index]
+            if cell_value:
+                cell_value_str = str(cell_value)
+                # Extract URL if it's in markdown format [text](url)
+                md_match = MARKDOWN_LINK_RE.search(cell_value_str)
+                if md_match:
+                    url = md_match.group(1)
+                # Otherwise use the raw value if it looks like a URL
+                elif 'http' in cell_value_str:
+                    url = cell_value_str
+                # If it contains oag.ca.gov/prop65, it's likely a URL fragment
+                elif 'oag.ca.gov/prop65' in cell_value_str:
+                    url = cell_value_str
             
             # Ensure URL is complete
             if url:
@@ -1384,7 +5263,7 @@ def load_comparison_data(excel_file):
                             url = 'https://oag.ca.gov/prop65' + parts[1].strip()
                     else:
                         # Try to extract the notice ID if it looks like one (e.g., 2021-12345)
-                        notice_id_match = re.search(r'(\d{4}[-/]\d{5})', url_str)
+                        notice_id_match = NOTICE_ID_RE.search(url_str)
                         if notice_id_match:
                             notice_id = notice_id_match.group(1).replace('/', '-')
                             url = "https://oag.ca.gov/prop65/60-Day-Notice-{}".format(notice_id)
@@ -1401,8 +5280,50 @@ def load_comparison_data(excel_file):
         print("Error loading comparison data: {}".format(e))
         logging.error("Error loading comparison data: {}".format(e))
         return {}
+    finally:
+        # Read-only workbooks keep the file open until closed
+        workbook.close()
 
 # Function to compare and update data
+# Classify one scraped entry against the comparison file
+def comparison_status(entry, comparison_data):
+    """
+    Args:
+        entry: Notice record or result dictionary from process_url_data
+        comparison_data: Dictionary mapping URLs to existing data
+        
+    Returns:
+        "New", "Updated" or "Unchanged", or None if the entry has no URL
+    """
+    url = entry_link(entry)
+    if not url:
+        return None
+        
+    # Convert URL to string for comparison
+    url = str(url)
+    
+    # Check if this URL exists in the comparison data
+    if url not in comparison_data:
+        return 'New'
+        
+    # What existing data looks like
+    existing_entry = comparison_data[url]
+    
+    # Compare each category of data
+    for key, value in iter_entry_columns(entry):
+        # Skip the link field for comparison
+        if key == 'link':
+            continue
+            
+        # Get the existing value for this field; main data fields are directly
+        # in the row, and the other categories' keys are already prefixed
+        existing_value = existing_entry.get(key)
+        
+        # Compare the values - if different, mark as changed
+        if value and value != existing_value:
+            return 'Updated'
+    return 'Unchanged'
+
 def compare_and_update_data(new_data, comparison_data):
     """
     Compare new data with existing data and update as needed.
@@ -1428,66 +5349,27 @@ def compare_and_update_data(new_data, comparison_data):
     
     # Process each entry in the new data
     for entry in new_data:
-        url = entry.get('data', {}).get('link')
-        
-        if not url:
+        status = comparison_status(entry, comparison_data)
+        if status is None:
             # This shouldn't happen, but just in case
             print("Warning: Found entry without URL")
             continue
             
-        # Convert URL to string for comparison
-        url = str(url)
-        
-        # Check if this URL exists in the comparison data
-        if url in comparison_data:
-            # Check if any data has changed
-            has_changes = False
-            
-            # What existing data looks like
-            existing_entry = comparison_data[url]
-            
-            # Compare each category of data
-            for category in ['data', 'flat_civil_complaint_data', 'flat_settlement_data', 
-                           'flat_judgment_data', 'flat_corrected_settlement_data']:
-                if category in entry:
-                    for key, value in entry[category].items():
-                        # Skip the link field for comparison
-                        if key == 'link':
-                            continue
-                            
-                        # Get the existing value for this field
-                        existing_value = None
-                        if category == 'data':
-                            # Main data fields are directly in the row
-                            existing_value = existing_entry.get(key)
-                        else:
-                            # For other categories, the fields are prefixed
-                            prefixed_key = key  # The key is already prefixed in our data structure
-                            existing_value = existing_entry.get(prefixed_key)
-                            
-                        # Compare the values - if different, mark as changed
-                        if value and value != existing_value:
-                            has_changes = True
-                            break
-                            
-                if has_changes:
-                    break
-                    
-            if has_changes:
-                # Entry has changes, include it with 'Updated' status
-                entry['data']['Status'] = 'Updated'
-                result_data.append(entry)
-                updated_count += 1
-                print("Updated entry found: {}".format(url))
-            else:
-                # No changes, skip this entry
-                unchanged_count += 1
-        else:
+        if status == 'Updated':
+            # Entry has changes, include it with 'Updated' status
+            set_entry_status(entry, 'Updated')
+            result_data.append(entry)
+            updated_count += 1
+            print("Updated entry found: {}".format(entry_link(entry)))
+        elif status == 'New':
             # URL not in comparison data - this is a new entry
-            entry['data']['Status'] = 'New'
+            set_entry_status(entry, 'New')
             result_data.append(entry)
             new_entries_count += 1
-            print("New entry found: {}".format(url))
+            print("New entry found: {}".format(entry_link(entry)))
+        else:
+            # No changes, skip this entry
+            unchanged_count += 1
             
     # Print summary of comparison
     print("\nComparison Summary:")
@@ -1502,6 +5384,117 @@ def compare_and_update_data(new_data, comparison_data):
     
     return result_data
 
+# Normalized hash of a notice's extracted fields
+def notice_content_hash(entry):
+    """
+    Hash every non-empty field of a result entry, ignoring the link and Status
+    columns and differences in whitespace, so the same notice always hashes
+    the same way.
+    """
+    fields = []
+    for key, value in iter_entry_columns(entry):
+        if key in ('link', 'Status') or value is None or value == "":
+            continue
+        if not isinstance(value, basestring):
+            value = unicode(value)
+        fields.append((key, u" ".join(value.split())))
+    fields.sort()
+    return hashlib.sha1(json.dumps(fields)).hexdigest()
+
+# Section number in a flattened key such as Settlement_2_Case Name
+SECTION_NUMBER_RE = re.compile(r"(?:Corrected_)?(?:Settlement|Judgment)_(\d+)_")
+
+# Count of each section type on a notice, e.g. "1-2-1-0"
+def notice_section_fingerprint(entry):
+    """Fingerprint of how many complaint, settlement, judgment and corrected settlement sections a notice has."""
+    if isinstance(entry, Notice):
+        return "{}-{}-{}-{}".format(*entry.section_counts())
+    
+    def section_count(category):
+        numbers = set()
+        for key in (entry.get(category) or {}):
+            match = SECTION_NUMBER_RE.match(key)
+            if match:
+                numbers.add(match.group(1))
+        return len(numbers)
+    civil_complaint = 1 if entry.get('flat_civil_complaint_data') else 0
+    return "{}-{}-{}-{}".format(civil_complaint, section_count('flat_settlement_data'),
+                                section_count('flat_judgment_data'),
+                                section_count('flat_corrected_settlement_data'))
+
+# Compact record of what each notice looked like on the last run
+class NoticeStateStore:
+    """
+    SQLite store mapping each notice URL to its normalized content hash and
+    section fingerprint.
+    
+    Incremental runs classify each scraped notice as New, Updated or
+    Unchanged with a single primary-key lookup instead of loading and
+    comparing the previous workbook cell by cell.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS notices ("
+            "url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, "
+            "fingerprint TEXT NOT NULL, updated_at TEXT NOT NULL)")
+        self.connection.commit()
+        
+    def lookup(self, url):
+        """Return (content_hash, fingerprint) for a URL, or None if it has not been seen."""
+        return self.connection.execute(
+            "SELECT content_hash, fingerprint FROM notices WHERE url = ?", (url,)).fetchone()
+            
+    def classify(self, entry):
+        """Return "New", "Updated" or "Unchanged" for a result entry."""
+        previous = self.lookup(entry_link(entry))
+        if previous is None:
+            return 'New'
+        if tuple(previous) != (notice_content_hash(entry), notice_section_fingerprint(entry)):
+            return 'Updated'
+        return 'Unchanged'
+        
+    def filter_changed(self, new_data):
+        """
+        Keep only new and updated entries, marking each with a Status field
+        like compare_and_update_data does.
+        """
+        result_data = []
+        counts = {'New': 0, 'Updated': 0, 'Unchanged': 0}
+        for entry in new_data:
+            status = self.classify(entry)
+            counts[status] += 1
+            if status != 'Unchanged':
+                set_entry_status(entry, status)
+                result_data.append(entry)
+                
+        print("\nState Store Summary:")
+        print("  - Total entries checked: {}".format(len(new_data)))
+        print("  - Entries with updates: {}".format(counts['Updated']))
+        print("  - Unchanged entries (skipped): {}".format(counts['Unchanged']))
+        print("  - New entries: {}".format(counts['New']))
+        return result_data
+        
+    def state_row(self, entry):
+        """Return the compact (url, content_hash, fingerprint) row that record_rows stores for an entry."""
+        return (entry_link(entry), notice_content_hash(entry), notice_section_fingerprint(entry))
+        
+    def record(self, entries):
+        """Store the current hash and fingerprint for each entry."""
+        self.record_rows([self.state_row(entry) for entry in entries])
+        
+    def record_rows(self, rows):
+        """Store (url, content_hash, fingerprint) rows from state_row."""
+        updated_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO notices (url, content_hash, fingerprint, updated_at) VALUES (?, ?, ?, ?)",
+            [row + (updated_at,) for row in rows])
+        self.connection.commit()
+        
+    def close(self):
+        self.connection.close()
+
 def estimate_progress(start_time, urls_processed, total_urls):
     """
     Estimates scraping speed and time remaining based on progress so far.
@@ -1552,4 +5545,7 @@ def estimate_progress(start_time, urls_processed, total_urls):
     return speed, elapsed_time_str, remaining_time_str, completion_time_str
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "reparse":
+        reparse()
+    else:
+        main()
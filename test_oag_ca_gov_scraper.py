@@ -1,16 +1,42 @@
 import unittest
 import os
 import tempfile
+import shutil
+import tarfile
 import pandas as pd
 import datetime
 import time
 import math
+import zlib
+import gzip
+import io
+import queue
+import pickle
+import sqlite3
+import threading
+import subprocess
+import sys
 from unittest.mock import patch, Mock, MagicMock
 from bs4 import BeautifulSoup
 import openpyxl
 import oag_ca_gov_scraper
 from io import StringIO  # Python 3 import
 
+try:
+    import lxml.html
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    import pyarrow.parquet
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+# Saved notice pages used by the parser tests
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "notices")
+
 class TestUrlReading(unittest.TestCase):
     """
     Test class for validating URL extraction functionality from Excel and TSV files.
@@ -370,7 +396,1177 @@ class TestSheetWriting(unittest.TestCase):
         
         # Verify monetary conversion was attempted
         mock_convert.assert_called()
+    
+    def test_streaming_writer_matches_sheet_writer(self):
+        """Test that the write-only streaming writer produces the same cells."""
+        oag_ca_gov_scraper.write_data_to_sheet_with_all_headers(
+            self.sheet, self.all_data, self.all_headers_by_category
+        )
+        temp_dir = tempfile.mkdtemp()
+        output_file = os.path.join(temp_dir, "notices.xlsx")
+        try:
+            writer = oag_ca_gov_scraper.StreamingXlsxWriter(output_file)
+            writer.write_all(self.all_data)
+            writer.close()
+            
+            streamed_sheet = openpyxl.load_workbook(output_file)["Main Data"]
+            self.assertEqual(writer.rows_written, 2)
+            self.assertEqual(list(streamed_sheet.iter_rows(values_only=True)),
+                             list(self.sheet.iter_rows(values_only=True)))
+            self.assertEqual(streamed_sheet.cell(row=2, column=1).value, 'https://example.com/1')
+        finally:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            os.rmdir(temp_dir)
+
+
+class TestTypedOutput(unittest.TestCase):
+    """
+    Tests for the typed output formats: monetary columns become floats, date
+    columns become dates, and every format uses the same column order.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.entry = {
+            'data': {
+                'link': 'https://oag.ca.gov/prop65/60-Day-Notice-2021-02146',
+                'AG Number': '2021-02146',
+                'Date Filed': '08/12/2021'
+            },
+            'flat_settlement_data': {
+                'Settlement_1_Settlement Date': 'not a date',
+                'Settlement_1_Total Payments': '$12,500.00',
+                'Settlement_1_Non-Contingent Civil Penalty': '$0.00'
+            }
+        }
+        
+    def tearDown(self):
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+        
+    def write(self, output_format):
+        output_file = os.path.join(self.temp_dir, "notices." + output_format)
+        writer = oag_ca_gov_scraper.open_result_writer(output_format, output_file)
+        writer.write_all([self.entry])
+        writer.close()
+        return output_file
+    
+    def test_typed_row_values(self):
+        """Test that money, dates and unparseable dates are converted."""
+        headers = oag_ca_gov_scraper.build_ordered_headers()
+        header_to_index = {header: i for i, header in enumerate(headers)}
+        row = oag_ca_gov_scraper.build_typed_row(
+            self.entry, header_to_index, oag_ca_gov_scraper.build_column_types(headers))
+        self.assertEqual(row[header_to_index['Date Filed']], datetime.date(2021, 8, 12))
+        self.assertEqual(row[header_to_index['Settlement_1_Total Payments']], 12500.0)
+        self.assertIsNone(row[header_to_index['Settlement_1_Settlement Date']])
+        self.assertEqual(row[header_to_index['Settlement_1_Non-Contingent Civil Penalty']], 0.0)
+        self.assertEqual(row[header_to_index['AG Number']], '2021-02146')
+    
+    def test_csv_and_jsonl_share_schema(self):
+        """Test that CSV and JSON Lines output carry the same columns and values."""
+        csv_frame = pd.read_csv(self.write("csv"))
+        jsonl_frame = pd.read_json(self.write("jsonl"), lines=True)
+        headers = oag_ca_gov_scraper.build_ordered_headers()
+        self.assertEqual(list(csv_frame.columns), headers)
+        self.assertEqual(csv_frame['Settlement_1_Total Payments'][0], 12500.0)
+        self.assertEqual(csv_frame['Date Filed'][0], '2021-08-12')
+        self.assertEqual(jsonl_frame['Settlement_1_Total Payments'][0], 12500.0)
+        
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_parquet_column_types(self):
+        """Test that Parquet output stores money as float64 and dates as date32."""
+        table = pyarrow.parquet.read_table(self.write("parquet"))
+        self.assertEqual(table.num_rows, 1)
+        self.assertEqual(str(table.schema.field('Settlement_1_Total Payments').type), 'double')
+        self.assertEqual(str(table.schema.field('Date Filed').type), 'date32[day]')
+        self.assertEqual(table.column('Date Filed').to_pylist(), [datetime.date(2021, 8, 12)])
+        
+    def test_sqlite_keeps_every_section(self):
+        """Test that SQLite output has one typed row per section, past the five-section limit."""
+        for number in range(2, 8):
+            self.entry['flat_settlement_data']['Settlement_{}_Total Payments'.format(number)] = '$1,000.00'
+            self.entry['flat_settlement_data']['Settlement_{}_Plaintiff Attorney'.format(number)] = 'Smith'
+        self.entry['flat_corrected_settlement_data'] = {'Corrected_Settlement_1_Total Payments': '$50.00'}
+        connection = sqlite3.connect(self.write("sqlite"))
+        try:
+            self.assertEqual(connection.execute("SELECT ag_number, date_filed FROM notices").fetchall(),
+                             [('2021-02146', '2021-08-12')])
+            self.assertEqual(connection.execute(
+                "SELECT COUNT(*) FROM settlements WHERE corrected = 0").fetchone()[0], 7)
+            self.assertEqual(connection.execute(
+                "SELECT plaintiff_attorney, SUM(total_payments) FROM settlements WHERE corrected = 0 "
+                "GROUP BY plaintiff_attorney ORDER BY plaintiff_attorney").fetchall(),
+                [(None, 12500.0), ('Smith', 6000.0)])
+            self.assertEqual(connection.execute(
+                "SELECT section_number, total_payments FROM settlements WHERE corrected = 1").fetchall(),
+                [(1, 50.0)])
+        finally:
+            connection.close()
+
+class TestEndIdDiscovery(unittest.TestCase):
+    """
+    Tests for galloping plus binary search end-ID discovery, using a fake probe
+    over a known set of existing notice IDs.
+    """
+    
+    def make_probe(self, existing_ids):
+        probed = []
+        def probe(url):
+            probed.append(url)
+            return int(url.split("-")[-1]) in existing_ids
+        return probe, probed
+    
+    def test_finds_end_past_gaps(self):
+        """Test that gaps shorter than the tolerance do not end the search."""
+        existing_ids = set(range(1, 2001)) - {500, 501, 1500, 1501}
+        probe, probed = self.make_probe(existing_ids)
+        end_id = oag_ca_gov_scraper.discover_year_end_id(2024, 100, gap_tolerance=3, probe=probe)
+        self.assertEqual(end_id, 2000)
+        # O(log n) windows of 3 probes rather than one probe per ID
+        self.assertLess(len(probed), 100)
+    
+    def test_searches_down_from_stale_known_end(self):
+        """Test that a known end past the real end searches back down to min_id."""
+        probe, probed = self.make_probe(set(range(1, 1212)))
+        end_id = oag_ca_gov_scraper.discover_year_end_id(2025, 2000, min_id=1, probe=probe)
+        self.assertEqual(end_id, 1211)
+    
+    def test_no_new_ids(self):
+        """Test that nothing past start_id returns start_id - 1."""
+        probe, probed = self.make_probe(set(range(1, 51)))
+        end_id = oag_ca_gov_scraper.discover_year_end_id(2024, 51, probe=probe)
+        self.assertEqual(end_id, 50)
+    
+    def test_streams_urls_before_search_finishes(self):
+        """Test that confirmed IDs are yielded while the search is still probing past them."""
+        release = threading.Event()
+        def probe(url):
+            id_num = int(url.split("-")[-1])
+            if id_num > 20:
+                release.wait()
+            return id_num <= 40
+        discovered_end_ids = {}
+        urls = oag_ca_gov_scraper.iter_discovered_year_urls(2024, 1, 10, min_id=1, probe=probe,
+                                                            discovered_end_ids=discovered_end_ids)
+        # The search is blocked above ID 20, yet the first URLs are already available
+        first_urls = [next(urls) for _ in range(10)]
+        self.assertFalse(release.is_set())
+        release.set()
+        all_urls = first_urls + list(urls)
+        self.assertEqual(all_urls, [oag_ca_gov_scraper.notice_url(2024, i) for i in range(1, 41)])
+        self.assertEqual(discovered_end_ids, {2024: 40})
+    
+    def test_unique_urls_across_sources(self):
+        """Test that a URL repeated in a later source is only yielded once."""
+        urls = oag_ca_gov_scraper.unique_urls(["a", "b", "a"], iter(["c", "b"]))
+        self.assertEqual(list(urls), ["a", "b", "c"])
+
+class TestHttpFetching(unittest.TestCase):
+    """
+    Tests for the shared HTTP fetch layer used by url_worker and discovery.
+    These cover transparent decoding of gzip and deflate response bodies.
+    """
+    
+    def setUp(self):
+        self.body = b"<html><body>60-Day Notice</body></html>"
+    
+    def test_decode_identity(self):
+        """Test that unencoded bodies are returned unchanged."""
+        self.assertEqual(oag_ca_gov_scraper.decode_content_body(self.body, None), self.body)
+        self.assertEqual(oag_ca_gov_scraper.decode_content_body(self.body, "identity"), self.body)
+    
+    def test_decode_gzip(self):
+        """Test decoding of a gzip encoded body."""
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+            f.write(self.body)
+        result = oag_ca_gov_scraper.decode_content_body(buf.getvalue(), "gzip")
+        self.assertEqual(result, self.body)
+    
+    def test_decode_deflate(self):
+        """Test decoding of zlib-wrapped and raw deflate bodies."""
+        result = oag_ca_gov_scraper.decode_content_body(zlib.compress(self.body), "deflate")
+        self.assertEqual(result, self.body)
+        
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        raw = compressor.compress(self.body) + compressor.flush()
+        result = oag_ca_gov_scraper.decode_content_body(raw, "deflate")
+        self.assertEqual(result, self.body)
+
+
+class TestExistenceProbe(unittest.TestCase):
+    """
+    Tests for the lightweight existence probe used by discovery and --prefilter.
+    """
+    
+    def http_error(self, url, code):
+        return oag_ca_gov_scraper.urllib2.HTTPError(url, code, "error", {}, None)
+    
+    @patch('oag_ca_gov_scraper.probe_url')
+    def test_missing_notice(self, mock_probe):
+        """Test that a 404 means the notice does not exist."""
+        mock_probe.side_effect = self.http_error("https://example.com/1", 404)
+        self.assertIs(oag_ca_gov_scraper.probe_notice_exists("https://example.com/1"), False)
+        self.assertEqual(mock_probe.call_count, 1)
+    
+    @patch('oag_ca_gov_scraper.probe_url')
+    def test_head_not_allowed_falls_back_to_ranged_get(self, mock_probe):
+        """Test that a 405 for HEAD retries with a ranged GET."""
+        def probe(url, method):
+            if method == "HEAD":
+                raise self.http_error(url, 405)
+            return Mock()
+        mock_probe.side_effect = probe
+        self.assertIs(oag_ca_gov_scraper.probe_notice_exists("https://example.com/1", max_retries=1), True)
+        self.assertEqual([c[0][1] for c in mock_probe.call_args_list], ["HEAD", "GET"])
+    
+    @patch('oag_ca_gov_scraper.probe_notice_exists')
+    def test_prefilter_keeps_unchecked_urls(self, mock_exists):
+        """Test that pre-filtering drops missing URLs but keeps ones that could not be checked."""
+        results = {"https://example.com/1": True, "https://example.com/2": False, "https://example.com/3": None}
+        mock_exists.side_effect = lambda url: results[url]
+        urls = sorted(results.keys())
+        self.assertEqual(oag_ca_gov_scraper.prefilter_existing_urls(urls, workers=2),
+                         ["https://example.com/1", "https://example.com/3"])
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """
+    Tests for the AIMD per-host concurrency controller and Retry-After handling.
+    """
+    
+    def test_limit_grows_while_healthy(self):
+        """Test that fast successful responses raise the limit toward the maximum."""
+        controller = oag_ca_gov_scraper.AdaptiveConcurrencyController(initial_limit=2, max_limit=4)
+        for _ in range(50):
+            controller.acquire("example.com")
+            controller.release("example.com", status=200, latency=0.1)
+        self.assertEqual(controller.hosts["example.com"].limit, 4)
+    
+    def test_throttling_halves_limit_and_blocks_host(self):
+        """Test that a 429 halves the limit and pauses the host for Retry-After."""
+        controller = oag_ca_gov_scraper.AdaptiveConcurrencyController(initial_limit=8)
+        self.assertTrue(controller.try_acquire("example.com"))
+        controller.release("example.com", status=429, retry_after=30)
+        state = controller.hosts["example.com"]
+        self.assertEqual(state.limit, 4)
+        self.assertGreaterEqual(state.blocked_until - time.time(), 29)
+        self.assertFalse(controller.try_acquire("example.com"))
+        # Other hosts are unaffected
+        self.assertTrue(controller.try_acquire("other.example.com"))
+    
+    def test_slow_responses_hold_limit(self):
+        """Test that latency well above the best seen stops the limit from growing."""
+        controller = oag_ca_gov_scraper.AdaptiveConcurrencyController(initial_limit=2, max_limit=10)
+        controller.acquire("example.com")
+        controller.release("example.com", status=200, latency=0.1)
+        limit = controller.hosts["example.com"].limit
+        for _ in range(20):
+            controller.acquire("example.com")
+            controller.release("example.com", status=200, latency=5.0)
+        self.assertLess(controller.hosts["example.com"].limit, limit + 1)
+    
+    def test_fetch_error_releases_slot(self):
+        """Test that a request failing with something other than URLError still frees its slot."""
+        controller = oag_ca_gov_scraper.AdaptiveConcurrencyController(initial_limit=1)
+        fetcher = oag_ca_gov_scraper.HTTPFetcher(controller=controller)
+        with self.assertRaises(ValueError):
+            fetcher.send("http://example.com:bad/60-Day-Notice-2024-00001", "GET", None)
+        self.assertEqual(controller.hosts["example.com"].in_flight, 0)
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After in both delta-seconds and HTTP-date form."""
+        self.assertEqual(oag_ca_gov_scraper.parse_retry_after("120"), 120)
+        self.assertEqual(oag_ca_gov_scraper.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        self.assertIsNone(oag_ca_gov_scraper.parse_retry_after("soon"))
+        self.assertIsNone(oag_ca_gov_scraper.parse_retry_after(None))
+    
+    def test_backoff_delay_is_jittered_and_capped(self):
+        """Test that backoff doubles per attempt, stays within its jitter band and is capped."""
+        for attempt, expected in ((1, 2), (3, 8), (10, 60)):
+            delay = oag_ca_gov_scraper.backoff_delay(attempt, base=2, cap=60)
+            self.assertGreaterEqual(delay, expected / 2.0)
+            self.assertLessEqual(delay, expected)
+
+class TestRequestBudget(unittest.TestCase):
+    """
+    Tests for the process-wide token bucket that caps requests per second.
+    """
+    
+    def test_burst_then_paced(self):
+        """Test that a full bucket allows a burst and then makes callers wait their turn."""
+        bucket = oag_ca_gov_scraper.TokenBucket(rate=10, burst=3)
+        with patch('oag_ca_gov_scraper.time.sleep') as mock_sleep:
+            waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 0.1, places=2)
+        self.assertAlmostEqual(waits[4], 0.2, places=2)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual((bucket.requests, bucket.waited), (5, 2))
+    
+    def test_try_acquire_does_not_overdraw(self):
+        """Test that the non-blocking form fails instead of borrowing future tokens."""
+        bucket = oag_ca_gov_scraper.TokenBucket(rate=1, burst=1)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertGreater(bucket.next_token_in(), 0.5)
+        self.assertEqual(bucket.requests, 1)
+    
+    @patch('oag_ca_gov_scraper.HTTPFetcher.send_request')
+    def test_fetcher_draws_from_budget(self, mock_send):
+        """Test that requests through the shared fetcher spend tokens."""
+        mock_send.return_value = (Mock(status=200, getheader=Mock(return_value=None)), "")
+        budget = oag_ca_gov_scraper.configure_request_budget(rate=100, burst=100)
+        try:
+            fetcher = oag_ca_gov_scraper.HTTPFetcher()
+            fetcher.send("https://example.com/1", "GET", {})
+            fetcher.send("https://example.com/2", "GET", {})
+            self.assertEqual(budget.requests, 2)
+        finally:
+            oag_ca_gov_scraper.configure_request_budget(None)
+
+class TestRunMetrics(unittest.TestCase):
+    """
+    Tests for the run metrics histograms and their Prometheus and JSON export.
+    """
+    
+    def test_histogram_buckets_and_quantiles(self):
+        """Test that observations land in the right bucket and quantiles stay within it."""
+        histogram = oag_ca_gov_scraper.Histogram((1, 2, 5))
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.max, 10)
+        median = histogram.quantile(0.5)
+        self.assertTrue(1 <= median <= 2)
+    
+    def test_prometheus_text(self):
+        """Test the Prometheus text format with cumulative buckets and labels."""
+        metrics = oag_ca_gov_scraper.MetricsRegistry()
+        metrics.observe("fetch_seconds", 0.2, method="GET")
+        metrics.observe("fetch_seconds", 3, method="GET")
+        metrics.inc("retries_total", stage="fetch")
+        text = metrics.prometheus_text()
+        self.assertIn("# TYPE oag_scraper_fetch_seconds histogram", text)
+        self.assertIn('oag_scraper_fetch_seconds_bucket{method="GET",le="0.25"} 1', text)
+        self.assertIn('oag_scraper_fetch_seconds_bucket{method="GET",le="+Inf"} 2', text)
+        self.assertIn('oag_scraper_fetch_seconds_count{method="GET"} 2', text)
+        self.assertIn('oag_scraper_retries_total{stage="fetch"} 1', text)
+        self.assertNotIn("parse_seconds", text)
+    
+    def test_summary(self):
+        """Test the JSON summary of histograms and counters."""
+        metrics = oag_ca_gov_scraper.MetricsRegistry()
+        metrics.observe("parse_seconds", 0.02)
+        metrics.inc("retries_total", 2, stage="parse")
+        summary = metrics.summary()
+        self.assertEqual(summary["parse_seconds"][0]["count"], 1)
+        self.assertEqual(summary["retries_total"], [{"labels": {"stage": "parse"}, "value": 2}])
+    
+    def test_parse_notice_page_reports_section_timings(self):
+        """Test that parsing a saved notice times each extracted section."""
+        path = os.path.join(FIXTURES_DIR, "60-Day-Notice-2021-02146.html")
+        with open(path, "rb") as f:
+            html = f.read()
+        url, data, error, elapsed, section_timings = oag_ca_gov_scraper.parse_notice_page(
+            "https://oag.ca.gov/prop65/60-Day-Notice-2021-02146", html)
+        self.assertIsNone(error)
+        self.assertTrue(section_timings)
+        for section, seconds in section_timings:
+            self.assertIn(section, ("Civil Complaint", "Settlement", "Corrected Settlement", "Judgment"))
+            self.assertGreaterEqual(seconds, 0)
+
+class TestPageProfiler(unittest.TestCase):
+    """
+    Tests for --profile: sampled pages are profiled and merged into pstats and collapsed stacks.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        oag_ca_gov_scraper.configure_page_profiler(None)
+        shutil.rmtree(self.temp_dir)
+        
+    def test_profile_and_merge(self):
+        """Test that profiled pages produce merged stats, and any sampled stacks are rooted at process_url_data."""
+        profile_dir = os.path.join(self.temp_dir, "profile_run")
+        oag_ca_gov_scraper.configure_page_profiler(profile_dir, fraction=1.0)
+        with open(os.path.join(FIXTURES_DIR, "60-Day-Notice-2021-02146.html"), "rb") as f:
+            html = f.read()
+        for _ in range(20):
+            url, data, error, elapsed, section_timings = oag_ca_gov_scraper.parse_notice_page(
+                "https://oag.ca.gov/prop65/60-Day-Notice-2021-02146", html)
+            self.assertIsNone(error)
+        
+        files = oag_ca_gov_scraper.merge_profiles(profile_dir, profile_dir)
+        self.assertEqual(len(files), 3)
+        stats = oag_ca_gov_scraper.pstats.Stats(profile_dir + ".pstats")
+        profiled = set(func[2] for func in stats.stats)
+        self.assertIn("process_url_data", profiled)
+        self.assertIn("extract_section_data", profiled)
+        # Whether the sampler caught one of these short parses depends on timing
+        with open(profile_dir + ".collapsed") as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            self.assertTrue(line.startswith("process_url_data ("))
+    
+    def test_collapse_stack(self):
+        """Test that stacks are collapsed from process_url_data down, and other stacks are ignored."""
+        profiler = oag_ca_gov_scraper.PageProfiler(self.temp_dir)
+        
+        def process_url_data():
+            return extract_section_data()
+        
+        def extract_section_data():
+            return profiler.collapse_stack(sys._getframe())
+        
+        stack = process_url_data()
+        self.assertEqual([frame.split(" ")[0] for frame in stack.split(";")],
+                         ["process_url_data", "extract_section_data"])
+        self.assertIn("test_oag_ca_gov_scraper.py:", stack)
+        self.assertIsNone(profiler.collapse_stack(sys._getframe()))
+    
+    def test_sample_stacks(self):
+        """Test that the sampler records the stack of an active thread and stops once none are left."""
+        profiler = oag_ca_gov_scraper.PageProfiler(self.temp_dir, interval=0.001)
+        entered = threading.Event()
+        release = threading.Event()
+        
+        def process_url_data():
+            entered.set()
+            release.wait(10)
+        
+        page_thread = threading.Thread(target=process_url_data)
+        page_thread.start()
+        entered.wait(10)
+        profiler.active.add(page_thread.ident)
+        profiler.sampling = True
+        sampler = threading.Thread(target=profiler.sample_stacks)
+        sampler.start()
+        deadline = time.time() + 10
+        while not profiler.stacks and time.time() < deadline:
+            time.sleep(0.01)
+        with profiler.lock:
+            profiler.active.clear()
+        release.set()
+        page_thread.join(10)
+        sampler.join(10)
+        
+        self.assertFalse(sampler.is_alive())
+        self.assertFalse(profiler.sampling)
+        self.assertTrue(profiler.stacks)
+        for stack in profiler.stacks:
+            self.assertTrue(stack.startswith("process_url_data ("))
+    
+    def test_unsampled_pages_are_not_profiled(self):
+        """Test that a zero fraction leaves profiling off."""
+        self.assertIsNone(oag_ca_gov_scraper.configure_page_profiler(self.temp_dir, fraction=0))
+        self.assertEqual(oag_ca_gov_scraper.merge_profiles(self.temp_dir, self.temp_dir + "/out"), [])
+
+class TestStartup(unittest.TestCase):
+    """
+    Tests that importing the scraper stays fast by deferring heavy dependencies
+    to the code paths that need them.
+    """
+    
+    def test_import_loads_no_heavy_dependencies(self):
+        """Test that a fresh import loads none of the parsing, spreadsheet or email libraries."""
+        script = ("import sys, oag_ca_gov_scraper\n"
+                  "print(','.join(sorted(name for name in ('bs4', 'pandas', 'openpyxl', 'xlwt', 'nile') "
+                  "if name in sys.modules)))")
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.strip(), b"")
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Smoke test for bench_oag_ca_gov_scraper.py: every suite runs to completion
+    on a tiny input, so changes to the record types cannot quietly break it.
+    """
+    
+    def test_every_suite_runs(self):
+        """Test that each benchmark suite finishes on a tiny input."""
+        bench = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_oag_ca_gov_scraper.py")
+        output = subprocess.check_output(
+            [sys.executable, bench, "--repeat", "1", "--rows", "20", "--urls", "5", "--threads", "2",
+             "--latency", "0", "--report-rows", "20"],
+            cwd=os.path.dirname(bench), stderr=subprocess.STDOUT)
+        for suite in ("startup", "comparison", "extract", "scrape", "discovery", "xlsx"):
+            self.assertIn("== {} ==".format(suite).encode(), output)
+
+class TestResultSink(unittest.TestCase):
+    """
+    Tests for the consumer that journals, filters and writes results as they arrive.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.temp_dir, "notices.csv")
+        self.new_entry = {'data': {'link': 'https://oag.ca.gov/prop65/60-Day-Notice-2021-02146',
+                                   'AG Number': '2021-02146'}}
+        self.unchanged_entry = {'data': {'link': 'https://oag.ca.gov/prop65/60-Day-Notice-2021-00001',
+                                         'AG Number': '2021-00001'}}
+        
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        
+    def run_sink(self, entries, **kwargs):
+        results_queue = queue.Queue()
+        for entry in entries + [None]:
+            results_queue.put(entry)
+        sink = oag_ca_gov_scraper.ResultSink(results_queue, "csv", self.output_file, **kwargs)
+        sink.run()
+        return sink
+    
+    def test_writes_changed_entries_and_records_state(self):
+        """Test that unchanged entries are skipped, and all entries are journaled."""
+        state_db = os.path.join(self.temp_dir, "state.db")
+        store = oag_ca_gov_scraper.NoticeStateStore(state_db)
+        store.record([self.unchanged_entry])
+        store.close()
+        journal = oag_ca_gov_scraper.RunJournal(os.path.join(self.temp_dir, "run.jsonl"))
+        
+        sink = self.run_sink([self.new_entry, self.unchanged_entry], journal=journal, state_db=state_db)
+        journal.close()
+        self.assertIsNone(sink.error)
+        self.assertEqual((sink.received, sink.written), (2, 1))
+        with open(self.output_file) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        self.assertEqual(self.new_entry['data']['Status'], 'New')
+        
+        store = oag_ca_gov_scraper.NoticeStateStore(state_db)
+        self.assertEqual(store.classify(self.new_entry), 'Unchanged')
+        store.close()
+        statuses = oag_ca_gov_scraper.RunJournal(journal.path).load()[3]
+        self.assertEqual(set(statuses.values()), {"done"})
+    
+    def test_no_report_without_changes(self):
+        """Test that filtering out every entry writes no report."""
+        comparison_data = {self.unchanged_entry['data']['link']: {'AG Number': '2021-00001'}}
+        sink = self.run_sink([self.unchanged_entry], comparison_data=comparison_data)
+        self.assertEqual(sink.written, 0)
+        self.assertFalse(os.path.exists(self.output_file))
+    
+    def test_keeps_draining_after_error(self):
+        """Test that a failing journal does not leave producers blocked on a full queue."""
+        results_queue = queue.Queue(maxsize=2)
+        journal = Mock()
+        journal.record_results.side_effect = IOError("No space left on device")
+        sink = oag_ca_gov_scraper.ResultSink(results_queue, "csv", self.output_file, journal=journal)
+        sink_thread = threading.Thread(target=sink.run)
+        sink_thread.daemon = True
+        sink_thread.start()
+        for _ in range(20):
+            results_queue.put(dict(self.new_entry), timeout=5)
+        results_queue.put(None, timeout=5)
+        sink_thread.join(5)
+        self.assertFalse(sink_thread.is_alive())
+        self.assertIsInstance(sink.error, IOError)
+        self.assertTrue(results_queue.empty())
+
+class TestNoticeRecord(unittest.TestCase):
+    """
+    Tests for the slotted Notice record and its flat column views.
+    """
+    
+    def parse(self, filename):
+        with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+            page_content = f.read()
+        url = "https://oag.ca.gov/prop65/" + filename[:-len(".html")]
+        backend = oag_ca_gov_scraper.get_parser_backend("index")
+        return oag_ca_gov_scraper.process_url_data(url, backend.parse(page_content), backend, as_notice=True)
+    
+    def test_views_match_dictionary(self):
+        """Test that the record produces the same dictionary, row, hash and fingerprint."""
+        notice = self.parse("60-Day-Notice-2020-00321.html")
+        entry = notice.to_dict()
+        headers = oag_ca_gov_scraper.build_ordered_headers()
+        header_to_index = {header: i for i, header in enumerate(headers)}
+        self.assertEqual(oag_ca_gov_scraper.build_sheet_row(notice, header_to_index),
+                         oag_ca_gov_scraper.build_sheet_row(entry, header_to_index))
+        self.assertEqual(oag_ca_gov_scraper.notice_content_hash(notice),
+                         oag_ca_gov_scraper.notice_content_hash(entry))
+        self.assertEqual(oag_ca_gov_scraper.notice_section_fingerprint(notice),
+                         oag_ca_gov_scraper.notice_section_fingerprint(entry))
+        self.assertEqual(pickle.loads(pickle.dumps(notice)).to_dict(), entry)
+        self.assertEqual(oag_ca_gov_scraper.Notice.from_dict(entry).to_dict(), entry)
+    
+    def test_column_names_are_shared(self):
+        """Test that two notices share one copy of each flat column name."""
+        first = self.parse("60-Day-Notice-2020-00321.html")
+        second = self.parse("60-Day-Notice-2020-00321.html")
+        first_names = [name for name, _ in first.iter_columns()]
+        second_names = [name for name, _ in second.iter_columns()]
+        self.assertTrue(all(a is b for a, b in zip(first_names, second_names)))
+    
+    def test_flat_view_keeps_five_sections(self):
+        """Test that every section is kept on the record but only five get columns."""
+        settlement = oag_ca_gov_scraper.Settlement.from_mapping({'Case Name': 'People v. Example Co.'})
+        notice = oag_ca_gov_scraper.Notice(("https://oag.ca.gov/prop65/60-Day-Notice-2021-00001",) +
+                                           (None,) * 8, settlements=[settlement] * 6)
+        self.assertEqual(len(notice.settlements), 6)
+        entry = notice.to_dict()
+        self.assertIn('Settlement_5_Case Name', entry['flat_settlement_data'])
+        self.assertNotIn('Settlement_6_Case Name', entry['flat_settlement_data'])
+        oag_ca_gov_scraper.set_entry_status(notice, 'New')
+        self.assertEqual(notice.to_dict()['data']['Status'], 'New')
 
+class FakeAsyncResult(object):
+    """AsyncResult of a job that failed with error, or that never finishes when error is None."""
+    def __init__(self, error=None):
+        self.error = error
+        
+    def ready(self):
+        return self.error is not None
+        
+    def successful(self):
+        return False
+        
+    def get(self, timeout=None):
+        raise self.error
+
+class FakePool(object):
+    """Pool whose jobs never call their callback, like a lost worker or an unpicklable result."""
+    def __init__(self, error=None):
+        self.error = error
+        self.joined = False
+        self.terminated = False
+        
+    def apply_async(self, func, args, callback=None):
+        return FakeAsyncResult(self.error)
+        
+    def close(self):
+        pass
+        
+    def join(self):
+        self.joined = True
+        
+    def terminate(self):
+        self.terminated = True
+
+class TestParseJobs(unittest.TestCase):
+    """
+    Tests that every page handed to the parse pool reaches its callback once,
+    even when the pool never calls it back.
+    """
+    
+    def test_failed_result_reaches_callback(self):
+        """Test that a job the pool could not return is finished with an error, once."""
+        results = []
+        parse_jobs = oag_ca_gov_scraper.ParseJobs(FakePool(IOError("Can't pickle the result")))
+        parse_jobs.submit("https://oag.ca.gov/prop65/60-Day-Notice-2024-00001", "", "index", results.append)
+        parse_jobs.reap()
+        parse_jobs.reap()
+        self.assertEqual(results, [("https://oag.ca.gov/prop65/60-Day-Notice-2024-00001", None,
+                                    "Parse failed: Can't pickle the result", 0.0, [])])
+        parse_jobs.close()
+        self.assertTrue(parse_jobs.pool.joined)
+    
+    def test_lost_job_times_out(self):
+        """Test that a job with no result is failed after the timeout and the pool is terminated."""
+        results = []
+        parse_jobs = oag_ca_gov_scraper.ParseJobs(FakePool(), timeout=0)
+        parse_jobs.submit("https://oag.ca.gov/prop65/60-Day-Notice-2024-00001", "", "index", results.append)
+        time.sleep(0.01)
+        parse_jobs.close(poll_interval=0.01)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][2], "No parse result after 0s")
+        self.assertEqual(parse_jobs.lost, 1)
+        self.assertTrue(parse_jobs.pool.terminated)
+    
+    def test_parse_stage_releases_slots(self):
+        """Test that failed jobs free their slots so the parse stage does not block."""
+        urls = ["https://oag.ca.gov/prop65/60-Day-Notice-2024-0000{}".format(i) for i in range(1, 4)]
+        page_queue = queue.Queue()
+        for url in urls:
+            page_queue.put((url, ""))
+        page_queue.put(None)
+        failed_urls = []
+        with patch('oag_ca_gov_scraper.multiprocessing.Pool', return_value=FakePool(IOError("Worker died"))):
+            parse_thread = threading.Thread(target=oag_ca_gov_scraper.parse_stage_worker,
+                                            args=(page_queue, queue.Queue(), failed_urls, 1, 1))
+            parse_thread.daemon = True
+            parse_thread.start()
+            parse_thread.join(10)
+        self.assertFalse(parse_thread.is_alive())
+        self.assertEqual(sorted(failed_urls), urls)
+
+class TestPageCache(unittest.TestCase):
+    """
+    Tests for the on-disk page cache and conditional fetches that reuse the
+    cached HTML when the server answers 304 Not Modified.
+    """
+    
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = oag_ca_gov_scraper.configure_page_cache(self.cache_dir)
+        self.url = "https://oag.ca.gov/prop65/60-Day-Notice-2021-02146"
+        self.page = b"<html><body>60-Day Notice</body></html>"
+        
+    def tearDown(self):
+        oag_ca_gov_scraper.configure_page_cache(None)
+        shutil.rmtree(self.cache_dir)
+    
+    def test_store_and_revalidation_headers(self):
+        """Test that stored pages round-trip and their validators become conditional headers."""
+        self.cache.store(self.url, self.page, '"abc"', "Mon, 01 Mar 2021 00:00:00 GMT")
+        entry = self.cache.lookup(self.url)
+        self.assertEqual(self.cache.read(entry), self.page)
+        self.assertEqual(self.cache.conditional_headers(entry), {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 01 Mar 2021 00:00:00 GMT",
+        })
+        self.assertIsNone(self.cache.lookup("https://oag.ca.gov/prop65/60-Day-Notice-2021-00001"))
+    
+    def test_identical_pages_share_one_object(self):
+        """Test that the body store is content-addressed."""
+        self.cache.store(self.url, self.page)
+        self.cache.store(self.url + "0", self.page)
+        self.assertEqual(len(list(self.cache.iter_entries())), 2)
+        object_files = [name for _, _, files in os.walk(self.cache.objects_dir) for name in files]
+        self.assertEqual(len(object_files), 1)
+    
+    @patch('oag_ca_gov_scraper.fetch_url')
+    def test_not_modified_reuses_cached_page(self, mock_fetch):
+        """Test that a 304 response returns the cached HTML and is counted."""
+        self.cache.store(self.url, self.page, '"abc"')
+        mock_fetch.return_value = Mock(getcode=Mock(return_value=304))
+        stats = oag_ca_gov_scraper.PipelineStats()
+        self.assertEqual(oag_ca_gov_scraper.fetch_notice_page(self.url, stats), self.page)
+        self.assertEqual(mock_fetch.call_args[1]["headers"], {"If-None-Match": '"abc"'})
+        self.assertEqual(stats.snapshot()["not_modified"], 1)
+
+class TestReparse(unittest.TestCase):
+    """
+    Tests for offline re-extraction over saved notice pages.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_saved_page_url(self):
+        """Test that saved file names map back to notice URLs."""
+        self.assertEqual(oag_ca_gov_scraper.saved_page_url("pages/60-Day-Notice-2021-02146.html"),
+                         "https://oag.ca.gov/prop65/60-Day-Notice-2021-02146")
+    
+    def test_reparse_directory_and_archive(self):
+        """Test that a directory and a tar archive of the same pages give the same report."""
+        archive_path = os.path.join(self.temp_dir, "pages.tar.gz")
+        names = sorted(os.listdir(FIXTURES_DIR))
+        with tarfile.open(archive_path, "w:gz") as archive:
+            for name in names:
+                archive.add(os.path.join(FIXTURES_DIR, name), arcname=name)
+        
+        outputs = []
+        for source in (FIXTURES_DIR, archive_path):
+            output_file = os.path.join(self.temp_dir, "report{}.csv".format(len(outputs)))
+            _, parsed_count, failed_urls = oag_ca_gov_scraper.reparse(
+                source, output_file=output_file, output_format="csv", processes=1)
+            self.assertEqual((parsed_count, failed_urls), (len(names), []))
+            outputs.append(pd.read_csv(output_file))
+        
+        self.assertEqual(list(outputs[0]['AG Number']),
+                         [name[len("60-Day-Notice-"):-len(".html")] for name in names])
+        self.assertTrue(outputs[0].equals(outputs[1]))
+
+class TestNoticeStateStore(unittest.TestCase):
+    """
+    Tests for incremental change detection with per-notice content hashes.
+    """
+    
+    def setUp(self):
+        self.store = oag_ca_gov_scraper.NoticeStateStore(":memory:")
+        self.entry = {
+            'data': {'link': 'https://oag.ca.gov/prop65/60-Day-Notice-2021-02146', 'AG Number': '2021-02146'},
+            'flat_settlement_data': {'Settlement_1_Case Name': 'People v. Example Co.'}
+        }
+        
+    def tearDown(self):
+        self.store.close()
+    
+    def test_section_fingerprint(self):
+        """Test that the fingerprint counts sections of each type."""
+        self.entry['flat_judgment_data'] = {'Judgment_1_Case Name': 'A', 'Judgment_2_Case Name': 'B'}
+        self.assertEqual(oag_ca_gov_scraper.notice_section_fingerprint(self.entry), "0-1-2-0")
+    
+    def test_classify_new_unchanged_updated(self):
+        """Test New, then Unchanged after recording (ignoring whitespace), then Updated."""
+        self.assertEqual(self.store.classify(self.entry), 'New')
+        self.store.record([self.entry])
+        
+        self.entry['flat_settlement_data']['Settlement_1_Case Name'] = ' People v.  Example Co. '
+        self.assertEqual(self.store.classify(self.entry), 'Unchanged')
+        
+        self.entry['flat_settlement_data']['Settlement_2_Case Name'] = 'People v. Other Co.'
+        self.assertEqual(self.store.classify(self.entry), 'Updated')
+    
+    def test_filter_changed_marks_status(self):
+        """Test that only new and updated entries are kept, with a Status field."""
+        unchanged = {'data': {'link': 'https://oag.ca.gov/prop65/60-Day-Notice-2021-00001', 'AG Number': '2021-00001'}}
+        self.store.record([unchanged])
+        result = self.store.filter_changed([self.entry, unchanged])
+        self.assertEqual(result, [self.entry])
+        self.assertEqual(self.entry['data']['Status'], 'New')
+
+class TestComparisonLoading(unittest.TestCase):
+    """
+    Tests for streaming a previous report back in with load_comparison_data.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.excel_file = os.path.join(self.temp_dir, "previous.xlsx")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['link', 'AG Number', 'Date Filed'])
+        sheet.append(['https://oag.ca.gov/prop65/60-Day-Notice-2021-00001', '2021-00001', '01/01/2021'])
+        sheet.append(['[2021-00002](https://oag.ca.gov/prop65/60-Day-Notice-2021-00002)', '2021-00002'])
+        sheet.append(['oag.ca.gov/prop65/60-Day-Notice-2021-00003', '2021-00003', '01/03/2021'])
+        sheet.append(['not a link', 'n/a', None])
+        workbook.save(self.excel_file)
+        
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_load_comparison_data(self):
+        """Test that plain, markdown and schemeless links are all resolved to URLs."""
+        comparison_data = oag_ca_gov_scraper.load_comparison_data(self.excel_file)
+        self.assertEqual(sorted(comparison_data.keys()), [
+            'https://oag.ca.gov/prop65/60-Day-Notice-2021-00001',
+            'https://oag.ca.gov/prop65/60-Day-Notice-2021-00002',
+            'https://oag.ca.gov/prop65/60-Day-Notice-2021-00003',
+        ])
+        row = comparison_data['https://oag.ca.gov/prop65/60-Day-Notice-2021-00002']
+        self.assertEqual(row['AG Number'], '2021-00002')
+        self.assertIsNone(row['Date Filed'])
+
+class TestPriorityScheduling(unittest.TestCase):
+    """
+    Tests for fetching the notices most likely to have changed first on
+    --compare-file runs.
+    """
+    
+    def setUp(self):
+        self.today = datetime.date(2025, 6, 1)
+        base = "https://oag.ca.gov/prop65/60-Day-Notice-{}"
+        self.stale = base.format("2015-00010")
+        self.open_complaint = base.format("2019-00020")
+        self.recent = base.format("2025-00030")
+        self.new = base.format("2025-00040")
+        self.comparison_data = {
+            self.stale: {'Civil_Complaint_Case Name': 'A', 'Judgment_1_Judgment Date': '01/01/2016'},
+            self.open_complaint: {'Civil_Complaint_Case Name': 'B', 'Judgment_1_Judgment Date': ''},
+            self.recent: {'AG Number': '2025-00030'},
+        }
+    
+    def test_prioritize_urls_order(self):
+        """Test new IDs, then open complaints, then recent filings, with stale notices last."""
+        urls = [self.stale, self.recent, self.open_complaint, self.new]
+        prioritized = oag_ca_gov_scraper.prioritize_urls(urls, self.comparison_data, today=self.today)
+        self.assertEqual([url for _, url in prioritized],
+                         [self.new, self.open_complaint, self.recent, self.stale])
+    
+    def test_stale_sampling(self):
+        """Test that a zero stale sample drops stale notices entirely."""
+        prioritized = oag_ca_gov_scraper.prioritize_urls(
+            [self.stale, self.recent], self.comparison_data, stale_sample=0.0, today=self.today)
+        self.assertEqual([url for _, url in prioritized], [self.recent])
+    
+    def test_priority_url_queue(self):
+        """Test that the queue returns bare URLs, lowest priority first, FIFO within a priority."""
+        url_queue = oag_ca_gov_scraper.PriorityURLQueue()
+        url_queue.put(((3, -2015), "c"))
+        url_queue.put(((0, -2025), "a"))
+        url_queue.put(((3, -2015), "d"))
+        url_queue.put(((1, -2020), "b"))
+        self.assertEqual([url_queue.get(block=False) for _ in range(4)], ["a", "b", "c", "d"])
+        self.assertTrue(url_queue.empty())
+
+class TestEventLoopEngine(unittest.TestCase):
+    """
+    Tests for the incremental HTTP response parser used by the asyncio engine.
+    Responses are fed in small pieces to mimic non-blocking socket reads.
+    """
+    
+    def feed_in_pieces(self, parser, raw, size=5):
+        complete = False
+        for i in range(0, len(raw), size):
+            complete = parser.feed(raw[i:i + size])
+        return complete
+    
+    def test_parse_content_length_response(self):
+        """Test parsing a response with a Content-Length body."""
+        parser = oag_ca_gov_scraper.HTTPResponseParser()
+        raw = "HTTP/1.1 200 OK\r\nContent-Length: 11\r\n\r\nhello world"
+        self.assertTrue(self.feed_in_pieces(parser, raw))
+        self.assertEqual(parser.status, 200)
+        self.assertEqual(parser.get_body(), "hello world")
+        self.assertFalse(parser.will_close)
+    
+    def test_parse_chunked_response(self):
+        """Test parsing a chunked response split across reads."""
+        parser = oag_ca_gov_scraper.HTTPResponseParser()
+        raw = ("HTTP/1.1 404 Not Found\r\nTransfer-Encoding: chunked\r\n\r\n"
+               "5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n")
+        self.assertTrue(self.feed_in_pieces(parser, raw, size=3))
+        self.assertEqual(parser.status, 404)
+        self.assertEqual(parser.get_body(), "hello world")
+    
+    def test_parse_body_until_close(self):
+        """Test a response without a length that ends when the server closes."""
+        parser = oag_ca_gov_scraper.HTTPResponseParser()
+        self.assertFalse(parser.feed("HTTP/1.0 200 OK\r\n\r\npartial"))
+        self.assertTrue(parser.feed_eof())
+        self.assertEqual(parser.get_body(), "partial")
+        self.assertTrue(parser.will_close)
+
+
+class TestPipelineStats(unittest.TestCase):
+    """
+    Tests for the per-stage counters of the fetch/parse pipeline, including
+    the bottleneck hint derived from the depth of the bounded page queue.
+    """
+    
+    def test_report_counts_and_averages(self):
+        """Test that stage counts and average times are reported."""
+        stats = oag_ca_gov_scraper.PipelineStats()
+        stats.add("fetched", 4)
+        stats.add("fetch_seconds", 2.0)
+        stats.add("parsed", 2)
+        stats.add("parse_seconds", 1.0)
+        lines = stats.report_lines()
+        self.assertEqual(lines[0], "Fetch stage: 4 fetched, 0 failed, 0.50s avg per page")
+        self.assertEqual(lines[1], "Parse stage: 2 parsed, 0 failed, 0.50s avg per page")
+    
+    def test_full_page_queue_points_at_parse_stage(self):
+        """Test that a full page queue identifies the parse stage as the bottleneck."""
+        stats = oag_ca_gov_scraper.PipelineStats()
+        stats.add("fetched", 2)
+        page_queue = queue.Queue(maxsize=2)
+        page_queue.put(("url1", "page"))
+        page_queue.put(("url2", "page"))
+        self.assertIn("Bottleneck: parse stage", stats.report_lines(page_queue))
+    
+    def test_empty_page_queue_points_at_fetch_stage(self):
+        """Test that an empty page queue identifies the fetch stage as the bottleneck."""
+        stats = oag_ca_gov_scraper.PipelineStats()
+        stats.add("fetched", 2)
+        page_queue = queue.Queue(maxsize=2)
+        self.assertIn("Bottleneck: fetch stage", stats.report_lines(page_queue))
+
+
+class TestParserBackendParity(unittest.TestCase):
+    """
+    Parity tests between the BeautifulSoup reference backend and the lxml and
+    indexed backends. Every saved notice page in fixtures/notices is parsed
+    with each backend and the resulting process_url_data dictionaries must be
+    identical.
+    """
+    
+    def load_fixtures(self):
+        pages = []
+        for filename in sorted(os.listdir(FIXTURES_DIR)):
+            if filename.endswith(".html"):
+                url = "https://oag.ca.gov/prop65/" + filename[:-len(".html")]
+                with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+                    pages.append((url, f.read()))
+        return pages
+    
+    def parse_with(self, backend_name, url, page_content):
+        backend = oag_ca_gov_scraper.get_parser_backend(backend_name)
+        return oag_ca_gov_scraper.process_url_data(url, backend.parse(page_content), backend)
+    
+    def test_fixtures_present(self):
+        """Test that the saved pages are available."""
+        self.assertTrue(self.load_fixtures())
+    
+    @unittest.skipUnless(HAVE_LXML, "lxml is not installed")
+    def test_lxml_matches_bs4_on_saved_pages(self):
+        """Test that both backends produce identical dictionaries for every saved page."""
+        for url, page_content in self.load_fixtures():
+            expected = self.parse_with("bs4", url, page_content)
+            result = self.parse_with("lxml", url, page_content)
+            self.assertEqual(result, expected, "Backends differ for {}".format(url))
+    
+    def test_index_matches_bs4_on_saved_pages(self):
+        """Test that the single-pass index produces identical dictionaries for every saved page."""
+        for url, page_content in self.load_fixtures():
+            expected = self.parse_with("bs4", url, page_content)
+            result = self.parse_with("index", url, page_content)
+            self.assertEqual(result, expected, "Backends differ for {}".format(url))
+    
+    @unittest.skipUnless(HAVE_LXML, "lxml is not installed")
+    def test_extract_value_parity(self):
+        """Test extract_value on the same label with both backends."""
+        url, page_content = self.load_fixtures()[0]
+        soup = BeautifulSoup(page_content, "html.parser")
+        doc = oag_ca_gov_scraper.get_parser_backend("lxml").parse(page_content)
+        for label in ["AG Number:", "Date Filed:", "Chemicals:", "Missing Label:"]:
+            self.assertEqual(oag_ca_gov_scraper.extract_value(doc, label),
+                             oag_ca_gov_scraper.extract_value(soup, label))
+    
+    def test_unexpected_value_node(self):
+        """Test that text where a value tag is expected empties the field in every backend."""
+        url = "https://oag.ca.gov/prop65/60-Day-Notice-2024-00001"
+        page_content = (b'<html><body><div class="field-label">AG Number:</div><div>2024-00001</div>'
+                        b'<div>Settlement</div><div class="panel">'
+                        b'<div class="field-label">Case Name:</div>Acme v. Smith'
+                        b'<div class="field-label">Court Name:</div><div>Superior Court</div>'
+                        b'</div></body></html>')
+        backends = ["bs4", "index"] + (["lxml"] if HAVE_LXML else [])
+        for backend_name in backends:
+            settlement = self.parse_with(backend_name, url, page_content)['flat_settlement_data']
+            self.assertEqual(settlement['Settlement_1_Case Name'], "", backend_name)
+            self.assertEqual(settlement['Settlement_1_Court Name'], "Superior Court", backend_name)
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with self.assertRaises(ValueError):
+            oag_ca_gov_scraper.get_parser_backend("html5lib")
+
+
+class TestNoticePageIndex(unittest.TestCase):
+    """
+    Tests for the single-pass NoticePageIndex: document-order positions,
+    subtree ranges and cached label lookups.
+    """
+    
+    def setUp(self):
+        html = ('<div id="a"><div class="field-label">Case Name:</div><div id="b">X</div></div>'
+                '<div>Settlement</div><div><div class="field-label">Case Name:</div><div>Y</div></div>')
+        self.index = oag_ca_gov_scraper.NoticePageIndex(BeautifulSoup(html, "html.parser"))
+    
+    def test_positions_and_ranges(self):
+        """Test that subtree ends and parents are recorded in document order."""
+        self.assertEqual(len(self.index.tags), 7)
+        self.assertEqual(self.index.ends[0], 2)
+        self.assertEqual(self.index.parents[1], 0)
+        self.assertEqual(self.index.next_sibling_position(1), 2)
+        self.assertIsNone(self.index.next_sibling_position(2))
+    
+    def test_label_lookup_is_scoped_to_subtree(self):
+        """Test that label lookups only match inside the requested subtree."""
+        self.assertEqual(self.index.find_label("field-label", -1, "Case Name:"), 1)
+        self.assertEqual(self.index.find_label("field-label", 4, "Case Name:"), 5)
+        self.assertIsNone(self.index.find_label("field-label", 2, "Case Name:"))
+        self.assertEqual(self.index.settlements, [3])
+    
+    def test_extraction_through_index(self):
+        """Test extracting a section value through the indexed backend."""
+        element = oag_ca_gov_scraper.IndexedElement(self.index, 3)
+        self.assertEqual(oag_ca_gov_scraper.extract_value_from_element(element, "Case Name:"), "Y")
+        self.assertEqual(oag_ca_gov_scraper.extract_value(self.index, "Case Name:"), "X")
+
+
+class TestRunJournal(unittest.TestCase):
+    """
+    Tests for the run journal used to resume interrupted scrapes: the latest
+    record for a URL wins and only unfinished URLs are left to retry.
+    """
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = oag_ca_gov_scraper.get_run_journal_path(self.temp_dir, "20240101_120000")
+        os.makedirs(os.path.dirname(self.path))
+        
+    def tearDown(self):
+        # Clean up the journal, its runs directory and any report written from it
+        shutil.rmtree(self.temp_dir)
+    
+    def test_load_restores_progress(self):
+        """Test that done results are restored and a retried failure counts as done."""
+        urls = ["https://oag.ca.gov/prop65/60-Day-Notice-2024-0000{}".format(i) for i in range(3)]
+        journal = oag_ca_gov_scraper.RunJournal(self.path)
+        journal.record_start("20240101_120000", urls, {"compare_file": "previous.xlsx"})
+        journal.record_results([{'data': {'link': urls[0], 'AG Number': "2024-00000"}}])
+        journal.record_failures([urls[1]])
+        journal.record_results([{'data': {'link': urls[1], 'AG Number': "2024-00001"}}])
+        journal.close()
+        
+        options, loaded_urls, results, statuses = oag_ca_gov_scraper.RunJournal(self.path).load()
+        self.assertEqual(options, {"compare_file": "previous.xlsx"})
+        self.assertEqual(loaded_urls, urls)
+        self.assertEqual(results[urls[1]]['data']['AG Number'], "2024-00001")
+        self.assertEqual([url for url in loaded_urls if statuses[url] != "done"], [urls[2]])
+    
+    def test_producer_journals_urls_and_stops_workers(self):
+        """Test that streamed URLs are journaled as pending and every worker gets a sentinel."""
+        urls = ["https://oag.ca.gov/prop65/60-Day-Notice-2024-0000{}".format(i) for i in range(3)]
+        journal = oag_ca_gov_scraper.RunJournal(self.path)
+        journal.record_start("20240101_120000", [], {})
+        url_queue = queue.Queue()
+        produced = oag_ca_gov_scraper.AtomicCounter()
+        oag_ca_gov_scraper.url_producer(iter(urls), url_queue, 2, produced, journal, batch_size=2)
+        journal.close()
+        
+        self.assertEqual([url_queue.get() for _ in range(5)], urls + [None, None])
+        self.assertEqual(produced.get(), 3)
+        options, loaded_urls, results, statuses = oag_ca_gov_scraper.RunJournal(self.path).load()
+        self.assertEqual(options, {"sourced": 3})
+        self.assertEqual(loaded_urls, urls)
+        self.assertEqual(set(statuses.values()), {"pending"})
+    
+    def test_priority_sentinels_come_last(self):
+        """Test that on a priority queue every sentinel comes out after every URL."""
+        urls = ["https://oag.ca.gov/prop65/60-Day-Notice-{}-{:05d}".format(year, i)
+                for year in (2016, 2024) for i in range(1, 151)]
+        url_queue = oag_ca_gov_scraper.PriorityURLQueue()
+        produced = oag_ca_gov_scraper.AtomicCounter()
+        oag_ca_gov_scraper.url_producer(iter(urls), url_queue, 5, produced, None,
+                                        priority=oag_ca_gov_scraper.score_url_priority)
+        
+        received = [url_queue.get() for _ in range(len(urls) + 5)]
+        self.assertEqual(received[len(urls):], [None] * 5)
+        self.assertEqual(sorted(received[:len(urls)]), sorted(urls))
+        self.assertTrue(url_queue.empty())
+    
+    def test_resume_keeps_every_section(self):
+        """Test that a journaled Notice comes back with more than MAX_FLAT_SECTIONS sections."""
+        url = "https://oag.ca.gov/prop65/60-Day-Notice-2024-00001"
+        values = tuple(url if field == "link" else "" for field in oag_ca_gov_scraper.NOTICE_FIELDS)
+        settlements = [oag_ca_gov_scraper.Settlement.from_mapping({"Total Payments": "${}.00".format(i)})
+                       for i in range(1, 8)]
+        judgments = [oag_ca_gov_scraper.Judgment.from_mapping({"Case Name": "Case {}".format(i)})
+                     for i in range(1, 7)]
+        notice = oag_ca_gov_scraper.Notice(values, settlements=settlements, judgments=judgments)
+        journal = oag_ca_gov_scraper.RunJournal(self.path)
+        journal.record_results([notice])
+        journal.close()
+        
+        options, loaded_urls, results, statuses = oag_ca_gov_scraper.RunJournal(self.path).load()
+        restored = results[url]
+        self.assertEqual(len(restored.settlements), 7)
+        self.assertEqual(len(restored.judgments), 6)
+        self.assertEqual(restored.to_dict(), notice.to_dict())
+        
+        output_file = os.path.join(self.temp_dir, "notices.sqlite")
+        writer = oag_ca_gov_scraper.open_result_writer("sqlite", output_file)
+        writer.write_all([restored])
+        writer.close()
+        connection = sqlite3.connect(output_file)
+        try:
+            self.assertEqual(connection.execute("SELECT SUM(total_payments) FROM settlements").fetchone()[0], 28.0)
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM judgments").fetchone()[0], 6)
+        finally:
+            connection.close()
+    
+    def test_load_skips_truncated_line(self):
+        """Test that a partial line left by a crash does not stop the journal loading."""
+        journal = oag_ca_gov_scraper.RunJournal(self.path)
+        journal.record_failures(["https://oag.ca.gov/prop65/60-Day-Notice-2024-00001"])
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"event": "done", "url": ')
+        options, loaded_urls, results, statuses = oag_ca_gov_scraper.RunJournal(self.path).load()
+        self.assertEqual(statuses, {"https://oag.ca.gov/prop65/60-Day-Notice-2024-00001": "failed"})
+        self.assertEqual(results, {})
 
 if __name__ == '__main__':
     unittest.main()